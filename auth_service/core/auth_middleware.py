@@ -2,6 +2,7 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from services.auth_service import firebase_auth_service
 from typing import Dict, Any, Optional
+from core.tracing import current_trace
 
 # Permitir HTTPBearer sin auto_error para poder usarlo en get_optional_user
 security = HTTPBearer(auto_error=False)
@@ -32,6 +33,10 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    # UID autenticado en la traza: viaja en el request log
+    trace = current_trace()
+    if trace is not None:
+        trace.user = user_data.get("uid")
     return user_data
 
 async def get_optional_user(
@@ -39,6 +39,11 @@ class Settings():
     
     # Firebase
     FIREBASE_CREDENTIALS_PATH: Path = ROOT_DIR / "secrets" / "kubernetes-sd.json"
+    # Backend de identidad: "firebase" o "memory" (usuarios de un JSON, para pruebas de carga y benchmarks)
+    AUTH_BACKEND: str = os.getenv("AUTH_BACKEND", "firebase").lower()
+    AUTH_MEMORY_USERS_FILE: Optional[str] = os.getenv("AUTH_MEMORY_USERS_FILE") or None
+    AUTH_MEMORY_LATENCY_MS: float = float(os.getenv("AUTH_MEMORY_LATENCY_MS", "0"))
+    AUTH_MEMORY_JITTER_MS: float = float(os.getenv("AUTH_MEMORY_JITTER_MS", "0"))
     
     # URLs de servicios
     LOGS_SERVICE_URL: str = os.getenv("LOGS_SERVICE_URL", "http://localhost:8001")
@@ -50,6 +55,39 @@ class Settings():
     LOG_FORMAT: str = os.getenv("LOG_FORMAT", "%(asctime)s - %(name)s - %(levelname)s - %(message)s")
     # LOG_FILE: Optional[Path] = ROOT_DIR / "logs" / "auth_service.log"
 
+    # Envío de logs: cola en memoria + spool local cuando el logs_service no responde
+    # (cada proceso usa su propio subdirectorio worker-N; LOG_SPOOL_MAX_BYTES es por proceso)
+    LOG_SPOOL_DIR: Path = Path(os.getenv("LOG_SPOOL_DIR", str(ROOT_DIR / "log_spool")))
+    LOG_SPOOL_MAX_BYTES: int = int(os.getenv("LOG_SPOOL_MAX_BYTES", str(64 * 1024 * 1024)))
+    LOG_SPOOL_FILE_BYTES: int = int(os.getenv("LOG_SPOOL_FILE_BYTES", str(1024 * 1024)))
+    LOG_SHIP_QUEUE_SIZE: int = int(os.getenv("LOG_SHIP_QUEUE_SIZE", "10000"))
+    LOG_SHIP_BATCH_SIZE: int = int(os.getenv("LOG_SHIP_BATCH_SIZE", "200"))
+    LOG_SHIP_FLUSH_INTERVAL: float = float(os.getenv("LOG_SHIP_FLUSH_INTERVAL", "0.5"))
+    LOG_SHIP_TIMEOUT: float = float(os.getenv("LOG_SHIP_TIMEOUT", "2"))
+    LOG_BREAKER_FAILURES: int = int(os.getenv("LOG_BREAKER_FAILURES", "3"))
+    LOG_BREAKER_RESET_SECONDS: float = float(os.getenv("LOG_BREAKER_RESET_SECONDS", "10"))
+    LOG_POLICY_REFRESH_SECONDS: float = float(os.getenv("LOG_POLICY_REFRESH_SECONDS", "30"))
+
+    # Endpoints /debug (perfil de CPU y heap, reglas de fallos): desactivados si DEBUG_TOKEN está vacío
+    DEBUG_TOKEN: str = os.getenv("DEBUG_TOKEN", "")
+    DEBUG_PROFILE_MAX_SECONDS: float = float(os.getenv("DEBUG_PROFILE_MAX_SECONDS", "60"))
+
+    # Inyección de latencia, errores y timeouts en las llamadas salientes (firebase_auth, logs).
+    # Desactivada si está vacía; JSON {"target" o "target:operación": regla} o ruta a un fichero con ese JSON
+    FAULT_INJECTION: str = os.getenv("FAULT_INJECTION", "")
+    FAULT_INJECTION_SEED: str = os.getenv("FAULT_INJECTION_SEED", "")
+
+    # Control de admisión: límite de concurrencia adaptado a la latencia; el exceso se rechaza con 503
+    ADMISSION_CONTROL: bool = os.getenv("ADMISSION_CONTROL", "True").lower() in ("true", "1", "t")
+    ADMISSION_INITIAL_LIMIT: int = int(os.getenv("ADMISSION_INITIAL_LIMIT", "50"))
+    ADMISSION_MIN_LIMIT: int = int(os.getenv("ADMISSION_MIN_LIMIT", "8"))
+    ADMISSION_MAX_LIMIT: int = int(os.getenv("ADMISSION_MAX_LIMIT", "500"))
+    # Parte del límite que pueden ocupar las lecturas: bajo presión se rechazan antes que las escrituras
+    ADMISSION_READ_SHARE: float = float(os.getenv("ADMISSION_READ_SHARE", "0.8"))
+    # Espera máxima por una plaza antes del 503 (0: rechazo inmediato) y tamaño de esa cola
+    ADMISSION_QUEUE_TIMEOUT_MS: float = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_MS", "100"))
+    ADMISSION_MAX_QUEUE: int = int(os.getenv("ADMISSION_MAX_QUEUE", "100"))
+
 
 @lru_cache()
 def get_settings() -> Settings:
@@ -0,0 +1,109 @@
+import random
+import sys
+import threading
+from typing import Any, Dict, Optional, Tuple
+import httpx
+from core.metrics import observe_outbound
+
+LEVELS = {"debug": 10, "info": 20, "warning": 30, "warn": 30, "error": 40, "critical": 50}
+
+
+class LogPolicy:
+    """Cached copy of the logs_service policy (minimum level and sample rate).
+
+    Rules are resolved from the most generic to the most specific: ``default``,
+    this service, its logger override and its action override. A poller thread
+    refreshes the copy with ``If-None-Match``; when the logs service is
+    unreachable the last known policy stays in force (everything is sent until
+    one has been received).
+    """
+
+    def __init__(self, url: str, service: str, refresh_interval: float = 30.0, timeout: float = 2.0):
+        self.url = url
+        self.service = service
+        self.refresh_interval = refresh_interval
+        self.timeout = timeout
+
+        self._policy: Dict[str, Any] = {}
+        self._etag: Optional[str] = None
+        self._rules: Dict[Tuple[Optional[str], Optional[str]], Tuple[int, float]] = {}
+        self._client = httpx.Client()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+        # Métricas
+        self._dropped = 0
+        self._sampled_out = 0
+        self._refresh_errors = 0
+
+    def _rule(self, logger: Optional[str], action: Optional[str]) -> Tuple[int, float]:
+        key = (logger, action)
+        rule = self._rules.get(key)
+        if rule is None:
+            merged = {"min_level": "debug", "sample_rate": 1.0}
+            service = self._policy.get("services", {}).get(self.service, {})
+            for section in (
+                self._policy.get("default"),
+                service,
+                service.get("loggers", {}).get(logger or ""),
+                service.get("actions", {}).get(action or ""),
+            ):
+                if section:
+                    merged.update({k: section[k] for k in ("min_level", "sample_rate") if k in section})
+            rule = self._rules[key] = (LEVELS.get(merged["min_level"], 10), float(merged["sample_rate"]))
+        return rule
+
+    def check(self, level: str, logger: Optional[str] = None, action: Optional[str] = None) -> Optional[float]:
+        """Sample rate a record is kept at, or None when it must be dropped"""
+        min_level, rate = self._rule(logger, action)
+        if LEVELS.get(level.lower(), 20) < min_level:
+            self._dropped += 1
+            return None
+        if rate < 1.0 and random.random() >= rate:
+            self._sampled_out += 1
+            return None
+        return rate
+
+    def apply(self, policy: Dict[str, Any]) -> None:
+        self._policy = policy
+        self._rules = {}
+
+    def refresh(self) -> None:
+        headers = {"If-None-Match": self._etag} if self._etag else {}
+        try:
+            with observe_outbound("logs", "policy"):
+                response = self._client.get(self.url, headers=headers, timeout=self.timeout)
+            if response.status_code == 304:
+                return
+            response.raise_for_status()
+            self.apply(response.json())
+            self._etag = response.headers.get("ETag")
+        except Exception as e:
+            # No usamos write(): con el logs_service caído solo acabaría en el spool
+            self._refresh_errors += 1
+            sys.stderr.write(f"log policy: refresh failed: {e}\n")
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="log-policy", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stopping.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self.refresh()
+            self._stopping.wait(self._policy.get("refresh_seconds", self.refresh_interval))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "version": self._policy.get("version"),
+            "dropped": self._dropped,
+            "sampled_out": self._sampled_out,
+            "refresh_errors": self._refresh_errors,
+        }
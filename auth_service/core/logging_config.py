@@ -1,9 +1,32 @@
 import logging
+import sys
 from typing import Optional, Any
-import httpx
 from core.config import settings
+from core.log_policy import LogPolicy
+from core.log_shipper import CircuitBreaker, LogShipper, LogSpool
+from core.tracing import current_trace
 
-# NO hay carpeta logs aquí - solo envío al servicio centralizado
+# NO hay carpeta logs aquí - solo envío al servicio centralizado. Si el logs_service no
+# responde, los registros van a un spool local y se reenvían en lotes cuando vuelve
+log_shipper = LogShipper(
+    f"{settings.LOGS_SERVICE_URL}/api/logs/batch",
+    LogSpool(settings.LOG_SPOOL_DIR, max_bytes=settings.LOG_SPOOL_MAX_BYTES, file_bytes=settings.LOG_SPOOL_FILE_BYTES),
+    CircuitBreaker(failure_threshold=settings.LOG_BREAKER_FAILURES, reset_timeout=settings.LOG_BREAKER_RESET_SECONDS),
+    max_queue_size=settings.LOG_SHIP_QUEUE_SIZE,
+    batch_size=settings.LOG_SHIP_BATCH_SIZE,
+    flush_interval=settings.LOG_SHIP_FLUSH_INTERVAL,
+    timeout=settings.LOG_SHIP_TIMEOUT,
+)
+
+# Nivel mínimo y muestreo por servicio/logger/acción publicados por el logs_service
+log_policy = LogPolicy(
+    f"{settings.LOGS_SERVICE_URL}/api/logs/policy",
+    "auth",
+    refresh_interval=settings.LOG_POLICY_REFRESH_SECONDS,
+)
+
+# Tope de la query string guardada en cada request log
+REQUEST_QUERY_MAX_CHARS = 512
 
 def get_logger(name: str = "auth_service") -> logging.Logger:
     """Logger mínimo solo para errores críticos del servicio"""
@@ -22,36 +45,49 @@ def get_logger(name: str = "auth_service") -> logging.Logger:
 
     return logger
 
-async def send_log_to_service(level: str, message: str, name: Optional[str] = None, **meta: Any) -> None:
-    """Envía TODOS los logs al servicio centralizado"""
-    try:
-        async with httpx.AsyncClient() as client:
-            payload = {
-                "level": level,
-                "message": message,
-                "meta": {**meta, "service": "auth", "logger_name": name or "auth_service"}
-            }
-            # Agregar user si está en meta
-            if 'user' in meta:
-                payload["user"] = meta['user']
-                
-            await client.post(
-                f"{settings.LOGS_SERVICE_URL}/api/logs/client",
-                json=payload,
-                timeout=5.0
-            )
-    except Exception as e:
-        # Fallback: solo log local para errores de conexión al logs_service
-        logger = get_logger("logging_fallback")
-        logger.error(f"Failed to send log to service: {e} - Original: {message}")
+def _caller_name() -> str:
+    """Module that called write(): the logger the policy's ``loggers`` rules match"""
+    return sys._getframe(2).f_globals.get("__name__", "auth_service")
 
 def write(level: str, message: str, name: Optional[str] = None, **meta: Any) -> None:
-    """Envía log al servicio centralizado"""
-    # Enviar asincrónicamente al servicio de logs
-    import asyncio
-    asyncio.create_task(send_log_to_service(level, message, name, **meta))
+    """Envía log al servicio centralizado (solo encola: el envío lo hace el hilo del log_shipper)"""
+    name = name or _caller_name()
+    # La política decide antes de serializar; en auth el mensaje hace de acción
+    rate = log_policy.check(level, name, meta.get("kind") or message)
+    if rate is None:
+        return
+    payload = {
+        "level": level,
+        "message": message,
+        "meta": {**meta, "service": "auth", "logger_name": name}
+    }
+    if rate < 1.0:
+        payload["meta"]["sample_rate"] = rate
+    # Agregar user si está en meta
+    if 'user' in meta:
+        payload["user"] = meta['user']
+    # La traza se toma aquí, en el contexto de la request (el hilo del shipper no la ve)
+    trace = current_trace()
+    if trace:
+        payload["trace_id"] = trace.trace_id
+        payload["meta"]["request_id"] = trace.request_id
+    log_shipper.ship(payload)
+
+def request_log(method: str, path: str, status: int, time: float, auth: bool = False, name: Optional[str] = None, route: Optional[str] = None, query: Optional[str] = None) -> None:
+    """Log HTTP requests - enviado al servicio centralizado.
 
-def request_log(method: str, path: str, status: int, time: float, auth: bool = False, name: Optional[str] = None) -> None:
-    """Log HTTP requests - enviado al servicio centralizado"""
+    Los campos estructurados (kind=request) permiten al logs_service agregarlos en
+    percentiles de latencia por ruta en lugar de guardar una línea por request.
+    """
+    trace = current_trace()
+    # Llamadas a Firebase Auth: recuento/tiempo y cada span, para atribuir la latencia de cola
+    extra = {"ops": trace.ops_summary(), "spans": trace.spans} if trace and trace.spans else {}
+    # Usuario y query string permiten reproducir el tráfico (benchmarks/capture.py)
+    if trace and trace.user:
+        extra["user"] = trace.user
+    if query:
+        extra["query"] = query[:REQUEST_QUERY_MAX_CHARS]
     write("info", f"request {method} {path} status={status} time={time:.3f}s auth={auth}", 
-          name=name or "auth_request")
\ No newline at end of file
+          name=name or "auth_request",
+          kind="request", method=method, path=path, route=route or path,
+          status=status, duration_ms=round(time * 1000, 3), **extra)
\ No newline at end of file
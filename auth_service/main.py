@@ -1,8 +1,11 @@
 from fastapi import FastAPI, Depends, HTTPException, Request
 from starlette.middleware.cors import CORSMiddleware
 from core.config import settings
-from core.logging_config import get_logger, request_log
-from routers import auth
+from core.logging_config import get_logger, request_log, log_shipper, log_policy
+from core.admission import admission, classify
+from core.metrics import REQUESTS_IN_FLIGHT, loop_lag, metrics_response, observe_request
+from core.tracing import current_trace, end_trace, response_headers, start_trace
+from routers import auth, debug
 from starlette.responses import JSONResponse
 import time
 
@@ -17,22 +20,55 @@ app = FastAPI(
 @app.on_event("startup")
 async def startup_event():
     logger.info("Starting Auth Service: %s version=%s", settings.PROJECT_NAME, settings.VERSION)
+    log_shipper.start()
+    log_policy.start()
+    loop_lag.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    loop_lag.stop()
+    log_policy.stop()
+    # Lo que no se pudo entregar queda en el spool y se reenvía al arrancar
+    log_shipper.stop()
 
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    start_time = time.time()
+    # Continúa la traza del llamante (traceparent) o abre una nueva
+    trace_token = start_trace(request.headers)
+    # La traza se cierra aunque call_next lance
     try:
-        response = await call_next(request)
-    except Exception as exc:
-        logger.exception("Unhandled exception during request %s %s: %s", request.method, request.url.path, exc)
-        return JSONResponse({"detail": "Internal server error"}, status_code=500)
-    process_time = time.time() - start_time
-    has_auth = bool(request.headers.get("authorization"))
-    request_log(request.method, request.url.path, response.status_code, process_time, auth=has_auth, name=__name__)
-    return response
+        start_time = time.time()
+        REQUESTS_IN_FLIGHT.inc()
+        # Control de admisión: con el pod saturado se rechaza pronto (503) en vez de acumular latencia
+        priority = classify(request)
+        try:
+            if await admission.acquire(priority):
+                admitted_at = time.time()
+                try:
+                    response = await call_next(request)
+                finally:
+                    admission.release(priority, time.time() - admitted_at)
+            else:
+                response = admission.reject_response()
+        except Exception as exc:
+            logger.exception("Unhandled exception during request %s %s: %s", request.method, request.url.path, exc)
+            observe_request(request.method, getattr(request.scope.get("route"), "path", None), 500, time.time() - start_time)
+            return JSONResponse({"detail": "Internal server error"}, status_code=500)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+        process_time = time.time() - start_time
+        has_auth = bool(request.headers.get("authorization"))
+        route = getattr(request.scope.get("route"), "path", None)
+        observe_request(request.method, route, response.status_code, process_time)
+        response.headers.update(response_headers(current_trace(), process_time))
+        request_log(request.method, request.url.path, response.status_code, process_time, auth=has_auth, name=__name__, route=route, query=request.url.query)
+        return response
+    finally:
+        end_trace(trace_token)
 
 # Routers
 app.include_router(auth.router, prefix="/api/auth")
+app.include_router(debug.router, prefix="/debug", include_in_schema=False)
 
 # CORS
 app.add_middleware(
@@ -43,6 +79,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.get("/health/admission")
+async def admission_health():
+    """Adaptive concurrency limit, in-flight and queued requests, and what was shed per priority class"""
+    return admission.stats()
+
 @app.get("/health")
 async def health():
-    return {"status": "healthy", "service": "auth"}
\ No newline at end of file
+    return {"status": "healthy", "service": "auth"}
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    return metrics_response()
+
+@app.get("/health/logging")
+async def logging_health():
+    """Delivery metrics of the log shipper (breaker state, spool usage) and the active log policy"""
+    return {**log_shipper.stats(), "policy": log_policy.stats()}
@@ -0,0 +1,75 @@
+import asyncio
+import hmac
+import time
+from typing import Any, Dict, Optional
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from core.config import settings
+from core.fault_injection import faults
+from core.profiling import ProfilerBusy, cpu_profiler, heap_profiler
+
+def require_debug_token(x_debug_token: Optional[str] = Header(None)) -> None:
+    """Debug endpoints only exist when DEBUG_TOKEN is set, and require it in X-Debug-Token"""
+    if not settings.DEBUG_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_debug_token or not hmac.compare_digest(x_debug_token, settings.DEBUG_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid debug token")
+
+router = APIRouter(tags=["debug"], dependencies=[Depends(require_debug_token)])
+
+def _check_seconds(seconds: float) -> None:
+    if seconds > settings.DEBUG_PROFILE_MAX_SECONDS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.DEBUG_PROFILE_MAX_SECONDS} seconds")
+
+@router.get("/profile")
+async def cpu_profile(
+    seconds: float = Query(10, gt=0, description="Duración del muestreo"),
+    interval_ms: float = Query(10, ge=1, le=1000, description="Intervalo entre muestras"),
+    idle: bool = Query(False, description="Incluir hilos que solo esperan (select, colas, locks)"),
+):
+    """Sample the stacks of the live process and return them collapsed (flamegraph.pl / speedscope)"""
+    _check_seconds(seconds)
+    try:
+        # El muestreo corre en un hilo aparte: el event loop sigue atendiendo (y sale en el perfil)
+        stacks, samples = await asyncio.to_thread(cpu_profiler.profile, seconds, interval_ms / 1000, idle)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    filename = f"auth-{int(time.time())}.folded"
+    return PlainTextResponse(
+        cpu_profiler.collapsed(stacks),
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', "X-Profile-Samples": str(samples)},
+    )
+
+@router.get("/heap")
+async def heap_diff(
+    seconds: float = Query(10, gt=0, description="Ventana entre los dos snapshots"),
+    limit: int = Query(25, ge=1, le=200),
+    frames: int = Query(1, ge=1, le=25, description="Profundidad de traza (si tracemalloc no estaba activo)"),
+    group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+):
+    """Allocation sites that grew the most between two tracemalloc snapshots"""
+    _check_seconds(seconds)
+    try:
+        return await asyncio.to_thread(heap_profiler.diff, seconds, limit, frames, group_by)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@router.get("/faults")
+async def get_faults():
+    """Fault rules of this process and what they have injected since they were set"""
+    return {"rules": faults.rules(), "stats": faults.stats()}
+
+@router.put("/faults")
+async def set_faults(rules: Dict[str, Dict[str, Any]] = Body(..., description="Reglas por target o target:operación")):
+    """Replace the fault rules of this process (each worker has its own); ``{}`` turns injection off"""
+    try:
+        faults.configure(rules)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"rules": faults.rules()}
+
+@router.delete("/faults")
+async def clear_faults():
+    """Turn fault injection off"""
+    faults.clear()
+    return {"rules": {}}
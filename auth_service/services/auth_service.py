@@ -1,64 +1,23 @@
-import firebase_admin
-from firebase_admin import credentials, auth
-from pathlib import Path
-from typing import Optional, Dict, Any
-from core.logging_config import get_logger
+from core.config import settings
 
-logger = get_logger(__name__)
 
-# Inicializar Firebase Admin SDK
-def initialize_firebase():
-    if not firebase_admin._apps:
-        cred_path = Path(__file__).parent / '../secrets/kubernetes-sd.json'
-        cred = credentials.Certificate(str(cred_path))
-        firebase_admin.initialize_app(cred)
+def create_auth_service():
+    """Identity backend selected by AUTH_BACKEND: ``firebase`` (default) or ``memory``"""
+    if settings.AUTH_BACKEND == "memory":
+        from services.memory_auth import InMemoryAuthService
 
-initialize_firebase()
+        return InMemoryAuthService.from_file(
+            settings.AUTH_MEMORY_USERS_FILE,
+            latency=settings.AUTH_MEMORY_LATENCY_MS / 1000,
+            jitter=settings.AUTH_MEMORY_JITTER_MS / 1000,
+        )
+    if settings.AUTH_BACKEND != "firebase":
+        raise ValueError(f"Unknown AUTH_BACKEND: {settings.AUTH_BACKEND!r}")
+    # Importación diferida: el backend en memoria no necesita firebase_admin ni credenciales
+    from services.firebase_auth import FirebaseAuthService, initialize_firebase
 
-class FirebaseAuthService:
-    """Servicio para autenticación con Firebase"""
-    
-    @staticmethod
-    def verify_token(token: str) -> Optional[Dict[str, Any]]:
-        """Verifica token y retorna información del usuario"""
-        try:
-            return auth.verify_id_token(token)
-        except Exception as e:
-            logger.exception(f"Token verification failed: {e}")
-            return None
+    initialize_firebase()
+    return FirebaseAuthService()
 
-    @staticmethod
-    def get_user_by_uid(uid: str) -> Optional[Dict[str, Any]]:
-        try:
-            user = auth.get_user(uid)
-            return {
-                'uid': user.uid,
-                'email': user.email,
-                'display_name': user.display_name,
-                'email_verified': user.email_verified,
-                'disabled': user.disabled,
-                'created_at': user.user_metadata.creation_timestamp,
-                'last_sign_in': user.user_metadata.last_sign_in_timestamp
-            }
-        except Exception as e:
-            logger.exception(f"Get user failed: {e}")
-            return None
 
-    @staticmethod
-    def get_user_by_email(email: str) -> Optional[Dict[str, Any]]:
-        try:
-            user = auth.get_user_by_email(email)
-            return {
-                'uid': user.uid,
-                'email': user.email,
-                'display_name': user.display_name,
-                'email_verified': user.email_verified,
-                'disabled': user.disabled,
-                'created_at': user.user_metadata.creation_timestamp,
-                'last_sign_in': user.user_metadata.last_sign_in_timestamp
-            }
-        except Exception as e:
-            logger.exception(f"Get user by email failed: {e}")
-            return None
-
-firebase_auth_service = FirebaseAuthService()
+firebase_auth_service = create_auth_service()
@@ -0,0 +1,75 @@
+import json
+import random
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, Iterable
+from core.logging_config import get_logger
+from core.metrics import observe_outbound
+
+logger = get_logger(__name__)
+
+# Tokens del backend en memoria: prefijo + UID (no hay firma, solo para pruebas de carga)
+TOKEN_PREFIX = "memory-token:"
+
+
+class InMemoryAuthService:
+    """Stand-in for Firebase Auth: users from a JSON file, tokens ``memory-token:<uid>``.
+
+    Calls are accounted like the Firebase ones (category ``firebase_auth``,
+    target ``memory``) and sleep ``latency`` plus up to ``jitter`` seconds.
+    """
+
+    def __init__(self, users: Iterable[Dict[str, Any]] = (), latency: float = 0.0, jitter: float = 0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self._by_uid: Dict[str, Dict[str, Any]] = {}
+        self._by_email: Dict[str, str] = {}
+        for user in users:
+            self.add_user(user)
+
+    @classmethod
+    def from_file(cls, path: Optional[str], latency: float = 0.0, jitter: float = 0.0) -> "InMemoryAuthService":
+        users = json.loads(Path(path).read_text(encoding="utf-8")) if path else []
+        logger.info(f"In-memory auth backend with {len(users)} users")
+        return cls(users, latency, jitter)
+
+    def add_user(self, user: Dict[str, Any]) -> None:
+        record = {
+            'uid': user['uid'],
+            'email': user.get('email') or f"{user['uid']}@example.com",
+            'display_name': user.get('display_name'),
+            'email_verified': bool(user.get('email_verified', True)),
+            'disabled': bool(user.get('disabled', False)),
+            'created_at': None,
+            'last_sign_in': None,
+        }
+        self._by_uid[record['uid']] = record
+        self._by_email[record['email'].lower()] = record['uid']
+
+    def _round_trip(self) -> None:
+        delay = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def verify_token(self, token: str) -> Optional[Dict[str, Any]]:
+        with observe_outbound("memory", "verify_id_token", "firebase_auth"):
+            self._round_trip()
+            uid = token[len(TOKEN_PREFIX):] if token.startswith(TOKEN_PREFIX) else None
+            user = self._by_uid.get(uid) if uid else None
+        if not user or user['disabled']:
+            logger.warning("Token verification failed: unknown in-memory token")
+            return None
+        # Mismos claims básicos que devuelve verify_id_token
+        return {'uid': user['uid'], 'user_id': user['uid'], 'email': user['email'], 'email_verified': user['email_verified']}
+
+    def get_user_by_uid(self, uid: str) -> Optional[Dict[str, Any]]:
+        with observe_outbound("memory", "get_user", "firebase_auth"):
+            self._round_trip()
+            user = self._by_uid.get(uid)
+        return dict(user) if user else None
+
+    def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        with observe_outbound("memory", "get_user_by_email", "firebase_auth"):
+            self._round_trip()
+            uid = self._by_email.get(email.lower())
+        return dict(self._by_uid[uid]) if uid else None
@@ -0,0 +1,189 @@
+import argparse
+import gzip
+import json
+import re
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import unquote
+
+# (servicio, patrón del path, plantilla de ruta); el orden importa (":batch" antes de "/{task_id}")
+ROUTES = [
+    ("tasks", r"/api/tasks/?", "/api/tasks"),
+    ("tasks", r"/api/tasks/(?P<task_id>[^/]+)/toggle", "/api/tasks/{task_id}/toggle"),
+    ("tasks", r"/api/tasks/(?P<task_id>[^/]+)", "/api/tasks/{task_id}"),
+    ("collaborators", r"/api/collaborators/(?P<task_id>[^/]+):batch", "/api/collaborators/{task_id}:batch"),
+    (
+        "collaborators",
+        r"/api/collaborators/(?P<task_id>[^/]+)/collaborators/(?P<collaborator_id>[^/]+)",
+        "/api/collaborators/{task_id}/collaborators/{collaborator_id}",
+    ),
+    ("collaborators", r"/api/collaborators/(?P<task_id>[^/]+)", "/api/collaborators/{task_id}"),
+    ("auth", r"/api/auth/verify", "/api/auth/verify"),
+    ("auth", r"/api/auth/users/email/(?P<email>[^/]+)", "/api/auth/users/email/{email}"),
+    ("auth", r"/api/auth/users/(?P<uid>[^/]+)", "/api/auth/users/{uid}"),
+    ("logs", r"/api/logs/(?P<rest>.+)", None),
+]
+_ROUTES = [(service, re.compile(pattern + r"\Z"), template) for service, pattern, template in ROUTES]
+
+# Tráfico que nunca se reproduce: sondas, métricas, depuración, la ingesta de los log shippers
+# (la generan los propios servicios durante la reproducción) y el tail en vivo
+ALWAYS_EXCLUDE = (
+    "/health", "/metrics", "/debug", "/docs", "/openapi.json",
+    "/api/logs/batch", "/api/logs/client", "/api/logs/policy", "/api/logs/tail",
+)
+# Por defecto tampoco las consultas al logs_service (búsquedas, exportaciones)
+DEFAULT_EXCLUDE = ALWAYS_EXCLUDE + ("/api/logs/",)
+
+# Línea de texto de centralized.log: "2025-01-01 10:00:00,123 - INFO - client - [...] request GET /x status=200 time=0.012s auth=True ..."
+_TEXT_TS = re.compile(r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}),(\d{3})")
+_REQUEST = re.compile(
+    r"request (?P<method>[A-Z]+) (?P<path>\S+) status=(?P<status>\d+) time=(?P<time>[\d.]+)s auth=(?P<auth>True|False)"
+)
+_TEXT_FIELDS = re.compile(r"\b(service|user|query)=(\S+)")
+
+
+def match_route(path: str) -> Optional[Tuple[str, str, Dict[str, str]]]:
+    """``(service, route template, path params)`` of a public API path, else None"""
+    for service, pattern, template in _ROUTES:
+        match = pattern.match(path)
+        if match:
+            params = {k: unquote(v) for k, v in match.groupdict().items()}
+            return service, template or path, params
+    return None
+
+
+def _from_json(line: str) -> Optional[Dict[str, Any]]:
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None
+    meta = record.get("meta") or {}
+    if meta.get("kind") != "request" and not str(record.get("message", "")).startswith("request "):
+        return None
+    parsed = _REQUEST.search(record.get("message", ""))
+    method = meta.get("method") or (parsed and parsed["method"])
+    path = meta.get("path") or (parsed and parsed["path"])
+    if not method or not path or record.get("ts") is None:
+        return None
+    duration = meta.get("duration_ms")
+    if duration is None and parsed:
+        duration = float(parsed["time"]) * 1000
+    return {
+        "ts": float(record["ts"]),
+        "method": method,
+        "path": path,
+        "query": meta.get("query") or "",
+        "user": record.get("user") or meta.get("user"),
+        "auth": parsed["auth"] == "True" if parsed else True,
+        "status": int(meta.get("status") or (parsed and parsed["status"]) or 0),
+        "duration_ms": float(duration or 0.0),
+        "sample_rate": meta.get("sample_rate"),
+        "trace_id": record.get("trace_id") or meta.get("request_id"),
+    }
+
+
+def _from_text(line: str) -> Optional[Dict[str, Any]]:
+    ts, parsed = _TEXT_TS.match(line), _REQUEST.search(line)
+    if not ts or not parsed:
+        return None
+    fields = dict(_TEXT_FIELDS.findall(line[parsed.end():]))
+    when = datetime.strptime(ts.group(1), "%Y-%m-%d %H:%M:%S").timestamp() + int(ts.group(2)) / 1000
+    return {
+        "ts": when,
+        "method": parsed["method"],
+        "path": parsed["path"],
+        "query": fields.get("query", ""),
+        "user": fields.get("user"),
+        "auth": parsed["auth"] == "True",
+        "status": int(parsed["status"]),
+        "duration_ms": float(parsed["time"]) * 1000,
+        "sample_rate": None,
+        "trace_id": None,
+    }
+
+
+def log_files(paths: Iterable[Path]) -> List[Path]:
+    """Files to read: the given ones, plus logs found in the given directories (rotated and compressed too)"""
+    found: List[Path] = []
+    for path in paths:
+        if path.is_dir():
+            for pattern in ("centralized.log*", "*.jsonl", "*.jsonl.gz"):
+                found.extend(sorted(path.rglob(pattern)))
+        else:
+            found.append(path)
+    return list(dict.fromkeys(found))
+
+
+def read_requests(path: Path) -> Iterator[Dict[str, Any]]:
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            line = line.strip()
+            entry = _from_json(line) if line.startswith("{") else _from_text(line)
+            if entry:
+                yield entry
+
+
+def capture(paths: Iterable[Path], exclude: Iterable[str] = DEFAULT_EXCLUDE) -> List[Dict[str, Any]]:
+    """Recorded requests of the public API, in arrival order, with offsets from the first one.
+
+    Calls between services (tasks -> auth verify) share the trace id of the
+    request that caused them; only the outermost request of each trace is kept,
+    since replaying it makes the services issue those calls again.
+    """
+    exclude = tuple(exclude)
+    entries = []
+    edges: Dict[str, Dict[str, Any]] = {}
+    for path in log_files(paths):
+        for entry in read_requests(path):
+            if entry["path"].startswith(exclude):
+                continue
+            route = match_route(entry["path"])
+            if route is None:
+                continue
+            entry["service"], entry["route"], _ = route
+            # El log se escribe al terminar la request: la llegada es ts - duración
+            entry["ts"] -= entry["duration_ms"] / 1000
+            trace_id = entry["trace_id"]
+            if trace_id is None:
+                entries.append(entry)
+            elif trace_id not in edges or entry["ts"] < edges[trace_id]["ts"]:
+                edges[trace_id] = entry
+    entries.extend(edges.values())
+    entries.sort(key=lambda e: e["ts"])
+    if entries:
+        start = entries[0]["ts"]
+        for entry in entries:
+            entry["t"] = round(entry.pop("ts") - start, 6)
+    return entries
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Turn logs_service request logs into a replayable workload")
+    parser.add_argument("inputs", nargs="+", type=Path, help="centralized.log*, segment .jsonl/.jsonl.gz files or directories")
+    parser.add_argument("-o", "--output", type=Path, required=True, help="Workload file (JSON lines)")
+    parser.add_argument("--exclude", action="append", default=[], help="Also skip paths with this prefix")
+    parser.add_argument("--include-logs", action="store_true", help="Keep /api/logs/* requests (searches, exports)")
+    args = parser.parse_args()
+
+    exclude = list(ALWAYS_EXCLUDE if args.include_logs else DEFAULT_EXCLUDE) + args.exclude
+    entries = capture(args.inputs, exclude)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        for entry in entries:
+            f.write(json.dumps(entry) + "\n")
+
+    users = {e["user"] for e in entries if e["user"]}
+    span = entries[-1]["t"] if entries else 0.0
+    print(f"{len(entries)} requests from {len(users)} users over {span:.1f}s -> {args.output}")
+    if any(e["sample_rate"] for e in entries):
+        print("Note: some request logs were sampled by the log policy; the workload only has the kept ones")
+    if entries and not users:
+        print("Note: the records carry no user (older logs); they will be replayed as a single user")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+# Métrica -> True si más alto es mejor
+METRICS = {"throughput_rps": True, "p50_ms": False, "p95_ms": False, "p99_ms": False}
+# Las que deciden una regresión (p99 con pocas muestras es demasiado ruidoso para fallar por él)
+GATED = ("throughput_rps", "p95_ms")
+
+
+def compare(
+    current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.10
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Rows ``(scenario, endpoint, metric, baseline, current, change)`` and the ones that regressed.
+
+    A gated metric regresses when it is worse than the baseline by more than ``tolerance``.
+    """
+    rows, regressions = [], []
+    for scenario, result in current.get("scenarios", {}).items():
+        base_result = baseline.get("scenarios", {}).get(scenario)
+        if not base_result:
+            continue
+        for endpoint, stats in result["endpoints"].items():
+            base_stats = base_result["endpoints"].get(endpoint)
+            if not base_stats:
+                continue
+            for metric, higher_is_better in METRICS.items():
+                before, after = base_stats.get(metric), stats.get(metric)
+                if not before or after is None:
+                    continue
+                change = (after - before) / before
+                worse = -change if higher_is_better else change
+                row = {
+                    "scenario": scenario, "endpoint": endpoint, "metric": metric,
+                    "baseline": before, "current": after, "change": round(change, 4),
+                    "regressed": metric in GATED and worse > tolerance,
+                }
+                rows.append(row)
+                if row["regressed"]:
+                    regressions.append(row)
+    return rows, regressions
+
+
+def format_rows(rows: List[Dict[str, Any]]) -> str:
+    lines = [f"{'scenario':<14} {'endpoint':<36} {'metric':<15} {'baseline':>10} {'current':>10} {'change':>8}"]
+    for row in rows:
+        flag = "  REGRESSION" if row["regressed"] else ""
+        lines.append(
+            f"{row['scenario']:<14} {row['endpoint']:<36} {row['metric']:<15} "
+            f"{row['baseline']:>10.2f} {row['current']:>10.2f} {row['change']:>+8.1%}{flag}"
+        )
+    return "\n".join(lines)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare benchmark results against a baseline")
+    parser.add_argument("current", type=Path)
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative slowdown (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    rows, regressions = compare(
+        json.loads(args.current.read_text()), json.loads(args.baseline.read_text()), args.tolerance
+    )
+    print(format_rows(rows))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+import json
+import random
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Mismo prefijo que auth_service/services/memory_auth.py
+TOKEN_PREFIX = "memory-token:"
+
+OWNER = "bench-owner"
+SHARED_TASK = "bench-shared"
+WORDS = [
+    "deploy", "review", "invoice", "meeting", "backup", "release", "design", "budget",
+    "report", "migrate", "kubernetes", "firestore", "frontend", "latency", "docs", "hiring",
+]
+
+
+def token(uid: str) -> str:
+    return f"{TOKEN_PREFIX}{uid}"
+
+
+def _date(value: datetime) -> Dict[str, str]:
+    return {"$date": value.isoformat()}
+
+
+def collaborator_uids(count: int) -> List[str]:
+    return [f"bench-collab-{i:02d}" for i in range(count)]
+
+
+def build(tasks: int = 1000, collaborators: int = 20, seed: int = 7) -> Dict[str, List[Dict[str, Any]]]:
+    """Users for the in-memory auth backend and task documents for the in-memory repository.
+
+    The owner gets ``tasks`` tasks with titles drawn from WORDS (so a search
+    term matches a predictable share of them), and ``bench-shared`` has
+    ``collaborators`` collaborators with their profiles already stored.
+    """
+    rnd = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    uids = collaborator_uids(collaborators)
+    users = [{"uid": OWNER, "email": f"{OWNER}@example.com", "display_name": "Bench Owner"}]
+    users += [{"uid": uid, "email": f"{uid}@example.com", "display_name": uid} for uid in uids]
+
+    docs = []
+    for i in range(tasks):
+        created = now - timedelta(minutes=i)
+        docs.append({
+            "id": f"bench-task-{i:05d}",
+            "owner_id": OWNER,
+            "title": f"{rnd.choice(WORDS)} {rnd.choice(WORDS)} #{i}",
+            "description": " ".join(rnd.choice(WORDS) for _ in range(12)),
+            "completed": rnd.random() < 0.3,
+            "collaborators": [],
+            "created_at": _date(created),
+            "updated_at": _date(created),
+        })
+    docs.append({
+        "id": SHARED_TASK,
+        "owner_id": OWNER,
+        "title": "shared task",
+        "description": "task with many collaborators",
+        "completed": False,
+        "collaborators": uids,
+        "collaborator_profiles": {
+            uid: {"email": f"{uid}@example.com", "display_name": uid, "refreshed_at": _date(now)} for uid in uids
+        },
+        "created_at": _date(now),
+        "updated_at": _date(now),
+    })
+    return {"users": users, "tasks": docs}
+
+
+def write(directory: Path, **kwargs: Any) -> Dict[str, Path]:
+    """Write ``users.json`` and ``tasks.json`` into ``directory`` and return their paths"""
+    directory.mkdir(parents=True, exist_ok=True)
+    data = build(**kwargs)
+    paths = {}
+    for name, content in data.items():
+        paths[name] = directory / f"{name}.json"
+        paths[name].write_text(json.dumps(content), encoding="utf-8")
+    return paths
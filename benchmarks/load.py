@@ -0,0 +1,120 @@
+import asyncio
+import math
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import httpx
+
+
+@dataclass
+class Request:
+    """One request of a scenario; ``label`` groups it in the report (method + route template)"""
+
+    label: str
+    method: str
+    url: str
+    headers: Dict[str, str] = field(default_factory=dict)
+    params: Optional[Dict[str, Any]] = None
+    json: Any = None
+    # Unidades de trabajo que representa (registros de un lote de logs)
+    items: int = 1
+
+
+class Recorder:
+    """Latencies and status codes per label"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.statuses: Dict[str, Counter] = {}
+        self.items: Counter = Counter()
+
+    def record(self, request: Request, seconds: float, status: Optional[int]) -> None:
+        self.latencies.setdefault(request.label, []).append(seconds)
+        self.statuses.setdefault(request.label, Counter())[str(status) if status else "error"] += 1
+        if status and status < 400:
+            self.items[request.label] += request.items
+
+
+def percentile(ordered: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence"""
+    if not ordered:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(recorder: Recorder, elapsed: float) -> Dict[str, Any]:
+    endpoints = {}
+    for label, samples in recorder.latencies.items():
+        ordered = sorted(samples)
+        statuses = recorder.statuses[label]
+        errors = sum(n for status, n in statuses.items() if status == "error" or int(status) >= 400)
+        endpoints[label] = {
+            "requests": len(ordered),
+            "errors": errors,
+            "throughput_rps": round(len(ordered) / elapsed, 2),
+            "items_per_second": round(recorder.items[label] / elapsed, 2),
+            "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+            "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+            "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+            "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+            "max_ms": round(ordered[-1] * 1000, 3),
+            "statuses": dict(statuses),
+        }
+    total = sum(e["requests"] for e in endpoints.values())
+    return {
+        "elapsed_seconds": round(elapsed, 3),
+        "requests": total,
+        "errors": sum(e["errors"] for e in endpoints.values()),
+        "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "endpoints": endpoints,
+    }
+
+
+async def run_closed_loop(
+    next_request: Callable[[int], Request],
+    concurrency: int,
+    duration: float,
+    warmup: float = 0.0,
+    timeout: float = 30.0,
+) -> Dict[str, Any]:
+    """``concurrency`` workers send requests back to back for ``warmup + duration`` seconds.
+
+    Only requests started after the warmup are recorded. ``next_request`` gets a
+    global sequence number so scenarios can rotate over ids or search terms.
+    """
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    sequence = 0
+    start = time.perf_counter()
+    measure_from = start + warmup
+    stop_at = measure_from + duration
+
+    async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+
+        async def _worker() -> None:
+            nonlocal sequence
+            while True:
+                if time.perf_counter() >= stop_at:
+                    return
+                request = next_request(sequence)
+                sequence += 1
+                # Construir la petición (p. ej. un lote de logs) no cuenta en la latencia
+                sent = time.perf_counter()
+                status = None
+                try:
+                    response = await client.request(
+                        request.method, request.url,
+                        headers=request.headers, params=request.params, json=request.json,
+                    )
+                    status = response.status_code
+                except httpx.HTTPError:
+                    pass
+                if sent >= measure_from:
+                    recorder.record(request, time.perf_counter() - sent, status)
+
+        await asyncio.gather(*(_worker() for _ in range(concurrency)))
+
+    return summarize(recorder, max(time.perf_counter() - measure_from, 1e-9))
@@ -0,0 +1,325 @@
+import argparse
+import asyncio
+import json
+import random
+import re
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+import fixtures
+from capture import match_route
+from load import Recorder, Request, percentile
+from stack import ServiceStack, load_faults
+
+# Usuario de las peticiones autenticadas cuyo registro no trae uid (logs anteriores al campo)
+ANONYMOUS = "replay-anonymous"
+_SERVER_TIMING = re.compile(r"\btotal;dur=([\d.]+)")
+
+
+def load_workload(path: Path, limit: Optional[int] = None, duration: Optional[float] = None) -> List[Dict[str, Any]]:
+    entries = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if duration is not None and entry["t"] > duration:
+                break
+            entries.append(entry)
+            if limit is not None and len(entries) >= limit:
+                break
+    return entries
+
+
+def _user(entry: Dict[str, Any]) -> Optional[str]:
+    if not entry.get("auth", True):
+        return None
+    return entry.get("user") or ANONYMOUS
+
+
+def build_fixtures(entries: List[Dict[str, Any]], tasks_per_user: int = 25, seed: int = 7) -> Dict[str, List[Dict[str, Any]]]:
+    """Users and tasks so that the recorded requests find what they touched.
+
+    Every user of the workload exists in the identity backend. Each task id in a
+    path becomes a document owned by the first user who used it through the tasks
+    API or changed its collaborators; later readers of its collaborators become
+    collaborators, so recorded 200s do not turn into 403s. Every user also gets
+    ``tasks_per_user`` filler tasks so listings and searches have data to scan.
+    """
+    rnd = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    users: Dict[str, Dict[str, str]] = {}
+    owners: Dict[str, str] = {}
+    collaborators: Dict[str, List[str]] = {}
+
+    def _add_user(uid: str, email: Optional[str] = None) -> None:
+        users.setdefault(uid, {"uid": uid, "email": email or f"{uid}@example.com", "display_name": uid})
+
+    _add_user(ANONYMOUS)
+    for entry in entries:
+        uid = _user(entry)
+        if uid:
+            _add_user(uid)
+        route = match_route(entry["path"])
+        if route is None:
+            continue
+        _, template, params = route
+        if "email" in params:
+            _add_user(f"replay-{params['email'].split('@')[0]}", params["email"])
+        elif "uid" in params:
+            _add_user(params["uid"])
+        task_id = params.get("task_id")
+        if not task_id or not uid:
+            continue
+        if template == "/api/collaborators/{task_id}" and entry["method"] == "GET":
+            # Leer colaboradores no hace dueño a nadie: quien lee sin ser dueño colabora
+            collaborators.setdefault(task_id, []).append(uid)
+            continue
+        owners.setdefault(task_id, uid)
+        if params.get("collaborator_id"):
+            _add_user(params["collaborator_id"])
+            collaborators.setdefault(task_id, []).append(params["collaborator_id"])
+    # Tareas que solo se leyeron: del usuario anónimo, con sus lectores como colaboradores
+    for task_id in collaborators:
+        owners.setdefault(task_id, ANONYMOUS)
+
+    docs = []
+    for task_id, owner in owners.items():
+        uids = [uid for uid in dict.fromkeys(collaborators.get(task_id, [])) if uid != owner]
+        docs.append({
+            "id": task_id,
+            "owner_id": owner,
+            "title": f"{rnd.choice(fixtures.WORDS)} {rnd.choice(fixtures.WORDS)}",
+            "description": " ".join(rnd.choice(fixtures.WORDS) for _ in range(12)),
+            "completed": False,
+            "collaborators": uids,
+            "created_at": fixtures._date(now),
+            "updated_at": fixtures._date(now),
+        })
+    for uid in users:
+        for i in range(tasks_per_user):
+            created = now - timedelta(minutes=i)
+            docs.append({
+                "id": f"replay-{uid}-{i:04d}",
+                "owner_id": uid,
+                "title": f"{rnd.choice(fixtures.WORDS)} {rnd.choice(fixtures.WORDS)} #{i}",
+                "description": " ".join(rnd.choice(fixtures.WORDS) for _ in range(12)),
+                "completed": rnd.random() < 0.3,
+                "collaborators": [],
+                "created_at": fixtures._date(created),
+                "updated_at": fixtures._date(created),
+            })
+    return {"users": list(users.values()), "tasks": docs}
+
+
+def write_fixtures(directory: Path, data: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Path]:
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = {}
+    for name, content in data.items():
+        paths[name] = directory / f"{name}.json"
+        paths[name].write_text(json.dumps(content), encoding="utf-8")
+    return paths
+
+
+def _body(entry: Dict[str, Any], template: str, others: List[str]) -> Any:
+    # Los request logs no guardan cuerpos: se sintetizan unos válidos para la ruta
+    method = entry["method"]
+    if template == "/api/tasks" and method == "POST":
+        return {"title": "replayed task", "description": "created by the traffic replay"}
+    if template == "/api/tasks/{task_id}" and method == "PUT":
+        return {"title": "replayed update"}
+    if template == "/api/collaborators/{task_id}" and method == "POST":
+        return {"uid": others[0]}
+    if template == "/api/collaborators/{task_id}:batch":
+        return {"add": others[:1], "remove": []}
+    return None
+
+
+def to_request(entry: Dict[str, Any], stack: ServiceStack, users: List[str]) -> Request:
+    service, template, _ = match_route(entry["path"])
+    uid = _user(entry)
+    headers = {"Authorization": f"Bearer {fixtures.token(uid)}"} if uid else {}
+    if service == "logs":
+        headers["X-Debug-Token"] = stack.debug_token
+    url = f"{stack.url(service)}{entry['path']}"
+    if entry.get("query"):
+        url = f"{url}?{entry['query']}"
+    others = [u for u in users if u not in (uid, ANONYMOUS)] or [ANONYMOUS]
+    return Request(f"{entry['method']} {template}", entry["method"], url, headers, json=_body(entry, template, others))
+
+
+async def replay(
+    entries: List[Dict[str, Any]],
+    stack: ServiceStack,
+    users: List[str],
+    speed: float = 1.0,
+    max_in_flight: int = 256,
+    timeout: float = 30.0,
+) -> Dict[str, Any]:
+    """Send each request at its recorded offset divided by ``speed`` (open loop).
+
+    Unlike the closed-loop benchmarks, a slow response does not delay the next
+    request: arrivals keep the recorded timing and overload shows up as latency.
+    Latency is the service's own ``Server-Timing: total`` when present (what the
+    request log recorded), else the time seen by the client.
+    """
+    recorder, client_recorder = Recorder(), Recorder()
+    lags: List[float] = []
+    mismatches: Dict[str, Dict[str, int]] = {}
+    gate = asyncio.Semaphore(max_in_flight)
+    limits = httpx.Limits(max_connections=max_in_flight, max_keepalive_connections=max_in_flight)
+
+    async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+        start = time.perf_counter()
+
+        async def _send(entry: Dict[str, Any]) -> None:
+            request = to_request(entry, stack, users)
+            async with gate:
+                sent = time.perf_counter()
+                lags.append(sent - start - entry["t"] / speed)
+                status, server = None, None
+                try:
+                    response = await client.request(
+                        request.method, request.url, headers=request.headers, json=request.json
+                    )
+                    status = response.status_code
+                    match = _SERVER_TIMING.search(response.headers.get("server-timing", ""))
+                    server = float(match.group(1)) / 1000 if match else None
+                except httpx.HTTPError:
+                    pass
+                seconds = time.perf_counter() - sent
+            recorder.record(request, server if server is not None else seconds, status)
+            client_recorder.record(request, seconds, status)
+            if status != entry["status"]:
+                key = f"{entry['status']}->{status or 'error'}"
+                counts = mismatches.setdefault(request.label, {})
+                counts[key] = counts.get(key, 0) + 1
+
+        tasks = []
+        for entry in entries:
+            delay = start + entry["t"] / speed - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(_send(entry)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+    ordered_lags = sorted(lags)
+    return {
+        "elapsed_seconds": round(elapsed, 3),
+        "requests": len(entries),
+        "schedule_lag_p99_ms": round(percentile(ordered_lags, 99) * 1000, 3),
+        "latencies": recorder.latencies,
+        "client_latencies": client_recorder.latencies,
+        "statuses": {label: dict(counts) for label, counts in recorder.statuses.items()},
+        "status_mismatches": mismatches,
+    }
+
+
+def _stats(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+    }
+
+
+def compare_latencies(entries: List[Dict[str, Any]], result: Dict[str, Any]) -> Dict[str, Any]:
+    """Recorded vs replayed percentiles per route, and their ratio"""
+    recorded: Dict[str, List[float]] = {}
+    for entry in entries:
+        recorded.setdefault(f"{entry['method']} {entry['route']}", []).append(entry["duration_ms"] / 1000)
+    report = {}
+    for label in sorted(set(recorded) | set(result["latencies"])):
+        before = _stats(recorded.get(label, []))
+        after = _stats(result["latencies"].get(label, []))
+        report[label] = {
+            "recorded": before,
+            "replayed": after,
+            "client": _stats(result["client_latencies"].get(label, [])),
+            "ratio": {
+                key: round(after[key] / before[key], 3) if before[key] else None
+                for key in ("p50_ms", "p95_ms", "p99_ms")
+            },
+            "status_mismatches": result["status_mismatches"].get(label, {}),
+        }
+    return report
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    print(f"\n{'route':<52} {'n rec/rep':>11} {'p50 rec/rep ms':>17} {'p95 rec/rep ms':>17} {'p99 rec/rep ms':>17}")
+    for label, row in report.items():
+        before, after = row["recorded"], row["replayed"]
+        cells = [f"{before[k]:>8.1f}/{after[k]:<8.1f}" for k in ("p50_ms", "p95_ms", "p99_ms")]
+        print(f"{label:<52} {before['count']:>5}/{after['count']:<5} {' '.join(cells)}")
+        if row["status_mismatches"]:
+            mismatches = ", ".join(f"{k} x{n}" for k, n in row["status_mismatches"].items())
+            print(f"{'':<52} status recorded->replayed: {mismatches}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Replay a captured workload against the services running locally with in-memory backends"
+    )
+    parser.add_argument("workload", type=Path, help="Output of capture.py")
+    parser.add_argument("--speed", type=float, default=1.0, help="Time compression (2 = twice as fast)")
+    parser.add_argument("--limit", type=int, help="Replay only the first N requests")
+    parser.add_argument("--duration", type=float, help="Replay only the first N recorded seconds")
+    parser.add_argument("--max-in-flight", type=int, default=256, help="Cap on concurrent requests")
+    parser.add_argument("--tasks-per-user", type=int, default=25, help="Filler tasks per user")
+    parser.add_argument("--store-latency-ms", type=float, default=0.0, help="Injected latency per Firestore operation")
+    parser.add_argument("--auth-latency-ms", type=float, default=0.0, help="Injected latency per Firebase Auth call")
+    parser.add_argument("--faults", type=Path, help="JSON file with fault rules per service (see README)")
+    parser.add_argument("--workdir", help="Fixtures, service logs and spools (default: a new temp dir)")
+    parser.add_argument("-o", "--output", type=Path, help="Write the comparison as JSON")
+    args = parser.parse_args()
+    if args.speed <= 0:
+        parser.error("--speed must be positive")
+    if args.faults:
+        try:
+            args.faults = load_faults(args.faults)
+        except (OSError, ValueError) as e:
+            parser.error(f"--faults: {e}")
+
+    entries = load_workload(args.workload, args.limit, args.duration)
+    if not entries:
+        parser.error(f"no requests in {args.workload}")
+    workdir = Path(args.workdir or tempfile.mkdtemp(prefix="kubernetes-sd-replay-"))
+    data = build_fixtures(entries, args.tasks_per_user)
+    users = [user["uid"] for user in data["users"]]
+    paths = write_fixtures(workdir / "fixtures", data)
+
+    span = entries[-1]["t"] / args.speed
+    print(f"Replaying {len(entries)} requests from {len(users) - 1} users over {span:.1f}s (speed x{args.speed:g})")
+    with ServiceStack(workdir / "stack", paths, args.store_latency_ms, args.auth_latency_ms, args.faults) as stack:
+        result = asyncio.run(replay(entries, stack, users, args.speed, args.max_in_flight))
+
+    report = compare_latencies(entries, result)
+    _print_report(report)
+    print(f"\nSchedule lag p99: {result['schedule_lag_p99_ms']} ms (high values mean the replayer fell behind)")
+    print(f"Service output under {workdir}")
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps({
+            "workload": str(args.workload),
+            "settings": {key: getattr(args, key) for key in
+                         ("speed", "limit", "duration", "max_in_flight", "store_latency_ms", "auth_latency_ms",
+                          "faults")},
+            "elapsed_seconds": result["elapsed_seconds"],
+            "schedule_lag_p99_ms": result["schedule_lag_p99_ms"],
+            "routes": report,
+        }, indent=2), encoding="utf-8")
+        print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
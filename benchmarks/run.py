@@ -0,0 +1,135 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict
+
+import fixtures
+from compare import compare, format_rows
+from load import run_closed_loop
+from scenarios import SCENARIOS
+from stack import ROOT, ServiceStack, load_faults
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _print_result(name: str, result: Dict[str, Any]) -> None:
+    print(f"\n{name}: {result['requests']} requests, {result['errors']} errors, {result['throughput_rps']} req/s")
+    for endpoint, stats in result["endpoints"].items():
+        items = f"  {stats['items_per_second']} items/s" if stats["items_per_second"] != stats["throughput_rps"] else ""
+        print(
+            f"  {endpoint:<36} p50 {stats['p50_ms']:>8.2f} ms  p95 {stats['p95_ms']:>8.2f} ms  "
+            f"p99 {stats['p99_ms']:>8.2f} ms  {stats['throughput_rps']:>8.1f} req/s{items}"
+        )
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    workdir = Path(args.workdir or tempfile.mkdtemp(prefix="kubernetes-sd-bench-"))
+    paths = fixtures.write(workdir / "fixtures", tasks=args.tasks, collaborators=args.collaborators)
+    results: Dict[str, Any] = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "settings": {
+                key: getattr(args, key)
+                for key in ("concurrency", "duration", "warmup", "tasks", "collaborators",
+                            "store_latency_ms", "auth_latency_ms")
+            },
+            "faults": args.faults,
+        },
+        "scenarios": {},
+    }
+
+    def _stack(name: str) -> ServiceStack:
+        return ServiceStack(workdir / name, paths, args.store_latency_ms, args.auth_latency_ms, args.faults)
+
+    # Por defecto cada escenario arranca servicios nuevos: ni cachés calientes ni datos de otro escenario
+    shared = _stack("stack").start() if args.reuse_stack else None
+    try:
+        for name in args.scenarios:
+            scenario = SCENARIOS[name]
+            stack = shared or _stack(name).start()
+            try:
+                result = asyncio.run(
+                    run_closed_loop(scenario.build(stack), args.concurrency, args.duration, args.warmup)
+                )
+            finally:
+                if stack is not shared:
+                    stack.stop()
+            results["scenarios"][name] = result
+            _print_result(name, result)
+    finally:
+        if shared:
+            shared.stop()
+    print(f"\nService output under {workdir}")
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="End-to-end benchmarks of the four services running locally with in-memory backends"
+    )
+    parser.add_argument("scenarios", nargs="*", help=f"Default: all ({', '.join(SCENARIOS)})")
+    parser.add_argument("--list", action="store_true", help="List the scenarios and exit")
+    parser.add_argument("-c", "--concurrency", type=int, default=16)
+    parser.add_argument("-d", "--duration", type=float, default=10.0, help="Measured seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Unmeasured seconds before each scenario")
+    parser.add_argument("--tasks", type=int, default=1000, help="Tasks of the benchmark owner")
+    parser.add_argument("--collaborators", type=int, default=20, help="Collaborators of the shared task")
+    parser.add_argument("--store-latency-ms", type=float, default=0.0, help="Injected latency per Firestore operation")
+    parser.add_argument("--auth-latency-ms", type=float, default=0.0, help="Injected latency per Firebase Auth call")
+    parser.add_argument("--faults", type=Path, help="JSON file with fault rules per service (see README)")
+    parser.add_argument("--reuse-stack", action="store_true", help="Run every scenario against the same processes")
+    parser.add_argument("--workdir", help="Fixtures, service logs and spools (default: a new temp dir)")
+    parser.add_argument("-o", "--output", type=Path, help="Write the results as JSON")
+    parser.add_argument("--baseline", type=Path, help="Results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative slowdown (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    if args.list:
+        for scenario in SCENARIOS.values():
+            print(f"{scenario.name:<14} {scenario.description}")
+        return 0
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+    args.scenarios = args.scenarios or list(SCENARIOS)
+    if args.faults:
+        try:
+            args.faults = load_faults(args.faults)
+        except (OSError, ValueError) as e:
+            parser.error(f"--faults: {e}")
+
+    results = run(args)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        rows, regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+        print("\n" + format_rows(rows))
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+import random
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict
+
+import fixtures
+from load import Request
+from stack import ServiceStack
+
+
+@dataclass
+class Scenario:
+    name: str
+    description: str
+    build: Callable[[ServiceStack], Callable[[int], Request]]
+
+
+def _auth(uid: str = fixtures.OWNER) -> Dict[str, str]:
+    return {"Authorization": f"Bearer {fixtures.token(uid)}"}
+
+
+def _list(stack: ServiceStack) -> Callable[[int], Request]:
+    url = f"{stack.url('tasks')}/api/tasks"
+    return lambda i: Request("GET /api/tasks", "GET", url, _auth())
+
+
+def _search(stack: ServiceStack) -> Callable[[int], Request]:
+    url = f"{stack.url('tasks')}/api/tasks"
+    words = fixtures.WORDS
+    return lambda i: Request("GET /api/tasks?search", "GET", url, _auth(), params={"search": words[i % len(words)]})
+
+
+def _toggle(stack: ServiceStack, hot: int = 10) -> Callable[[int], Request]:
+    # Pocas tareas para muchas peticiones concurrentes: todas escriben sobre los mismos documentos
+    base = f"{stack.url('tasks')}/api/tasks"
+    return lambda i: Request(
+        "PATCH /api/tasks/{task_id}/toggle", "PATCH", f"{base}/bench-task-{i % hot:05d}/toggle", _auth()
+    )
+
+
+def _enrich(stack: ServiceStack) -> Callable[[int], Request]:
+    url = f"{stack.url('collaborators')}/api/collaborators/{fixtures.SHARED_TASK}"
+    return lambda i: Request("GET /api/collaborators/{task_id}", "GET", url, _auth())
+
+
+def _log_burst(stack: ServiceStack, batch: int = 200) -> Callable[[int], Request]:
+    url = f"{stack.url('logs')}/api/logs/batch"
+    rnd = random.Random(11)
+    routes = ["/api/tasks", "/api/tasks/{task_id}", "/api/collaborators/{task_id}", "/api/auth/verify"]
+
+    def _record(n: int) -> Dict:
+        if n % 4:
+            # La mayoría son request logs, como los que envían los log shippers
+            route = rnd.choice(routes)
+            return {
+                "level": "info",
+                "message": f"GET {route} 200",
+                "ts": time.time(),
+                "meta": {
+                    "service": "bench", "kind": "request", "method": "GET", "route": route,
+                    "path": route, "status": 200, "duration_ms": round(rnd.uniform(2, 80), 3),
+                },
+            }
+        return {
+            "level": rnd.choice(["info", "warning", "error"]),
+            "message": "get_tasks",
+            "user": fixtures.OWNER,
+            "ts": time.time(),
+            "meta": {"service": "bench", "count": rnd.randint(0, 1000)},
+        }
+
+    return lambda i: Request(
+        "POST /api/logs/batch", "POST", url, json={"records": [_record(n) for n in range(batch)]}, items=batch
+    )
+
+
+SCENARIOS = {
+    s.name: s
+    for s in [
+        Scenario("list_1k", "List the 1k tasks of one owner", _list),
+        Scenario("search", "Search the owner's 1k tasks, rotating terms", _search),
+        Scenario("toggle_storm", "Concurrent toggles over 10 hot tasks", _toggle),
+        Scenario("enrich_20", "Collaborators of a task shared with 20 users", _enrich),
+        Scenario("log_burst", "Batches of 200 records into the logs service", _log_burst),
+    ]
+}
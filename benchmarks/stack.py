@@ -0,0 +1,140 @@
+import json
+import os
+import secrets
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Orden de arranque: cada servicio encuentra ya levantados aquellos a los que llama
+SERVICES = {
+    "logs": "logs_service",
+    "auth": "auth_service",
+    "tasks": "tasks_service",
+    "collaborators": "collaborator_service",
+}
+
+
+def load_faults(path: Path) -> Dict[str, Any]:
+    """Fault rules per service from a JSON file: ``{"tasks": {"auth": {"latency_ms": 200}}, ...}``"""
+    faults = json.loads(Path(path).read_text(encoding="utf-8"))
+    # El logs_service no hace llamadas salientes: no hay nada en él que degradar
+    unknown = set(faults) - (set(SERVICES) - {"logs"})
+    if unknown:
+        raise ValueError(f"no fault injection in: {', '.join(sorted(unknown))}")
+    return faults
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class ServiceStack:
+    """The four services as local uvicorn processes, with in-memory identity and task backends.
+
+    Each service runs from its own directory (they all import top-level
+    ``core``/``main`` modules, so they cannot share one interpreter), on a
+    free port, with logs, spools and output under ``workdir``. ``faults`` maps
+    a service name to the fault rules it starts with (its ``FAULT_INJECTION``).
+    """
+
+    def __init__(
+        self,
+        workdir: Path,
+        fixtures: Dict[str, Path],
+        store_latency_ms: float = 0.0,
+        auth_latency_ms: float = 0.0,
+        faults: Optional[Dict[str, Any]] = None,
+    ):
+        self.workdir = workdir
+        self.fixtures = fixtures
+        self.store_latency_ms = store_latency_ms
+        self.auth_latency_ms = auth_latency_ms
+        self.faults = faults or {}
+        self.ports = {name: free_port() for name in SERVICES}
+        # Las búsquedas y exports del logs_service piden X-Debug-Token
+        self.debug_token = os.environ.get("DEBUG_TOKEN") or secrets.token_hex(16)
+        self._processes: Dict[str, subprocess.Popen] = {}
+
+    def url(self, name: str) -> str:
+        return f"http://127.0.0.1:{self.ports[name]}"
+
+    def _env(self, name: str) -> Dict[str, str]:
+        env = dict(os.environ)
+        env.update({
+            "PYTHONUNBUFFERED": "1",
+            "LOGS_SERVICE_URL": self.url("logs"),
+            "AUTH_SERVICE_URL": self.url("auth"),
+            "LOG_SPOOL_DIR": str(self.workdir / "spool" / name),
+            # Identidad y Firestore locales: sin credenciales ni red
+            "AUTH_BACKEND": "memory",
+            "AUTH_MEMORY_USERS_FILE": str(self.fixtures["users"]),
+            "AUTH_MEMORY_LATENCY_MS": str(self.auth_latency_ms),
+            "TASK_REPOSITORY": "memory",
+            "MEMORY_REPOSITORY_SEED_FILE": str(self.fixtures["tasks"]),
+            "MEMORY_REPOSITORY_LATENCY_MS": str(self.store_latency_ms),
+            "LOG_DIR": str(self.workdir / "logs_service"),
+            "DEBUG_TOKEN": self.debug_token,
+        })
+        # Un único usuario a miles de req/s: sin esto casi todo serían 429 (exportar
+        # RATE_LIMIT_ENABLED=true para medir con el limitador)
+        env.setdefault("RATE_LIMIT_ENABLED", "false")
+        if name in self.faults:
+            env["FAULT_INJECTION"] = json.dumps(self.faults[name])
+        return env
+
+    def start(self, timeout: float = 30.0) -> "ServiceStack":
+        (self.workdir / "output").mkdir(parents=True, exist_ok=True)
+        for name in SERVICES:
+            output = open(self.workdir / "output" / f"{name}.log", "wb")
+            self._processes[name] = subprocess.Popen(
+                [
+                    sys.executable, "-m", "uvicorn", "main:app",
+                    "--host", "127.0.0.1", "--port", str(self.ports[name]),
+                    "--log-level", "warning", "--no-access-log",
+                ],
+                cwd=ROOT / SERVICES[name],
+                env=self._env(name),
+                stdout=output,
+                stderr=subprocess.STDOUT,
+            )
+            output.close()
+            self._wait_healthy(name, timeout)
+        return self
+
+    def _wait_healthy(self, name: str, timeout: float) -> None:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self._processes[name].poll() is not None:
+                raise RuntimeError(f"{name} exited during startup, see {self.workdir / 'output' / f'{name}.log'}")
+            try:
+                if httpx.get(f"{self.url(name)}/health", timeout=1.0).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.2)
+        raise RuntimeError(f"{name} was not healthy after {timeout}s")
+
+    def stop(self) -> None:
+        for process in reversed(list(self._processes.values())):
+            process.terminate()
+        for process in self._processes.values():
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        self._processes.clear()
+
+    def __enter__(self) -> "ServiceStack":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
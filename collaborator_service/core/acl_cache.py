@@ -0,0 +1,150 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+# subscribe(task_id, on_change) -> objeto con unsubscribe(); on_change(task_id, task | None)
+Subscriber = Callable[[str, Callable[[str, Optional[Dict[str, Any]]], None]], Any]
+
+
+class TaskAcl:
+    """Owner and collaborators of one task (plus the stored profiles used to list them)"""
+
+    __slots__ = ("owner_id", "collaborators", "profiles", "loaded_at")
+
+    def __init__(self, task: Dict[str, Any]):
+        self.owner_id: Optional[str] = task.get("owner_id")
+        self.collaborators: List[str] = list(task.get("collaborators", []))
+        self.profiles: Dict[str, Any] = dict(task.get("collaborator_profiles") or {})
+        self.loaded_at = time.monotonic()
+
+    def can_read(self, user_id: str) -> bool:
+        return user_id == self.owner_id or user_id in self.collaborators
+
+    def as_task(self, task_id: str) -> Dict[str, Any]:
+        return {
+            "id": task_id,
+            "owner_id": self.owner_id,
+            "collaborators": list(self.collaborators),
+            "collaborator_profiles": dict(self.profiles),
+        }
+
+
+class TaskAclCache:
+    """In-process ACL cache keyed by task_id, bounded by ``max_entries`` (LRU) and ``ttl``.
+
+    Entries are replaced by this service's own mutations and, when ``subscribe``
+    is given, kept fresh by a snapshot listener per cached task (detached on
+    eviction). The TTL bounds staleness if a listener silently stops.
+    """
+
+    def __init__(self, ttl: float = 300.0, max_entries: int = 512, subscribe: Optional[Subscriber] = None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.subscribe = subscribe
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, TaskAcl]" = OrderedDict()
+        self._listeners: Dict[str, Any] = {}
+
+        # Métricas
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._listener_updates = 0
+
+    def get(self, task_id: str) -> Optional[TaskAcl]:
+        with self._lock:
+            entry = self._entries.get(task_id)
+            if entry is None or time.monotonic() - entry.loaded_at > self.ttl:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(task_id)
+            self._hits += 1
+            return entry
+
+    def put(self, task_id: str, task: Dict[str, Any]) -> TaskAcl:
+        entry = TaskAcl(task)
+        evicted: List[Any] = []
+        with self._lock:
+            self._entries[task_id] = entry
+            self._entries.move_to_end(task_id)
+            while len(self._entries) > self.max_entries:
+                old_id, _ = self._entries.popitem(last=False)
+                self._evictions += 1
+                if old_id in self._listeners:
+                    evicted.append(self._listeners.pop(old_id))
+            listen = self.subscribe is not None and task_id not in self._listeners
+            if listen:
+                self._listeners[task_id] = None  # Reservado: evita dos listeners para la misma tarea
+
+        for listener in evicted:
+            self._unsubscribe(listener)
+        if listen:
+            self._listen(task_id)
+        return entry
+
+    def invalidate(self, task_id: str) -> None:
+        with self._lock:
+            self._entries.pop(task_id, None)
+            listener = self._listeners.pop(task_id, None)
+        self._unsubscribe(listener)
+
+    def _listen(self, task_id: str) -> None:
+        try:
+            listener = self.subscribe(task_id, self._on_change)
+        except Exception:
+            with self._lock:
+                self._listeners.pop(task_id, None)
+            return  # Sin listener la entrada sigue valiendo hasta su TTL
+        with self._lock:
+            if task_id in self._listeners and task_id in self._entries:
+                self._listeners[task_id] = listener
+                return
+        self._unsubscribe(listener)  # La entrada se expulsó mientras se creaba
+
+    def _on_change(self, task_id: str, task: Optional[Dict[str, Any]]) -> None:
+        """Listener callback (runs on the listener's own thread)"""
+        listener = None
+        with self._lock:
+            if task_id not in self._entries:
+                return
+            self._listener_updates += 1
+            if task is not None:
+                self._entries[task_id] = TaskAcl(task)
+                return
+            # Tarea borrada
+            del self._entries[task_id]
+            listener = self._listeners.pop(task_id, None)
+        # No se puede cerrar un listener desde su propio hilo
+        threading.Thread(target=self._unsubscribe, args=(listener,), daemon=True).start()
+
+    @staticmethod
+    def _unsubscribe(listener: Any) -> None:
+        if listener is None:
+            return
+        try:
+            listener.unsubscribe()
+        except Exception:
+            pass
+
+    def close(self) -> None:
+        with self._lock:
+            listeners = list(self._listeners.values())
+            self._listeners.clear()
+            self._entries.clear()
+        for listener in listeners:
+            self._unsubscribe(listener)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._hits + self._misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "listeners": sum(1 for l in self._listeners.values() if l is not None),
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            "evictions": self._evictions,
+            "listener_updates": self._listener_updates,
+        }
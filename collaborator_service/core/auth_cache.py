@@ -0,0 +1,118 @@
+import base64
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+def token_expiry(token: str) -> Optional[float]:
+    """``exp`` claim (epoch seconds) of a JWT, None for opaque tokens.
+
+    The signature is not checked: it is only read for tokens the auth service
+    already accepted, to know how long their claims may be reused.
+    """
+    parts = token.split(".")
+    if len(parts) != 3:
+        return None
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(parts[1] + "=" * (-len(parts[1]) % 4)))
+        return float(payload["exp"])
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+def _key(token: str) -> str:
+    # El token en claro no se guarda como clave
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class VerifiedClaims:
+    """User info the auth service returned for one token, and when"""
+
+    __slots__ = ("user", "verified_at", "expires_at")
+
+    def __init__(self, user: Dict[str, Any], expires_at: Optional[float]):
+        self.user = user
+        self.verified_at = time.monotonic()
+        self.expires_at = expires_at
+
+    def age(self) -> float:
+        return time.monotonic() - self.verified_at
+
+
+class ClaimsCache:
+    """Recently verified tokens, bounded by ``max_entries`` (LRU).
+
+    An entry is fresh for ``ttl`` seconds after its verification. After that it
+    is stale but still usable while the token is within its ``exp`` and for at
+    most ``max_stale`` seconds, so a token revoked during an outage is not
+    trusted forever. Tokens without ``exp`` (opaque) are only bounded by
+    ``max_stale``.
+    """
+
+    def __init__(self, ttl: float = 30.0, max_stale: float = 900.0, max_entries: int = 10_000):
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, VerifiedClaims]" = OrderedDict()
+
+        # Métricas
+        self._hits = 0
+        self._misses = 0
+        self._stale_hits = 0
+        self._evictions = 0
+
+    def _usable(self, entry: VerifiedClaims) -> bool:
+        if entry.expires_at is not None and time.time() >= entry.expires_at:
+            return False
+        return entry.age() <= self.max_stale
+
+    def get(self, token: str) -> Optional[VerifiedClaims]:
+        """The usable entry of ``token`` (fresh or stale), else None"""
+        key = _key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not self._usable(entry):
+                if entry is not None:
+                    del self._entries[key]
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            if not self.is_fresh(entry):
+                self._stale_hits += 1
+            return entry
+
+    def is_fresh(self, entry: VerifiedClaims) -> bool:
+        return entry.age() < self.ttl
+
+    def put(self, token: str, user: Dict[str, Any]) -> None:
+        entry = VerifiedClaims(user, token_expiry(token))
+        key = _key(token)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, token: str) -> None:
+        with self._lock:
+            self._entries.pop(_key(token), None)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._hits + self._misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "max_stale": self.max_stale,
+            "hits": self._hits,
+            "misses": self._misses,
+            "stale_hits": self._stale_hits,
+            "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            "evictions": self._evictions,
+        }
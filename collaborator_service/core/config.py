@@ -24,6 +24,15 @@ FIREBASE_CRED_PATH = os.getenv(
     str(SECRETS_DIR / "kubernetes-sd.json")
 )
 
+# Repositorio de tareas: "firestore" o "memory" (pruebas de carga y benchmarks sin credenciales ni red)
+TASK_REPOSITORY = os.getenv("TASK_REPOSITORY", "firestore").lower()
+TASKS_COLLECTION = os.getenv("TASKS_COLLECTION", "tasks")
+# Latencia simulada por operación del backend en memoria (base + jitter uniforme)
+MEMORY_REPOSITORY_LATENCY_MS = float(os.getenv("MEMORY_REPOSITORY_LATENCY_MS", "0"))
+MEMORY_REPOSITORY_JITTER_MS = float(os.getenv("MEMORY_REPOSITORY_JITTER_MS", "0"))
+# Documentos iniciales del backend en memoria (lista JSON; la genera benchmarks/fixtures.py)
+MEMORY_REPOSITORY_SEED_FILE = os.getenv("MEMORY_REPOSITORY_SEED_FILE", "")
+
 # Logging
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 LOG_FORMAT = os.getenv(
@@ -34,4 +43,91 @@ LOG_FORMAT = os.getenv(
 # Service URLs
 AUTH_SERVICE_URL = os.getenv("AUTH_SERVICE_URL", "http://auth-service:8000") + "/api/auth"
 TASKS_SERVICE_URL = os.getenv("TASKS_SERVICE_URL", "http://tasks-service:8001")
-LOGS_SERVICE_URL = os.getenv("LOGS_SERVICE_URL", "http://logs-service:8003") + "/api/logs/client"
\ No newline at end of file
+LOGS_SERVICE_URL = os.getenv("LOGS_SERVICE_URL", "http://logs-service:8003") + "/api/logs/client"
+LOGS_BATCH_URL = os.getenv("LOGS_SERVICE_URL", "http://logs-service:8003") + "/api/logs/batch"
+LOG_POLICY_URL = os.getenv("LOGS_SERVICE_URL", "http://logs-service:8003") + "/api/logs/policy"
+LOG_POLICY_REFRESH_SECONDS = float(os.getenv("LOG_POLICY_REFRESH_SECONDS", "30"))
+
+# Envío de logs: cola en memoria + spool local cuando el logs_service no responde
+# (cada proceso usa su propio subdirectorio worker-N; LOG_SPOOL_MAX_BYTES es por proceso)
+LOG_SPOOL_DIR = Path(os.getenv("LOG_SPOOL_DIR", str(BASE_DIR / "log_spool")))
+LOG_SPOOL_MAX_BYTES = int(os.getenv("LOG_SPOOL_MAX_BYTES", str(64 * 1024 * 1024)))
+LOG_SPOOL_FILE_BYTES = int(os.getenv("LOG_SPOOL_FILE_BYTES", str(1024 * 1024)))
+LOG_SHIP_QUEUE_SIZE = int(os.getenv("LOG_SHIP_QUEUE_SIZE", "10000"))
+LOG_SHIP_BATCH_SIZE = int(os.getenv("LOG_SHIP_BATCH_SIZE", "200"))
+LOG_SHIP_FLUSH_INTERVAL = float(os.getenv("LOG_SHIP_FLUSH_INTERVAL", "0.5"))
+LOG_SHIP_TIMEOUT = float(os.getenv("LOG_SHIP_TIMEOUT", "2"))
+LOG_BREAKER_FAILURES = int(os.getenv("LOG_BREAKER_FAILURES", "3"))
+LOG_BREAKER_RESET_SECONDS = float(os.getenv("LOG_BREAKER_RESET_SECONDS", "10"))
+
+# Consultas al auth_service (cliente httpx compartido)
+AUTH_REQUEST_TIMEOUT = float(os.getenv("AUTH_REQUEST_TIMEOUT", "3"))
+AUTH_MAX_CONNECTIONS = int(os.getenv("AUTH_MAX_CONNECTIONS", "20"))
+AUTH_LOOKUP_CONCURRENCY = int(os.getenv("AUTH_LOOKUP_CONCURRENCY", "8"))  # Por petición
+
+# Perfiles de colaboradores guardados en la tarea: edad máxima antes de refrescarlos
+COLLABORATOR_PROFILE_MAX_AGE = int(os.getenv("COLLABORATOR_PROFILE_MAX_AGE", "3600"))
+COLLABORATOR_BATCH_MAX = int(os.getenv("COLLABORATOR_BATCH_MAX", "100"))  # Entradas por POST /{task_id}:batch
+
+# Caché de ACL por tarea (dueño + colaboradores)
+ACL_CACHE_TTL = float(os.getenv("ACL_CACHE_TTL", "300"))
+ACL_CACHE_MAX_ENTRIES = int(os.getenv("ACL_CACHE_MAX_ENTRIES", "512"))
+ACL_CACHE_LISTEN = os.getenv("ACL_CACHE_LISTEN", "True").lower() in ("true", "1", "t")  # Listener de Firestore por tarea
+
+# Endpoints /debug (perfil de CPU y heap, reglas de fallos): desactivados si DEBUG_TOKEN está vacío
+DEBUG_TOKEN = os.getenv("DEBUG_TOKEN", "")
+DEBUG_PROFILE_MAX_SECONDS = float(os.getenv("DEBUG_PROFILE_MAX_SECONDS", "60"))
+
+# Inyección de latencia, errores y timeouts en las llamadas salientes (auth, firestore, logs).
+# Desactivada si está vacía; JSON {"target" o "target:operación": regla} o ruta a un fichero con ese JSON
+FAULT_INJECTION = os.getenv("FAULT_INJECTION", "")
+FAULT_INJECTION_SEED = os.getenv("FAULT_INJECTION_SEED", "")
+
+# Control de admisión: límite de concurrencia adaptado a la latencia; el exceso se rechaza con 503
+ADMISSION_CONTROL = os.getenv("ADMISSION_CONTROL", "True").lower() in ("true", "1", "t")
+ADMISSION_INITIAL_LIMIT = int(os.getenv("ADMISSION_INITIAL_LIMIT", "50"))
+ADMISSION_MIN_LIMIT = int(os.getenv("ADMISSION_MIN_LIMIT", "8"))
+ADMISSION_MAX_LIMIT = int(os.getenv("ADMISSION_MAX_LIMIT", "500"))
+# Parte del límite que pueden ocupar las lecturas: bajo presión se rechazan antes que las escrituras
+ADMISSION_READ_SHARE = float(os.getenv("ADMISSION_READ_SHARE", "0.8"))
+# Espera máxima por una plaza antes del 503 (0: rechazo inmediato) y tamaño de esa cola
+ADMISSION_QUEUE_TIMEOUT_MS = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_MS", "100"))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "100"))
+
+# Rate limiting por IP (antes de autenticar) y por usuario (uid de get_current_user), con token buckets
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "True").lower() in ("true", "1", "t")
+# "N/second|minute|hour" con ráfaga opcional: "10/second, burst=20" (sin burst: la ventana entera)
+RATE_LIMIT_USER = os.getenv("RATE_LIMIT_USER", "300/minute")
+RATE_LIMIT_IP = os.getenv("RATE_LIMIT_IP", "1200/minute")
+# Límites propios por ruta: JSON {"GET /api/collaborators/{task_id}": "60/minute"}
+RATE_LIMIT_ROUTES = os.getenv("RATE_LIMIT_ROUTES", "{}")
+# Proxies de confianza delante del servicio (ingress): la IP cliente es la que vio el más cercano
+RATE_LIMIT_TRUSTED_PROXIES = int(os.getenv("RATE_LIMIT_TRUSTED_PROXIES", "1"))
+# Dónde viven los cubos: "memory" (por proceso); la interfaz admite un almacén compartido
+RATE_LIMIT_STORE = os.getenv("RATE_LIMIT_STORE", "memory").lower()
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+
+# Plazo de cada request entrante (o el X-Request-Timeout-Ms del llamante si es menor):
+# las llamadas a otros servicios reciben como mucho el tiempo que le queda
+REQUEST_DEADLINE_MS = float(os.getenv("REQUEST_DEADLINE_MS", "10000"))
+# Llamadas salientes: hedge (segundo intento en paralelo) tras el percentil de latencia de la operación
+OUTBOUND_HEDGING = os.getenv("OUTBOUND_HEDGING", "True").lower() in ("true", "1", "t")
+OUTBOUND_HEDGE_PERCENTILE = float(os.getenv("OUTBOUND_HEDGE_PERCENTILE", "95"))
+OUTBOUND_HEDGE_MIN_DELAY_MS = float(os.getenv("OUTBOUND_HEDGE_MIN_DELAY_MS", "5"))
+OUTBOUND_HEDGE_MIN_SAMPLES = int(os.getenv("OUTBOUND_HEDGE_MIN_SAMPLES", "20"))
+# Intentos por llamada, contando el hedge o el reintento
+OUTBOUND_MAX_ATTEMPTS = int(os.getenv("OUTBOUND_MAX_ATTEMPTS", "2"))
+# Presupuesto de reintentos por destino: hedges + reintentos <= RATIO de las llamadas (más un mínimo por segundo)
+RETRY_BUDGET_RATIO = float(os.getenv("RETRY_BUDGET_RATIO", "0.1"))
+RETRY_BUDGET_MIN_PER_SECOND = float(os.getenv("RETRY_BUDGET_MIN_PER_SECOND", "1"))
+RETRY_BUDGET_MAX_TOKENS = float(os.getenv("RETRY_BUDGET_MAX_TOKENS", "10"))
+
+# Claims de tokens ya verificados (stale-while-revalidate): frescos AUTH_CACHE_TTL_SECONDS sin llamar al auth;
+# después se siguen sirviendo, revalidados en segundo plano, mientras el token no expire (exp)
+# y como mucho AUTH_CACHE_MAX_STALE_SECONDS desde la última verificación (0: sin reutilizar claims)
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "30"))
+AUTH_CACHE_MAX_STALE_SECONDS = float(os.getenv("AUTH_CACHE_MAX_STALE_SECONDS", "900"))
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+# Circuit breaker hacia el auth: abierto tras N fallos seguidos, deja pasar una prueba cada RESET segundos
+AUTH_BREAKER_FAILURES = int(os.getenv("AUTH_BREAKER_FAILURES", "5"))
+AUTH_BREAKER_RESET_SECONDS = float(os.getenv("AUTH_BREAKER_RESET_SECONDS", "5"))
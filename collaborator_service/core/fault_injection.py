@@ -0,0 +1,184 @@
+import asyncio
+import json
+import math
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from core import config
+
+DISTRIBUTIONS = ("uniform", "exponential", "lognormal")
+
+
+class InjectedFault(RuntimeError):
+    """Error raised in place of a downstream call by a fault rule"""
+
+
+class InjectedTimeout(TimeoutError):
+    """Raised after holding a call for ``timeout_ms``, as a client-side timeout would"""
+
+
+@dataclass
+class FaultRule:
+    """Latency, errors and timeouts added to the calls of one target (or ``target:operation``).
+
+    Latency is ``latency_ms`` plus uniform jitter, an exponential with mean
+    ``latency_ms`` or a lognormal with median ``latency_ms``; ``slow_rate`` of the
+    calls also wait ``slow_ms`` (the tail of a degraded dependency).
+    """
+
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    distribution: str = "uniform"
+    sigma: float = 0.5
+    slow_rate: float = 0.0
+    slow_ms: float = 0.0
+    error_rate: float = 0.0
+    timeout_rate: float = 0.0
+    timeout_ms: float = 5000.0
+
+    def __post_init__(self):
+        if self.distribution not in DISTRIBUTIONS:
+            raise ValueError(f"distribution must be one of {', '.join(DISTRIBUTIONS)}")
+        for name in ("slow_rate", "error_rate", "timeout_rate"):
+            if not 0.0 <= getattr(self, name) <= 1.0:
+                raise ValueError(f"{name} must be between 0 and 1")
+        for name in ("latency_ms", "jitter_ms", "sigma", "slow_ms", "timeout_ms"):
+            if getattr(self, name) < 0:
+                raise ValueError(f"{name} must not be negative")
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "FaultRule":
+        known = {f.name for f in fields(cls)}
+        unknown = set(data) - known
+        if unknown:
+            raise ValueError(f"unknown fault settings: {', '.join(sorted(unknown))}")
+        try:
+            return cls(**{k: v if k == "distribution" else float(v) for k, v in data.items()})
+        except (TypeError, ValueError) as e:
+            raise ValueError(str(e))
+
+    def delay(self, rnd: random.Random) -> float:
+        """Seconds to hold one call"""
+        ms = 0.0
+        if self.latency_ms:
+            if self.distribution == "exponential":
+                ms = rnd.expovariate(1.0 / self.latency_ms)
+            elif self.distribution == "lognormal":
+                ms = rnd.lognormvariate(math.log(self.latency_ms), self.sigma)
+            else:
+                ms = self.latency_ms + rnd.uniform(0, self.jitter_ms)
+        if self.slow_rate and rnd.random() < self.slow_rate:
+            ms += self.slow_ms
+        return ms / 1000
+
+
+class FaultInjector:
+    """Fault rules of this process, keyed by ``target`` or ``target:operation`` (the latter wins).
+
+    ``observe_outbound`` asks it before every call to another system. Without
+    rules ``inject`` returns at once, so leaving it off costs one dict check.
+    """
+
+    def __init__(self, rules: Optional[Dict[str, Dict[str, Any]]] = None, seed: Optional[int] = None):
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._rules: Dict[str, FaultRule] = {}
+        self._stats: Dict[str, Counter] = {}
+        if rules:
+            self.configure(rules)
+
+    def configure(self, rules: Dict[str, Dict[str, Any]]) -> None:
+        """Replace every rule; nothing changes if any of them is invalid"""
+        if not isinstance(rules, dict):
+            raise ValueError("fault rules must be an object keyed by target")
+        parsed = {}
+        for key, rule in rules.items():
+            if not isinstance(rule, dict):
+                raise ValueError(f"{key}: rule must be an object")
+            try:
+                parsed[key] = FaultRule.from_dict(rule)
+            except ValueError as e:
+                raise ValueError(f"{key}: {e}")
+        with self._lock:
+            self._rules = parsed
+            self._stats = {}
+
+    def clear(self) -> None:
+        self.configure({})
+
+    def rules(self) -> Dict[str, Dict[str, Any]]:
+        return {key: asdict(rule) for key, rule in self._rules.items()}
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {key: dict(counts) for key, counts in self._stats.items()}
+
+    def _plan(self, target: str, operation: str) -> Optional[Tuple[float, Optional[Exception]]]:
+        """``(seconds to wait, exception to raise after waiting)`` for one call, or None"""
+        rules = self._rules
+        if not rules:
+            return None
+        key = f"{target}:{operation}"
+        rule = rules.get(key)
+        if rule is None:
+            key, rule = target, rules.get(target)
+            if rule is None:
+                return None
+        with self._lock:
+            counts = self._stats.setdefault(key, Counter())
+            counts["calls"] += 1
+            if rule.timeout_rate and self._random.random() < rule.timeout_rate:
+                counts["timeouts"] += 1
+                error = InjectedTimeout(f"injected timeout after {rule.timeout_ms:g} ms calling {target} {operation}")
+                return rule.timeout_ms / 1000, error
+            seconds = rule.delay(self._random)
+            error = None
+            if rule.error_rate and self._random.random() < rule.error_rate:
+                counts["errors"] += 1
+                error = InjectedFault(f"injected error calling {target} {operation}")
+            if seconds:
+                counts["delayed"] += 1
+                counts["delay_ms"] += round(seconds * 1000, 3)
+        return seconds, error
+
+    def inject(self, target: str, operation: str) -> None:
+        """Apply the rule of a blocking call: sleeps the thread, as a slow synchronous client would"""
+        plan = self._plan(target, operation)
+        if plan is None:
+            return
+        seconds, error = plan
+        if seconds:
+            time.sleep(seconds)
+        if error is not None:
+            raise error
+
+    async def ainject(self, target: str, operation: str) -> None:
+        """Apply the rule of an awaited call: only that request waits, the event loop keeps running"""
+        plan = self._plan(target, operation)
+        if plan is None:
+            return
+        seconds, error = plan
+        if seconds:
+            await asyncio.sleep(seconds)
+        if error is not None:
+            raise error
+
+
+def load_rules(value: str) -> Dict[str, Dict[str, Any]]:
+    """Rules from a JSON object or from the path of a file that holds one (empty: no rules)"""
+    value = value.strip()
+    if not value:
+        return {}
+    if not value.startswith("{"):
+        value = Path(value).read_text(encoding="utf-8")
+    return json.loads(value)
+
+
+faults = FaultInjector(
+    load_rules(config.FAULT_INJECTION),
+    int(config.FAULT_INJECTION_SEED) if config.FAULT_INJECTION_SEED else None,
+)
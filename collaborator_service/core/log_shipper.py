@@ -0,0 +1,393 @@
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import requests
+from core.metrics import observe_outbound
+
+try:
+    import fcntl
+except ImportError:  # Windows (desarrollo local): un solo proceso por spool
+    fcntl = None
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Opens after ``failure_threshold`` consecutive failures and lets one probe through after ``reset_timeout``"""
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 10.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+        self.opens = 0
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                return True
+            return False  # Abierto, o ya hay una prueba en curso
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = CLOSED
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self.state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    self.opens += 1
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+
+
+class LogSpool:
+    """Append-only local spool of undelivered records (JSON lines in numbered files).
+
+    New records are appended to the newest file; the replayer consumes from the
+    oldest one and persists its position in ``spool.pos`` so a restart resumes
+    where it stopped. When the spool exceeds ``max_bytes`` the oldest file is
+    discarded. All the workers of a service share ``directory``: each process
+    locks its own ``worker-N`` subdirectory (the first one free), so a worker
+    that restarts takes over and replays what its predecessor left.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = 64 * 1024 * 1024, file_bytes: int = 1024 * 1024):
+        self._lock_file = None
+        self.directory = self._claim(Path(directory))
+        self.max_bytes = max_bytes
+        self.file_bytes = file_bytes
+        self._lock = threading.Lock()
+        self._pos_path = self.directory / "spool.pos"
+
+        self._files: List[int] = sorted(
+            int(p.stem.split("-")[1]) for p in self.directory.glob("spool-*.jsonl")
+        )
+        self._sizes: Dict[int, int] = {seq: self._path(seq).stat().st_size for seq in self._files}
+        self._read_seq, self._read_offset = self._load_position()
+
+        # Métricas
+        self.appended = 0
+        self.dropped = 0
+
+    def _claim(self, root: Path) -> Path:
+        """First ``worker-N`` subdirectory of ``root`` whose lock no live process holds"""
+        if fcntl is None:
+            root.mkdir(parents=True, exist_ok=True)
+            return root
+        for n in itertools.count():
+            slot = root / f"worker-{n}"
+            slot.mkdir(parents=True, exist_ok=True)
+            lock_file = open(slot / "spool.lock", "a")
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                continue  # De otro worker vivo
+            self._lock_file = lock_file
+            return slot
+
+    def release(self) -> None:
+        """Give up the subdirectory so another process can take it over"""
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def _path(self, seq: int) -> Path:
+        return self.directory / f"spool-{seq:08d}.jsonl"
+
+    def _load_position(self) -> Tuple[int, int]:
+        try:
+            seq, offset = self._pos_path.read_text().split()
+            return int(seq), int(offset)
+        except (FileNotFoundError, ValueError):
+            return (self._files[0] if self._files else 0), 0
+
+    def _save_position(self) -> None:
+        tmp = self._pos_path.with_suffix(".tmp")
+        tmp.write_text(f"{self._read_seq} {self._read_offset}")
+        tmp.replace(self._pos_path)
+
+    @property
+    def pending_bytes(self) -> int:
+        with self._lock:
+            total = sum(self._sizes.values())
+            if self._read_seq in self._sizes:
+                total -= min(self._read_offset, self._sizes[self._read_seq])
+            return total
+
+    def append(self, records: List[Dict[str, Any]]) -> None:
+        if not records:
+            return
+        data = "".join(json.dumps(r, default=str, ensure_ascii=False) + "\n" for r in records).encode("utf-8")
+        with self._lock:
+            if not self._files or self._sizes[self._files[-1]] >= self.file_bytes:
+                seq = self._files[-1] + 1 if self._files else self._read_seq
+                self._files.append(seq)
+                self._sizes[seq] = 0
+            seq = self._files[-1]
+            with open(self._path(seq), "ab") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            self._sizes[seq] += len(data)
+            self.appended += len(records)
+            self._enforce_cap()
+
+    def _enforce_cap(self) -> None:
+        while len(self._files) > 1 and sum(self._sizes.values()) > self.max_bytes:
+            seq = self._files.pop(0)
+            path = self._path(seq)
+            try:
+                with open(path, "rb") as f:
+                    if seq == self._read_seq:
+                        f.seek(self._read_offset)
+                    self.dropped += f.read().count(b"\n")
+            except FileNotFoundError:
+                pass
+            path.unlink(missing_ok=True)
+            del self._sizes[seq]
+            if seq == self._read_seq:
+                self._read_seq, self._read_offset = self._files[0], 0
+                self._save_position()
+
+    def peek(self, max_records: int) -> Tuple[List[Dict[str, Any]], List[int]]:
+        """Oldest unsent records and the file offset right after each of them"""
+        with self._lock:
+            if self._read_seq not in self._sizes:
+                if not self._files:
+                    return [], []
+                self._read_seq, self._read_offset = self._files[0], 0
+            size = self._sizes[self._read_seq]
+            with open(self._path(self._read_seq), "rb") as f:
+                f.seek(self._read_offset)
+                data = f.read(size - self._read_offset)
+
+        records: List[Dict[str, Any]] = []
+        ends: List[int] = []
+        offset = self._read_offset
+        for line in data.splitlines(keepends=True):
+            if not line.endswith(b"\n") or len(records) == max_records:
+                break
+            offset += len(line)
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue  # Línea corrupta (p. ej. caída a mitad de escritura)
+            ends.append(offset)
+        if not records and offset > self._read_offset:
+            ends.append(offset)  # Solo líneas corruptas: avanzar igualmente
+        return records, ends
+
+    def commit(self, offset: int) -> None:
+        """Mark everything up to ``offset`` of the current file as delivered"""
+        with self._lock:
+            self._read_offset = offset
+            seq = self._read_seq
+            if offset >= self._sizes.get(seq, 0):
+                # Archivo consumido por completo: se borra y las nuevas escrituras van a otro
+                self._path(seq).unlink(missing_ok=True)
+                self._sizes.pop(seq, None)
+                if seq in self._files:
+                    self._files.remove(seq)
+                self._read_seq = self._files[0] if self._files else seq + 1
+                self._read_offset = 0
+            self._save_position()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "directory": str(self.directory),
+            "files": len(self._files),
+            "pending_bytes": self.pending_bytes,
+            "max_bytes": self.max_bytes,
+            "appended": self.appended,
+            "dropped": self.dropped,
+        }
+
+
+class LogShipper:
+    """Delivers records to logs_service from a background thread.
+
+    ``ship`` only does a non-blocking put on an in-memory queue, so user requests
+    never wait on the logs service. The thread posts batches to ``/api/logs/batch``;
+    while the circuit breaker is open (or a post fails) batches go to the local
+    spool, which is replayed in batches once the service answers again.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        spool: LogSpool,
+        breaker: CircuitBreaker,
+        max_queue_size: int = 10000,
+        batch_size: int = 200,
+        flush_interval: float = 0.5,
+        timeout: float = 2.0,
+        replay_batches: int = 10,
+    ):
+        self.url = url
+        self.spool = spool
+        self.breaker = breaker
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.timeout = timeout
+        self.replay_batches = replay_batches
+
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max_queue_size)
+        self._session = requests.Session()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._start_lock = threading.Lock()
+
+        # Métricas
+        self._sent = 0
+        self._spooled = 0
+        self._replayed = 0
+        self._dropped = 0
+        self._rejected = 0
+        self._failures = 0
+        self._last_error: Optional[str] = None
+        self._last_success: Optional[float] = None
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="log-shipper", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the thread; whatever could not be delivered stays in the spool"""
+        self._stopping.set()
+        if self._thread:
+            self._thread.join(timeout)
+        pending = []
+        while True:
+            try:
+                pending.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        self.spool.append(pending)
+        self._spooled += len(pending)
+
+    def ship(self, record: Dict[str, Any]) -> None:
+        """Queue a record for delivery without blocking"""
+        if self._thread is None or not self._thread.is_alive():
+            self.start()
+        record.setdefault("ts", time.time())
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self._dropped += 1
+
+    def _next_batch(self) -> List[Dict[str, Any]]:
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            batch = self._next_batch()
+            if batch:
+                self._deliver(batch)
+            self._replay()
+
+    def _post(self, records: List[Dict[str, Any]]) -> int:
+        """POST a batch and return how many leading records the logs service is done with"""
+        try:
+            with observe_outbound("logs", "batch"):
+                response = self._session.post(self.url, json={"records": records}, timeout=self.timeout)
+        except Exception as e:
+            self._last_error = str(e)
+            return 0
+        if response.status_code == 200:
+            try:
+                # Entradas que no son objetos: descartadas, no entregadas
+                self._rejected += int(response.json().get("rejected", 0))
+            except Exception:
+                pass
+            return len(records)
+        if response.status_code == 429:
+            # Cola del logs_service saturada: puede haber procesado una parte
+            try:
+                detail = response.json()["detail"]
+                return int(detail.get("processed", detail["accepted"]))
+            except Exception:
+                return 0
+        if 400 <= response.status_code < 500:
+            # Lote inválido: reintentarlo no sirve de nada
+            self._rejected += len(records)
+            return len(records)
+        self._last_error = f"HTTP {response.status_code}"
+        return 0
+
+    def _send(self, records: List[Dict[str, Any]]) -> int:
+        accepted = self._post(records)
+        if accepted == len(records):
+            self.breaker.record_success()
+            self._last_success = time.time()
+        else:
+            self.breaker.record_failure()
+            self._failures += 1
+        return accepted
+
+    def _deliver(self, batch: List[Dict[str, Any]]) -> None:
+        accepted = self._send(batch) if self.breaker.allow() else 0
+        self._sent += accepted
+        if accepted < len(batch):
+            self.spool.append(batch[accepted:])
+            self._spooled += len(batch) - accepted
+
+    def _replay(self) -> None:
+        for _ in range(self.replay_batches):
+            if self._stopping.is_set() or not self.spool.pending_bytes or not self.breaker.allow():
+                return
+            records, ends = self.spool.peek(self.batch_size)
+            if not ends:
+                return
+            accepted = self._send(records) if records else 0
+            if records and not accepted:
+                return
+            self.spool.commit(ends[accepted - 1] if accepted else ends[-1])
+            self._replayed += accepted
+            if accepted < len(records):
+                return
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": bool(self._thread and self._thread.is_alive()),
+            "breaker": self.breaker.state,
+            "breaker_opens": self.breaker.opens,
+            "queue_depth": self._queue.qsize(),
+            "sent": self._sent,
+            "spooled": self._spooled,
+            "replayed": self._replayed,
+            "dropped": self._dropped,
+            "rejected": self._rejected,
+            "failures": self._failures,
+            "last_error": self._last_error,
+            "last_success": self._last_success,
+            "spool": self.spool.stats(),
+        }
@@ -0,0 +1,184 @@
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional, Tuple
+from fastapi import Response
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from core.fault_injection import faults
+from core.tracing import span
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Latency of handled requests by route template",
+    ("method", "route", "status"),
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Requests currently being handled",
+    multiprocess_mode="livesum",
+)
+OUTBOUND_LATENCY = Histogram(
+    "outbound_request_duration_seconds",
+    "Latency of calls to other systems (auth, firestore, logs)",
+    ("target", "operation", "outcome"),
+    buckets=LATENCY_BUCKETS,
+)
+OUTBOUND_EXTRA_ATTEMPTS = Counter(
+    "outbound_extra_attempts",
+    "Hedged and retried calls to other systems, sent or denied by the retry budget",
+    ("target", "kind", "result"),
+)
+AUTH_VERIFICATIONS = Counter(
+    "auth_verifications",
+    "Token verifications by where the claims came from (auth, cache, stale, fallback, rejected)",
+    ("source",),
+)
+AUTH_CIRCUIT_OPEN = Gauge(
+    "auth_circuit_open",
+    "1 while the circuit breaker to the auth service is open or probing",
+    multiprocess_mode="max",
+)
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "How late the event loop runs a callback scheduled at a fixed interval",
+    buckets=LAG_BUCKETS,
+)
+ADMISSION_LIMIT = Gauge(
+    "admission_concurrency_limit",
+    "Adaptive concurrency limit of the admission control (summed over workers)",
+    multiprocess_mode="livesum",
+)
+ADMISSION_REJECTED = Counter(
+    "admission_rejected",
+    "Requests shed with 503 by the admission control, by priority class",
+    ("priority",),
+)
+ADMISSION_QUEUE_DELAY = Histogram(
+    "admission_queue_delay_seconds",
+    "Time requests waited for an admission slot, by priority class",
+    ("priority",),
+    buckets=LAG_BUCKETS,
+)
+
+# Hijos ya etiquetados: labels() valida y bloquea en cada llamada, un dict.get no
+_children: Dict[Tuple[Any, ...], Any] = {}
+
+
+def _child(metric: Any, *labels: str) -> Any:
+    key = (metric, *labels)
+    child = _children.get(key)
+    if child is None:
+        child = _children[key] = metric.labels(*labels)
+    return child
+
+
+def observe_request(method: str, route: Optional[str], status: int, seconds: float) -> None:
+    """Record a handled request under its route template (``unmatched`` for 404s outside the routers)"""
+    _child(REQUEST_LATENCY, method, route or "unmatched", str(status)).observe(seconds)
+
+
+@contextmanager
+def observe_outbound(
+    target: str, operation: str, category: Optional[str] = None, inject: bool = True
+) -> Iterator[None]:
+    """Time a call to another system (also a span of the current trace); exceptions are recorded with ``outcome="error"``.
+
+    The call is counted in the request's operation accounting under ``category`` (default: ``target``).
+    Fault rules for ``target`` (off by default) run first, blocking like the synchronous call itself.
+    """
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        with span(f"{target} {operation}", category or target):
+            if inject:
+                faults.inject(target, operation)
+            yield
+        outcome = "ok"
+    finally:
+        _child(OUTBOUND_LATENCY, target, operation, outcome).observe(time.perf_counter() - start)
+
+
+@asynccontextmanager
+async def observe_outbound_async(
+    target: str, operation: str, category: Optional[str] = None
+) -> AsyncIterator[None]:
+    """``observe_outbound`` for awaited calls: injected latency only delays this request, not the event loop"""
+    with observe_outbound(target, operation, category, inject=False):
+        await faults.ainject(target, operation)
+        yield
+
+
+class CacheCollector:
+    """Exports hits/misses/size of in-process caches, read from their ``stats()`` at scrape time"""
+
+    def __init__(self):
+        self._caches: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+    def register(self, name: str, stats: Callable[[], Dict[str, Any]]) -> None:
+        self._caches[name] = stats
+
+    def collect(self):
+        hits = CounterMetricFamily("cache_hits", "Cache lookups answered from memory", labels=["cache"])
+        misses = CounterMetricFamily("cache_misses", "Cache lookups that went to the source", labels=["cache"])
+        ratio = GaugeMetricFamily("cache_hit_ratio", "Hits over lookups since start", labels=["cache"])
+        entries = GaugeMetricFamily("cache_entries", "Entries currently cached", labels=["cache"])
+        for name, stats in list(self._caches.items()):
+            try:
+                data = stats()
+            except Exception:
+                continue
+            lookups = data.get("hits", 0) + data.get("misses", 0)
+            hits.add_metric([name], data.get("hits", 0))
+            misses.add_metric([name], data.get("misses", 0))
+            ratio.add_metric([name], data.get("hits", 0) / lookups if lookups else 0.0)
+            if "entries" in data:
+                entries.add_metric([name], data["entries"])
+        return [hits, misses, ratio, entries]
+
+
+caches = CacheCollector()
+REGISTRY.register(caches)
+
+
+class LoopLagMonitor:
+    """Samples event-loop lag: how much later than requested a periodic sleep wakes up"""
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            EVENT_LOOP_LAG.observe(max(0.0, loop.time() - started - self.interval))
+
+
+loop_lag = LoopLagMonitor()
+
+
+def metrics_response() -> Response:
+    """Prometheus exposition of this process (or of all workers with PROMETHEUS_MULTIPROC_DIR)"""
+    registry = REGISTRY
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        registry.register(caches)
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
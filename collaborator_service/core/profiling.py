@@ -0,0 +1,135 @@
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+# Hojas de pila de hilos que solo esperan (event loop en select, colas, locks)
+IDLE_FRAMES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+}
+
+
+class ProfilerBusy(Exception):
+    """Raised when a profile of the same kind is already running in this process"""
+
+
+def _label(code: Any) -> str:
+    path = code.co_filename.replace("\\", "/").split("/")
+    return f"{code.co_name} ({'/'.join(path[-2:])}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Wall-clock sampling profiler over every thread of the process (pure Python, no signals).
+
+    Every ``interval`` seconds it reads ``sys._current_frames()`` and counts the
+    stacks, root first, in the collapsed format flamegraph.pl and speedscope read.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def profile(self, seconds: float, interval: float = 0.01, include_idle: bool = False) -> Tuple[Counter, int]:
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("A CPU profile is already running")
+        try:
+            own = threading.get_ident()
+            names = {t.ident: t.name for t in threading.enumerate()}
+            stacks: Counter = Counter()
+            samples = 0
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline:
+                for ident, frame in sys._current_frames().items():
+                    if ident == own:
+                        continue
+                    code = frame.f_code
+                    if not include_idle and (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+                        continue
+                    frames: List[str] = []
+                    while frame is not None:
+                        frames.append(_label(frame.f_code))
+                        frame = frame.f_back
+                    if ident not in names:
+                        names = {t.ident: t.name for t in threading.enumerate()}
+                    frames.append(names.get(ident, f"thread-{ident}"))
+                    stacks[";".join(reversed(frames))] += 1
+                samples += 1
+                time.sleep(interval)
+            return stacks, samples
+        finally:
+            self._lock.release()
+
+    @staticmethod
+    def collapsed(stacks: Counter) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+class HeapProfiler:
+    """Top allocation sites that grew between two ``tracemalloc`` snapshots.
+
+    Tracing is started for the window (and stopped afterwards) unless it was
+    already on, so the overhead is only paid while someone is looking.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def diff(self, seconds: float, limit: int = 25, frames: int = 1, group_by: str = "lineno") -> Dict[str, Any]:
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("A heap profile is already running")
+        started_here = not tracemalloc.is_tracing()
+        try:
+            if started_here:
+                tracemalloc.start(frames)
+            filters = [
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                tracemalloc.Filter(False, "<unknown>"),
+            ]
+            before = tracemalloc.take_snapshot().filter_traces(filters)
+            time.sleep(seconds)
+            after = tracemalloc.take_snapshot().filter_traces(filters)
+            current, peak = tracemalloc.get_traced_memory()
+
+            top = []
+            for stat in after.compare_to(before, group_by)[:limit]:
+                top.append({
+                    "site": [f"{f.filename}:{f.lineno}" for f in stat.traceback],
+                    "size_diff_kb": round(stat.size_diff / 1024, 1),
+                    "size_kb": round(stat.size / 1024, 1),
+                    "count_diff": stat.count_diff,
+                    "count": stat.count,
+                })
+            return {
+                "seconds": seconds,
+                "group_by": group_by,
+                "traced_kb": round(current / 1024, 1),
+                "traced_peak_kb": round(peak / 1024, 1),
+                "rss_kb": _rss_kb(),
+                "tracing_started_for_window": started_here,
+                "top": top,
+            }
+        finally:
+            if started_here:
+                tracemalloc.stop()
+            self._lock.release()
+
+
+def _rss_kb() -> Optional[int]:
+    """Resident set size from /proc (the figure the pod memory limit is enforced on)"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+cpu_profiler = SamplingProfiler()
+heap_profiler = HeapProfiler()
@@ -0,0 +1,320 @@
+import copy
+import json
+import random
+import string
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+from core.firestore_accounting import QUERY, READ, WRITE
+from core.metrics import observe_outbound
+from core import config
+
+# Ruta de un campo en update(): "a.b" como en Firestore, o tupla de segmentos (claves con puntos, UIDs)
+FieldPath = Union[str, Tuple[str, ...]]
+Document = Dict[str, Any]
+Changes = Dict[FieldPath, Any]
+# fn(tarea leída o None) -> (resultado, cambios a escribir o None)
+TransactionFn = Callable[[Optional[Document]], Tuple[Any, Optional[Changes]]]
+
+
+class NotFound(LookupError):
+    """Raised by ``update`` when the document does not exist"""
+
+
+class TransactionConflict(RuntimeError):
+    """Raised when a transaction still conflicts after every attempt"""
+
+
+class ArrayUnion:
+    """Update value: append the given values that the array field does not contain yet"""
+
+    __slots__ = ("values",)
+
+    def __init__(self, values: Iterable[Any]):
+        self.values = list(values)
+
+
+class ArrayRemove:
+    """Update value: remove every occurrence of the given values from the array field"""
+
+    __slots__ = ("values",)
+
+    def __init__(self, values: Iterable[Any]):
+        self.values = list(values)
+
+
+class _DeleteField:
+    def __repr__(self) -> str:
+        return "DELETE_FIELD"
+
+
+DELETE_FIELD = _DeleteField()
+
+
+class TaskRepository(ABC):
+    """Storage of task documents: the operations the services run against the ``tasks`` collection.
+
+    Documents are returned as dicts that include their ``id``. Every call is one
+    round trip, counted in the request's operation accounting.
+    """
+
+    @abstractmethod
+    def create(self, data: Document) -> str:
+        """Store a new document under a generated id and return the id"""
+
+    @abstractmethod
+    def get(self, task_id: str) -> Optional[Document]:
+        pass
+
+    @abstractmethod
+    def find_by_owner(self, owner_id: str) -> List[Document]:
+        pass
+
+    @abstractmethod
+    def find_by_collaborator(self, uid: str) -> List[Document]:
+        """Documents whose ``collaborators`` array contains ``uid``"""
+
+    @abstractmethod
+    def update(self, task_id: str, changes: Changes) -> None:
+        """Apply ``changes`` (field paths, ArrayUnion/ArrayRemove, DELETE_FIELD); NotFound if missing"""
+
+    @abstractmethod
+    def delete(self, task_id: str) -> None:
+        pass
+
+    @abstractmethod
+    def batch_update(self, changes: Dict[str, Changes]) -> None:
+        """Update several documents atomically (all or none)"""
+
+    @abstractmethod
+    def transaction(self, task_id: str, fn: TransactionFn) -> Any:
+        """Read-modify-write of one document, retried on concurrent edits; returns fn's result"""
+
+    @abstractmethod
+    def watch(self, task_id: str, callback: Callable[[Optional[Document]], None]) -> Any:
+        """Call ``callback`` with the document now and on every change; returns an object with ``unsubscribe()``"""
+
+
+def _auto_id() -> str:
+    # Mismo formato que los ids automáticos de Firestore (20 caracteres alfanuméricos)
+    return "".join(random.choices(string.ascii_letters + string.digits, k=20))
+
+
+def _parts(path: FieldPath) -> Tuple[str, ...]:
+    return path if isinstance(path, tuple) else tuple(path.split("."))
+
+
+def apply_changes(doc: Document, changes: Changes) -> None:
+    """Apply update semantics to a document in place (intermediate maps are created as needed)"""
+    for path, value in changes.items():
+        *parents, field = _parts(path)
+        target = doc
+        for name in parents:
+            child = target.get(name)
+            if not isinstance(child, dict):
+                child = target[name] = {}
+            target = child
+        if value is DELETE_FIELD:
+            target.pop(field, None)
+        elif isinstance(value, ArrayUnion):
+            current = target.get(field)
+            current = list(current) if isinstance(current, list) else []
+            current.extend(v for v in value.values if v not in current)
+            target[field] = current
+        elif isinstance(value, ArrayRemove):
+            current = target.get(field)
+            current = current if isinstance(current, list) else []
+            target[field] = [v for v in current if v not in value.values]
+        else:
+            target[field] = copy.deepcopy(value)
+
+
+def _decode_dates(value: Dict[str, Any]) -> Any:
+    if len(value) == 1 and "$date" in value:
+        return datetime.fromisoformat(value["$date"])
+    return value
+
+
+class _Subscription:
+    def __init__(self, unsubscribe: Callable[[], None]):
+        self.unsubscribe = unsubscribe
+
+
+class InMemoryTaskRepository(TaskRepository):
+    """Process-local backend with Firestore semantics, for load tests and benchmarks without credentials.
+
+    Reads and writes work on deep copies, updates follow Firestore's field-path
+    and sentinel rules, transactions are optimistic and retried like the
+    client's, and watchers are notified after each commit. ``latency`` (plus
+    up to ``jitter``) seconds are slept on every round trip to stand in for
+    the network.
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, max_attempts: int = 5):
+        self.latency = latency
+        self.jitter = jitter
+        self.max_attempts = max_attempts
+        self._docs: Dict[str, Document] = {}
+        self._versions: Dict[str, int] = {}
+        self._watchers: Dict[str, List[Callable[[Optional[Document]], None]]] = {}
+        self._lock = threading.Lock()
+
+    def _round_trip(self) -> None:
+        delay = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _read(self, task_id: str) -> Optional[Document]:
+        doc = self._docs.get(task_id)
+        if doc is None:
+            return None
+        result = copy.deepcopy(doc)
+        result["id"] = task_id
+        return result
+
+    def _commit(self, task_id: str, doc: Optional[Document]) -> None:
+        if doc is None:
+            self._docs.pop(task_id, None)
+        else:
+            self._docs[task_id] = doc
+        self._versions[task_id] = self._versions.get(task_id, 0) + 1
+
+    def _notify(self, task_ids: Iterable[str]) -> None:
+        # Fuera del lock, como los listeners de Firestore (que llegan en otro hilo)
+        for task_id in task_ids:
+            watchers = list(self._watchers.get(task_id, ()))
+            if not watchers:
+                continue
+            with self._lock:
+                doc = self._read(task_id)
+            for callback in watchers:
+                callback(copy.deepcopy(doc))
+
+    def _query(self, match: Callable[[Document], bool]) -> List[Document]:
+        with observe_outbound("memory", "query", QUERY):
+            self._round_trip()
+            with self._lock:
+                return [self._read(task_id) for task_id in sorted(self._docs) if match(self._docs[task_id])]
+
+    def create(self, data: Document) -> str:
+        with observe_outbound("memory", "set", WRITE):
+            self._round_trip()
+            with self._lock:
+                task_id = _auto_id()
+                while task_id in self._docs:
+                    task_id = _auto_id()
+                self._commit(task_id, copy.deepcopy(data))
+        self._notify([task_id])
+        return task_id
+
+    def get(self, task_id: str) -> Optional[Document]:
+        with observe_outbound("memory", "get", READ):
+            self._round_trip()
+            with self._lock:
+                return self._read(task_id)
+
+    def find_by_owner(self, owner_id: str) -> List[Document]:
+        return self._query(lambda doc: doc.get("owner_id") == owner_id)
+
+    def find_by_collaborator(self, uid: str) -> List[Document]:
+        return self._query(lambda doc: uid in (doc.get("collaborators") or ()))
+
+    def update(self, task_id: str, changes: Changes) -> None:
+        self._update({task_id: changes}, "update")
+
+    def delete(self, task_id: str) -> None:
+        with observe_outbound("memory", "delete", WRITE):
+            self._round_trip()
+            with self._lock:
+                self._commit(task_id, None)
+        self._notify([task_id])
+
+    def batch_update(self, changes: Dict[str, Changes]) -> None:
+        self._update(changes, "batch")
+
+    def _update(self, changes: Dict[str, Changes], operation: str) -> None:
+        with observe_outbound("memory", operation, WRITE):
+            self._round_trip()
+            with self._lock:
+                missing = [task_id for task_id in changes if task_id not in self._docs]
+                if missing:
+                    raise NotFound(f"No document to update: {', '.join(missing)}")
+                for task_id, update in changes.items():
+                    doc = copy.deepcopy(self._docs[task_id])
+                    apply_changes(doc, update)
+                    self._commit(task_id, doc)
+        self._notify(changes)
+
+    def transaction(self, task_id: str, fn: TransactionFn) -> Any:
+        with observe_outbound("memory", "transaction", WRITE):
+            for _ in range(self.max_attempts):
+                self._round_trip()
+                with self._lock:
+                    version = self._versions.get(task_id, 0)
+                    doc = self._read(task_id)
+                result, changes = fn(doc)
+                if not changes:
+                    return result
+                self._round_trip()
+                with self._lock:
+                    # Otra escritura entre la lectura y el commit: se reintenta con datos frescos
+                    if self._versions.get(task_id, 0) != version:
+                        continue
+                    if task_id not in self._docs:
+                        raise NotFound(f"No document to update: {task_id}")
+                    updated = copy.deepcopy(self._docs[task_id])
+                    apply_changes(updated, changes)
+                    self._commit(task_id, updated)
+                self._notify([task_id])
+                return result
+            raise TransactionConflict(f"Transaction on {task_id} failed after {self.max_attempts} attempts")
+
+    def watch(self, task_id: str, callback: Callable[[Optional[Document]], None]) -> _Subscription:
+        with self._lock:
+            self._watchers.setdefault(task_id, []).append(callback)
+            doc = self._read(task_id)
+        callback(doc)
+
+        def _unsubscribe() -> None:
+            with self._lock:
+                watchers = self._watchers.get(task_id, [])
+                if callback in watchers:
+                    watchers.remove(callback)
+                if not watchers:
+                    self._watchers.pop(task_id, None)
+
+        return _Subscription(_unsubscribe)
+
+    def load(self, path: str) -> int:
+        """Add the documents of a JSON list (each with its ``id``; dates as ``{"$date": iso}``)"""
+        docs = json.loads(Path(path).read_text(encoding="utf-8"), object_hook=_decode_dates)
+        with self._lock:
+            for doc in docs:
+                doc = dict(doc)
+                self._commit(str(doc.pop("id")), doc)
+        return len(docs)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"documents": len(self._docs), "watched": len(self._watchers)}
+
+
+def create_repository() -> TaskRepository:
+    """Backend selected by TASK_REPOSITORY: ``firestore`` (default) or ``memory``"""
+    if config.TASK_REPOSITORY == "memory":
+        repository = InMemoryTaskRepository(
+            latency=config.MEMORY_REPOSITORY_LATENCY_MS / 1000,
+            jitter=config.MEMORY_REPOSITORY_JITTER_MS / 1000,
+        )
+        if config.MEMORY_REPOSITORY_SEED_FILE:
+            repository.load(config.MEMORY_REPOSITORY_SEED_FILE)
+        return repository
+    if config.TASK_REPOSITORY != "firestore":
+        raise ValueError(f"Unknown TASK_REPOSITORY: {config.TASK_REPOSITORY!r}")
+    # Importación diferida: el backend en memoria no necesita firebase_admin ni credenciales
+    from core.firestore_repository import FirestoreTaskRepository, initialize_firebase
+
+    return FirestoreTaskRepository(initialize_firebase(), config.TASKS_COLLECTION)
@@ -18,4 +18,21 @@ class Collaborator(CollaboratorBase):
 class CollaboratorResponse(BaseModel):
     """Response model for collaborator operations"""
     task_id: str
-    collaborators: List[Collaborator]
\ No newline at end of file
+    collaborators: List[Collaborator]
+    unresolved: List[str] = Field(default_factory=list, description="UIDs whose user info could not be retrieved")
+
+class CollaboratorBatch(BaseModel):
+    """Bulk invite/removal request"""
+    add: List[str] = Field(default_factory=list, description="Emails or UIDs to add")
+    remove: List[str] = Field(default_factory=list, description="Emails or UIDs to remove")
+
+class CollaboratorBatchResult(BaseModel):
+    """Outcome of one entry of a batch"""
+    identifier: str
+    action: str = Field(..., description="add | remove")
+    status: str = Field(..., description="added, removed, already_collaborator, not_collaborator, not_found, owner or conflict")
+    uid: Optional[str] = None
+
+class CollaboratorBatchResponse(CollaboratorResponse):
+    """Collaborators after the batch plus per-entry results"""
+    results: List[CollaboratorBatchResult]
@@ -2,12 +2,59 @@ from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import HTTPAuthorizationCredentials
 from typing import Dict, Any
 from services.collaborator_service import collaborator_service
-from models.schemas import CollaboratorCreate, CollaboratorResponse
+from models.schemas import CollaboratorCreate, CollaboratorResponse, CollaboratorBatch, CollaboratorBatchResponse
 from core.auth_middleware import get_current_user, security
+from core.rate_limit import limit_by_ip, limit_by_user
 from core.logging_config import write, get_logger
+from core import config
 
 logger = get_logger(__name__)
-router = APIRouter(tags=["collaborators"])
+# Primero por IP (sin llamar al auth_service), después por usuario autenticado
+router = APIRouter(tags=["collaborators"], dependencies=[Depends(limit_by_ip), Depends(limit_by_user)])
+
+# Debe declararse antes de "/{task_id}", que también aceptaría "abc:batch"
+@router.post("/{task_id}:batch", response_model=CollaboratorBatchResponse)
+async def batch_collaborators(
+    task_id: str,
+    batch: CollaboratorBatch,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """Add and remove several collaborators with a single task update"""
+    if not batch.add and not batch.remove:
+        raise HTTPException(
+            status_code=400,
+            detail="Nothing to add or remove"
+        )
+    if len(batch.add) + len(batch.remove) > config.COLLABORATOR_BATCH_MAX:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {config.COLLABORATOR_BATCH_MAX} entries per batch"
+        )
+
+    token = credentials.credentials
+    result = await collaborator_service.batch_collaborators(
+        task_id,
+        current_user["uid"],
+        batch.add,
+        batch.remove,
+        token
+    )
+
+    if not result:
+        raise HTTPException(
+            status_code=404,
+            detail="Task not found or permission denied"
+        )
+
+    write("info", "batch_collaborators",
+          name=__name__,
+          user=current_user["uid"],
+          task_id=task_id,
+          add=len(batch.add),
+          remove=len(batch.remove))
+
+    return result
 
 @router.post("/{task_id}", response_model=CollaboratorResponse)
 async def add_collaborator(
@@ -27,7 +74,7 @@ async def add_collaborator(
     # Obtener el token original de las credenciales
     token = credentials.credentials
     
-    result = collaborator_service.add_collaborator(
+    result = await collaborator_service.add_collaborator(
         task_id,
         current_user["uid"],
         identifier,
@@ -59,7 +106,7 @@ async def remove_collaborator(
     token = credentials.credentials
     write("info", f"Token received: {token}")
     write("info", f"Removing collaborator {collaborator_id} from task {task_id} by user {current_user['uid']}")
-    result = collaborator_service.remove_collaborator(
+    result = await collaborator_service.remove_collaborator(
         task_id,
         current_user["uid"],
         collaborator_id,
@@ -88,7 +135,7 @@ async def get_collaborators(
 ):
     """Get collaborators of a task"""
     token = credentials.credentials
-    result = collaborator_service.get_collaborators(task_id, current_user["uid"], token)
+    result = await collaborator_service.get_collaborators(task_id, current_user["uid"], token)
     
     if not result:
         raise HTTPException(
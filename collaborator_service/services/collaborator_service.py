@@ -1,35 +1,96 @@
-import firebase_admin
-from firebase_admin import credentials, firestore
-from typing import List, Dict, Any, Optional
+import asyncio
+from typing import List, Dict, Any, Iterable, Optional, Set, Tuple
 from datetime import datetime, timezone
 from fastapi import HTTPException
 from core.logging_config import write
+from core.acl_cache import TaskAcl, TaskAclCache
+from core.metrics import caches
+from core.outbound_policy import auth_policy
+from core.repository import DELETE_FIELD, ArrayRemove, ArrayUnion, TaskRepository, create_repository
+from core.tracing import outbound_headers
 from core import config
-import requests
-from pathlib import Path
+import httpx
 
 
-def initialize_firebase():
-    if not firebase_admin._apps:
-        cred_path = Path(config.FIREBASE_CRED_PATH)
-        if not cred_path.is_file():
-            raise FileNotFoundError(f"Firebase credentials not found at {cred_path}")
-        cred = credentials.Certificate(str(cred_path))
-        firebase_admin.initialize_app(cred)
-    return firestore.client()
+class CollaboratorService:
+    def __init__(self, repository: Optional[TaskRepository] = None):
+        # Firestore o el backend en memoria según TASK_REPOSITORY
+        self.repository = repository or create_repository()
+        self._http: Optional[httpx.AsyncClient] = None
+        # Refrescos de perfiles en segundo plano (referencias fuertes + tareas en curso)
+        self._background: Set[asyncio.Task] = set()
+        self._refreshing: Set[str] = set()
+        # Dueño y colaboradores por tarea: las decisiones de acceso no leen Firestore
+        self.acl = TaskAclCache(
+            ttl=config.ACL_CACHE_TTL,
+            max_entries=config.ACL_CACHE_MAX_ENTRIES,
+            subscribe=self._watch_task if config.ACL_CACHE_LISTEN else None,
+        )
+        caches.register("task_acl", self.acl.stats)
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """Pooled client for the auth service (keep-alive connections shared by all requests)"""
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                timeout=config.AUTH_REQUEST_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=config.AUTH_MAX_CONNECTIONS,
+                    max_keepalive_connections=config.AUTH_MAX_CONNECTIONS,
+                ),
+            )
+        return self._http
 
+    def _watch_task(self, task_id: str, on_change):
+        """Listener that pushes every change of a cached task into the ACL cache"""
+        return self.repository.watch(task_id, lambda task: on_change(task_id, task))
 
-class CollaboratorService:
-    def __init__(self):
-        self.db = initialize_firebase()
-        self.collection = self.db.collection("tasks")
+    def _load_acl(self, task_id: str) -> Optional[TaskAcl]:
+        task = self.repository.get(task_id)
+        if not task:
+            return None
+        return self.acl.put(task_id, task)
+
+    async def _task_acl(self, task_id: str) -> Optional[TaskAcl]:
+        """ACL of a task from the cache, reading the document (off the event loop) on a miss"""
+        return self.acl.get(task_id) or await asyncio.to_thread(self._load_acl, task_id)
+
+    def _denied_by_cache(self, task_id: str, owner_id: str) -> bool:
+        """Reject mutations of tasks cached with another owner without opening a transaction"""
+        cached = self.acl.get(task_id)
+        return cached is not None and cached.owner_id != owner_id
+
+    async def _is_owner(self, task_id: str, owner_id: str) -> bool:
+        """Existence and ownership check, done before asking auth about anyone.
+
+        Missing tasks and non-owners then cost no auth call and cannot surface
+        auth errors; the transaction checks again before writing.
+        """
+        acl = await self._task_acl(task_id)
+        if not acl:
+            write("error", f"Task {task_id} not found")
+            return False
+        if acl.owner_id != owner_id:
+            write("error", f"Access denied for user {owner_id} on task {task_id}")
+            return False
+        return True
+
+    async def close(self) -> None:
+        self.acl.close()
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
 
-    def get_user_info_by_id(self, user_id: str, token: str) -> Optional[Dict[str, Any]]:
+    async def get_user_info_by_id(self, user_id: str, token: str) -> Optional[Dict[str, Any]]:
         """Get user info from auth service"""
         try:
-            response = requests.get(
-                f"{config.AUTH_SERVICE_URL}/users/{user_id}",
-                headers={"Authorization": f"Bearer {token}"}
+            response = await auth_policy.call(
+                "get_user",
+                lambda timeout: self.http.get(
+                    f"{config.AUTH_SERVICE_URL}/users/{user_id}",
+                    headers={"Authorization": f"Bearer {token}", **outbound_headers(timeout)},
+                    timeout=timeout,
+                ),
             )
             if response.status_code == 200:
                 return response.json()
@@ -39,12 +100,16 @@ class CollaboratorService:
             write("error", f"Error getting user info: {e}")
             return None
 
-    def get_user_info_by_email(self, user_email: str, token: str) -> Optional[Dict[str, Any]]:
+    async def get_user_info_by_email(self, user_email: str, token: str) -> Optional[Dict[str, Any]]:
         """Get user info from auth service by email"""
         try:
-            response = requests.get(
-                f"{config.AUTH_SERVICE_URL}/users/email/{user_email}",
-                headers={"Authorization": f"Bearer {token}"}
+            response = await auth_policy.call(
+                "get_user_by_email",
+                lambda timeout: self.http.get(
+                    f"{config.AUTH_SERVICE_URL}/users/email/{user_email}",
+                    headers={"Authorization": f"Bearer {token}", **outbound_headers(timeout)},
+                    timeout=timeout,
+                ),
             )
             if response.status_code == 200:
                 return response.json()
@@ -54,31 +119,88 @@ class CollaboratorService:
             write("error", f"Error getting user info by email: {e}")
             return None
    
-    def get_user_info(self, user_identifier: str, token: str) -> Optional[Dict[str, Any]]:
+    async def get_user_info(self, user_identifier: str, token: str) -> Optional[Dict[str, Any]]:
         """Get user info by UID or email"""
         if "@" in user_identifier:
-            return self.get_user_info_by_email(user_identifier, token)
+            return await self.get_user_info_by_email(user_identifier, token)
         else:
-            return self.get_user_info_by_id(user_identifier, token)
-
-    def add_collaborator(
+            return await self.get_user_info_by_id(user_identifier, token)
+
+    def _mutate_collaborators(
+        self,
+        task_id: str,
+        owner_id: str,
+        add: Optional[Dict[str, Dict[str, Any]]] = None,
+        remove: Iterable[str] = (),
+    ) -> Tuple[str, Optional[Dict[str, Any]], Dict[str, str]]:
+        """Check ownership and apply every change in one transaction.
+
+        ``add`` maps UIDs to the profile stored with them; ``remove`` lists UIDs.
+        Returns ``(status, task, outcome)``: status is ``not_found``, ``forbidden``,
+        ``unchanged`` or ``updated``; ``task`` already reflects the write, so no
+        second read is needed; ``outcome`` maps each UID actually changed to
+        ``added`` or ``removed``. Concurrent edits are retried by the transaction
+        instead of overwriting each other.
+        """
+        add = add or {}
+
+        def _apply(task):
+            if not task:
+                return ("not_found", None, {}), None
+            if task.get("owner_id") != owner_id:
+                return ("forbidden", None, {}), None
+
+            current = task.get("collaborators", [])
+            added = [uid for uid in add if uid not in current]
+            removed = [uid for uid in dict.fromkeys(remove) if uid in current and uid not in add]
+            if not added and not removed:
+                return ("unchanged", task, {}), None
+
+            collaborators = [uid for uid in current if uid not in removed] + added
+            if added and removed:
+                # No se pueden combinar ArrayUnion y ArrayRemove en el mismo campo; dentro de
+                # la transacción escribir la lista completa es igual de seguro
+                value = collaborators
+            elif added:
+                value = ArrayUnion(added)
+            else:
+                value = ArrayRemove(removed)
+
+            now = datetime.now(timezone.utc)
+            update = {"collaborators": value, "updated_at": now}
+            profiles = dict(task.get("collaborator_profiles") or {})
+            for uid in added:
+                update[self._profile_path(uid)] = add[uid]
+                profiles[uid] = add[uid]
+            for uid in removed:
+                update[self._profile_path(uid)] = DELETE_FIELD
+                profiles.pop(uid, None)
+
+            task["collaborators"] = collaborators
+            task["collaborator_profiles"] = profiles
+            task["updated_at"] = now
+            outcome = {uid: "added" for uid in added}
+            outcome.update({uid: "removed" for uid in removed})
+            return ("updated", task, outcome), update
+
+        return self.repository.transaction(task_id, _apply)
+
+    def _remember(self, task_id: str, status: str, task: Optional[Dict[str, Any]]) -> None:
+        """Keep the ACL cache in line with this service's own mutations"""
+        if status == "not_found":
+            self.acl.invalidate(task_id)
+        elif task is not None:
+            self.acl.put(task_id, task)
+
+    async def add_collaborator(
         self, task_id: str, owner_id: str, collaborator: str, token: str
     ) -> Optional[Dict[str, Any]]:
         """Add a collaborator to a task"""
-        doc_ref = self.collection.document(task_id)
-        doc = doc_ref.get()
-        task = doc.to_dict() if doc else None
-
-        if not task:
-            write("error", f"Task {task_id} not found")
+        if not await self._is_owner(task_id, owner_id):
             return None
 
-        if task.get("owner_id") != owner_id:
-            write("error", f"Access denied for user {owner_id} on task {task_id}")
-            return None
-
-        # Determinar el UID del colaborador
-        user_info = self.get_user_info(collaborator, token)
+        # Determinar el UID del colaborador (fuera de la transacción: no se repite en reintentos)
+        user_info = await self.get_user_info(collaborator, token)
         if not user_info:
             write("error", f"User {collaborator} not found")
             return None
@@ -93,116 +215,249 @@ class CollaboratorService:
             write("error", f"Owner cannot be added as collaborator")
             return None
 
-        collaborators = task.get("collaborators", [])
-        
-        # Evitar duplicados
-        if collaborator_uid in collaborators:
-            write("info", f"User {collaborator_uid} is already a collaborator")
-            return self._enrich_collaborators(task, token)
-
-        collaborators.append(collaborator_uid)
-
-        # Actualizar la tarea
-        update_data = {
-            "collaborators": collaborators,
-            "updated_at": datetime.now(timezone.utc),
-        }
-
+        # El perfil se guarda junto al UID para que los listados no tengan que
+        # volver a consultarlo al auth_service
         try:
-            doc_ref.update(update_data)
-            # Obtener la tarea actualizada
-            updated_task = doc_ref.get().to_dict()
-            if not updated_task:
-                write("error", f"Error retrieving updated task {task_id}")
-                return None
-                
-            updated_task["id"] = task_id  # Asegurar que el ID está presente
+            status, task, _ = await asyncio.to_thread(
+                self._mutate_collaborators, task_id, owner_id, {collaborator_uid: self._profile(user_info)}
+            )
+        except Exception as e:
+            write("error", f"Error updating task {task_id}: {str(e)}")
+            return None
 
+        self._remember(task_id, status, task)
+        if status == "not_found":
+            write("error", f"Task {task_id} not found")
+            return None
+        if status == "forbidden":
+            write("error", f"Access denied for user {owner_id} on task {task_id}")
+            return None
+        if status == "unchanged":
+            write("info", f"User {collaborator_uid} is already a collaborator")
+        else:
             write(
                 "info",
                 f"Collaborator {collaborator_uid} added to task {task_id} by {owner_id}"
             )
-            return self._enrich_collaborators(updated_task, token)
-        except Exception as e:
-            write("error", f"Error updating task {task_id}: {str(e)}")
-            return None 
 
-    def remove_collaborator(
+        task["id"] = task_id  # Asegurar que el ID está presente
+        return await self._enrich_collaborators(task, token, known={collaborator_uid: user_info})
+
+    async def remove_collaborator(
         self, task_id: str, owner_id: str, collaborator_uid: str, token: str
     ) -> Optional[Dict[str, Any]]:
         """Delete a collaborator from a task"""
-        doc_ref = self.collection.document(task_id)
-        doc = doc_ref.get()
-        task = doc.to_dict() if doc else None
+        if self._denied_by_cache(task_id, owner_id):
+            write("info", f"Task {task_id} not found or access denied for user {owner_id}")
+            return None
 
-        if not task or task.get("owner_id") != owner_id:
+        # Un UID se quita directamente (si no está en la lista no hay nada que quitar);
+        # solo un email necesita consultar al auth_service, y solo si la tarea es suya
+        if "@" in collaborator_uid:
+            if not await self._is_owner(task_id, owner_id):
+                return None
+            user_info = await self.get_user_info(collaborator_uid, token)
+            if not user_info or not user_info.get("uid"):
+                write("error", f"Invalid collaborator info for {collaborator_uid}")
+                return None
+            collaborator_uid = user_info["uid"]
+
+        try:
+            status, task, _ = await asyncio.to_thread(
+                self._mutate_collaborators, task_id, owner_id, None, [collaborator_uid]
+            )
+        except Exception as e:
+            write("error", f"Error updating task {task_id}: {str(e)}")
+            return None
+
+        self._remember(task_id, status, task)
+        if status in ("not_found", "forbidden"):
             write(
-                "info"
+                "info",
                 f"Task {task_id} not found or access denied for user {owner_id}"
             )
             return None
+        if status == "updated":
+            write(
+               "info",
+                f"Collaborator {collaborator_uid} removed from task {task_id} "
+                f"by {owner_id}"
+            )
 
-        collaborators = task.get("collaborators", [])
-        user_info = self.get_user_info(collaborator_uid, token)      
-        collaborator_uid = user_info.get("uid") if user_info else None
-        
-        if not collaborator_uid:
-            write("error", f"Invalid collaborator info for {collaborator_uid}")
+        task["id"] = task_id  # Asegurar que el ID está presente
+        return await self._enrich_collaborators(task, token)
+
+    async def batch_collaborators(
+        self, task_id: str, owner_id: str, add: List[str], remove: List[str], token: str
+    ) -> Optional[Dict[str, Any]]:
+        """Add and remove several collaborators (emails or UIDs) with a single task update.
+
+        Identities are resolved concurrently in one pass (UIDs to remove need no
+        lookup) and every change is applied in one transaction. Each entry gets
+        its own result, so one unknown email does not fail the whole batch.
+        """
+        if not await self._is_owner(task_id, owner_id):
             return None
 
-        # Remover el colaborador si existe
-        if collaborator_uid in collaborators:
-            collaborators.remove(collaborator_uid)
+        add = list(dict.fromkeys(add))
+        remove = list(dict.fromkeys(remove))
+        lookups = add + [identifier for identifier in remove if "@" in identifier and identifier not in add]
+        resolved, _ = await self._resolve_users(lookups, token)
+
+        results: List[Dict[str, Any]] = []
+        to_add: Dict[str, Dict[str, Any]] = {}
+        known: Dict[str, Dict[str, Any]] = {}
+        for identifier in add:
+            uid = (resolved.get(identifier) or {}).get("uid")
+            if not uid:
+                results.append({"identifier": identifier, "action": "add", "status": "not_found", "uid": None})
+                continue
+            if uid == owner_id:
+                results.append({"identifier": identifier, "action": "add", "status": "owner", "uid": uid})
+                continue
+            to_add[uid] = self._profile(resolved[identifier])
+            known[uid] = resolved[identifier]
+            results.append({"identifier": identifier, "action": "add", "status": "already_collaborator", "uid": uid})
+
+        to_remove: List[str] = []
+        for identifier in remove:
+            uid = (resolved.get(identifier) or {}).get("uid") if "@" in identifier else identifier
+            if not uid:
+                results.append({"identifier": identifier, "action": "remove", "status": "not_found", "uid": None})
+                continue
+            if uid in to_add:
+                # Pedido añadir y quitar a la vez: se respeta el alta
+                results.append({"identifier": identifier, "action": "remove", "status": "conflict", "uid": uid})
+                continue
+            to_remove.append(uid)
+            results.append({"identifier": identifier, "action": "remove", "status": "not_collaborator", "uid": uid})
 
-            # Actualizar la tarea
-            doc_ref.update(
-                {
-                    "collaborators": collaborators,
-                    "updated_at": datetime.now(timezone.utc),
-                }
+        try:
+            status, task, outcome = await asyncio.to_thread(
+                self._mutate_collaborators, task_id, owner_id, to_add, to_remove
             )
+        except Exception as e:
+            write("error", f"Error updating task {task_id}: {str(e)}")
+            return None
 
-            # Obtener la tarea actualizada
-            updated_task = doc_ref.get().to_dict()
-            if not updated_task:
-                return None
-            
-            updated_task["id"] = task_id  # Asegurar que el ID está presente
+        self._remember(task_id, status, task)
+        if status in ("not_found", "forbidden"):
+            write("info", f"Task {task_id} not found or access denied for user {owner_id}")
+            return None
 
+        for result in results:
+            if result["status"] in ("already_collaborator", "not_collaborator") and result["uid"] in outcome:
+                result["status"] = outcome[result["uid"]]
+        if outcome:
             write(
-               "info",
-                f"Collaborator {collaborator_uid} removed from task {task_id} "
-                f"by {owner_id}"
+                "info",
+                f"Batch on task {task_id} by {owner_id}: "
+                f"{sum(1 for o in outcome.values() if o == 'added')} added, "
+                f"{sum(1 for o in outcome.values() if o == 'removed')} removed"
             )
-            return self._enrich_collaborators(updated_task, token)
-        return self._enrich_collaborators(task, token)
 
-    def get_collaborators(self, task_id: str, user_id: str, token: str) -> Optional[Dict[str, Any]]:
+        task["id"] = task_id  # Asegurar que el ID está presente
+        response = await self._enrich_collaborators(task, token, known=known)
+        response["results"] = results
+        return response
+
+    async def get_collaborators(self, task_id: str, user_id: str, token: str) -> Optional[Dict[str, Any]]:
         """Get collaborators of a task"""
-        doc = self.collection.document(task_id).get()
-        if not doc.exists:
+        acl = await self._task_acl(task_id)
+        if not acl:
             write("info", f"Task {task_id} not found")
             return None
 
-        task = doc.to_dict()
-        if not task:
-            return None
-            
-        task["id"] = task_id  # Asegurar que el ID está en el documento
-
         # Verificar acceso (debe ser owner o colaborador)
-        if task.get("owner_id") != user_id and user_id not in task.get(
-            "collaborators", []
-        ):
+        if not acl.can_read(user_id):
             write("info", f"Access denied for task {task_id} to user {user_id}")
             return None
 
-        # Enriquecer con información de usuarios y devolver
-        enriched_task = self._enrich_collaborators(task, token)
+        # Los perfiles guardados en la tarea viajan en la misma entrada de la caché
+        enriched_task = await self._enrich_collaborators(acl.as_task(task_id), token)
         return enriched_task
 
-    def _enrich_collaborators(self, task: Dict[str, Any], token: str) -> Dict[str, Any]:
-        """Enrich collaborator UIDs with user info"""
+    @staticmethod
+    def _profile_path(uid: str) -> Tuple[str, str]:
+        # Segmentos separados: el UID puede contener caracteres especiales en una ruta
+        return ("collaborator_profiles", uid)
+
+    @staticmethod
+    def _profile(user_info: Dict[str, Any]) -> Dict[str, Any]:
+        """Denormalised copy of the user info stored on the task document"""
+        return {
+            "email": user_info.get("email"),
+            "display_name": user_info.get("display_name"),
+            "refreshed_at": datetime.now(timezone.utc),
+        }
+
+    def _is_stale(self, profile: Dict[str, Any]) -> bool:
+        refreshed_at = profile.get("refreshed_at")
+        if not isinstance(refreshed_at, datetime):
+            return True
+        age = (datetime.now(timezone.utc) - refreshed_at).total_seconds()
+        return age > config.COLLABORATOR_PROFILE_MAX_AGE
+
+    async def _resolve_users(
+        self, uids: List[str], token: str, known: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+        """Look up users concurrently (at most AUTH_LOOKUP_CONCURRENCY at a time), once per UID.
+
+        ``known`` seeds the per-request map with users the caller already resolved.
+        Returns the resolved users and the UIDs that could not be resolved.
+        """
+        resolved: Dict[str, Any] = {uid: info for uid, info in (known or {}).items() if uid in uids}
+        semaphore = asyncio.Semaphore(config.AUTH_LOOKUP_CONCURRENCY)
+
+        async def _lookup(uid: str) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                return await self.get_user_info(uid, token)
+
+        pending = [uid for uid in dict.fromkeys(uids) if uid not in resolved]
+        results = await asyncio.gather(*(_lookup(uid) for uid in pending), return_exceptions=True)
+        resolved.update(zip(pending, results))
+
+        unresolved = [uid for uid, info in resolved.items() if not info or isinstance(info, BaseException)]
+        return {uid: info for uid, info in resolved.items() if uid not in unresolved}, unresolved
+
+    def _in_background(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _store_profiles(self, task_id: str, profiles: Dict[str, Dict[str, Any]]) -> None:
+        """Write refreshed profiles without touching ``updated_at`` (runs off the event loop)"""
+        try:
+            await asyncio.to_thread(
+                self.repository.update,
+                task_id,
+                {self._profile_path(uid): profile for uid, profile in profiles.items()},
+            )
+            cached = self.acl.get(task_id)
+            if cached:
+                cached.profiles.update(profiles)
+        except Exception as e:
+            write("error", f"Error storing collaborator profiles of task {task_id}: {e}")
+
+    async def _refresh_profiles(self, task_id: str, uids: List[str], token: str) -> None:
+        try:
+            resolved, _ = await self._resolve_users(uids, token)
+            if resolved:
+                await self._store_profiles(task_id, {uid: self._profile(info) for uid, info in resolved.items()})
+        finally:
+            self._refreshing.discard(task_id)
+
+    async def _enrich_collaborators(
+        self, task: Dict[str, Any], token: str, known: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """Build the collaborator list from the ``collaborator_profiles`` map of the task.
+
+        Only UIDs without a stored profile (tasks written before the map existed)
+        are resolved inline, and their profiles are saved in the background.
+        Profiles older than COLLABORATOR_PROFILE_MAX_AGE are served as they are
+        and refreshed in the background. Collaborators that cannot be resolved
+        are reported in ``unresolved`` instead of failing the whole response.
+        """
         if not task:
             write("error", "Cannot enrich collaborators for None task")
             return None
@@ -212,24 +467,43 @@ class CollaboratorService:
             write("error", f"Task has no valid ID: {task}")
             return None
 
-        # Procesar colaboradores
-        collaborators = task.get("collaborators", [])
-        enriched_collaborators = []
-
-        for uid in collaborators:
-            user_info = self.get_user_info(uid, token)
-            if user_info:
-                collaborator = {
-                    "uid": uid,
-                    "email": user_info.get("email"),
-                    "display_name": user_info.get("display_name"),
-                }
-                enriched_collaborators.append(collaborator)
+        # Procesar colaboradores (sin duplicados, conservando el orden)
+        collaborators = list(dict.fromkeys(task.get("collaborators", [])))
+        profiles: Dict[str, Dict[str, Any]] = dict(task.get("collaborator_profiles") or {})
+        for uid, info in (known or {}).items():
+            if uid in collaborators and uid not in profiles:
+                profiles[uid] = self._profile(info)
+
+        unresolved: List[str] = []
+        missing = [uid for uid in collaborators if uid not in profiles]
+        if missing:
+            resolved, unresolved = await self._resolve_users(missing, token)
+            fresh = {uid: self._profile(info) for uid, info in resolved.items()}
+            profiles.update(fresh)
+            if fresh:
+                self._in_background(self._store_profiles(task_id, fresh))
+
+        stale = [uid for uid in collaborators if uid in profiles and uid not in missing and self._is_stale(profiles[uid])]
+        if stale and task_id not in self._refreshing:
+            self._refreshing.add(task_id)
+            self._in_background(self._refresh_profiles(task_id, stale, token))
+
+        if unresolved:
+            write("warning", f"Could not resolve {len(unresolved)} collaborators of task {task_id}")
 
         # Devolver el formato esperado por CollaboratorResponse
         return {
             "task_id": task_id,
-            "collaborators": enriched_collaborators
+            "collaborators": [
+                {
+                    "uid": uid,
+                    "email": profiles[uid].get("email"),
+                    "display_name": profiles[uid].get("display_name"),
+                }
+                for uid in collaborators
+                if uid in profiles
+            ],
+            "unresolved": unresolved,
         }
 
 
@@ -0,0 +1,42 @@
+import asyncio
+import pytest
+from core.repository import InMemoryTaskRepository
+from services.collaborator_service import CollaboratorService
+
+
+@pytest.fixture
+def service(monkeypatch):
+    service = CollaboratorService(InMemoryTaskRepository())
+    service.lookups = []
+
+    async def get_user_info(identifier, token):
+        service.lookups.append(identifier)
+        return {"uid": identifier.split("@")[0], "email": identifier, "display_name": identifier}
+
+    monkeypatch.setattr(service, "get_user_info", get_user_info)
+    return service
+
+
+def test_add_checks_the_task_before_asking_auth(service):
+    task_id = service.repository.create({"owner_id": "owner", "collaborators": []})
+    assert asyncio.run(service.add_collaborator("missing", "owner", "bob@example.com", "t")) is None
+    assert asyncio.run(service.add_collaborator(task_id, "mallory", "bob@example.com", "t")) is None
+    assert service.lookups == []
+
+    task = asyncio.run(service.add_collaborator(task_id, "owner", "bob@example.com", "t"))
+    assert service.lookups == ["bob@example.com"]
+    assert [c["uid"] for c in task["collaborators"]] == ["bob"]
+
+
+def test_remove_by_email_checks_the_task_before_asking_auth(service):
+    task_id = service.repository.create({"owner_id": "owner", "collaborators": ["bob"]})
+    assert asyncio.run(service.remove_collaborator(task_id, "mallory", "bob@example.com", "t")) is None
+    assert service.lookups == []
+    assert service.repository.get(task_id)["collaborators"] == ["bob"]
+
+
+def test_batch_checks_the_task_before_asking_auth(service):
+    task_id = service.repository.create({"owner_id": "owner", "collaborators": []})
+    assert asyncio.run(service.batch_collaborators(task_id, "mallory", ["bob@example.com"], [], "t")) is None
+    assert asyncio.run(service.batch_collaborators("missing", "owner", ["bob@example.com"], [], "t")) is None
+    assert service.lookups == []
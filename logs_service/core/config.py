@@ -23,9 +23,46 @@ class Settings:
     # Logging
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     LOG_FORMAT: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    LOG_DIR: str = os.getenv("LOG_DIR", str(ROOT_DIR / "logs"))  # Segmentos, shards y política de logs
     LOG_FILE: str = str(ROOT_DIR / "logs" / "centralized.log")
-    LOG_MAX_SIZE: int = 10 * 1024 * 1024  # 10 MB
-    LOG_BACKUP_COUNT: int = 5
+    LOG_MAX_SIZE: int = int(os.getenv("LOG_MAX_SIZE", str(10 * 1024 * 1024)))  # Tamaño máximo de un segmento (10 MB)
+    LOG_INDEX_INTERVAL: int = int(os.getenv("LOG_INDEX_INTERVAL", "256"))  # Registros por entrada del índice temporal
+    SEARCH_MAX_LIMIT: int = int(os.getenv("SEARCH_MAX_LIMIT", "1000"))
+    LOG_INDEX_CACHE_SIZE: int = int(os.getenv("LOG_INDEX_CACHE_SIZE", "16"))  # Índices de segmentos cerrados en memoria
+
+    # Segmentos: cierre por tamaño o antigüedad, compresión y retención
+    LOG_SEGMENT_MAX_AGE: int = int(os.getenv("LOG_SEGMENT_MAX_AGE", "3600"))
+    LOG_RETENTION_SECONDS: int = int(os.getenv("LOG_RETENTION_SECONDS", str(7 * 24 * 3600)))
+    LOG_MAX_TOTAL_BYTES: int = int(os.getenv("LOG_MAX_TOTAL_BYTES", str(1024 * 1024 * 1024)))  # 1 GB en disco entre todos los shards
+    LOG_COMPRESS_BLOCK_BYTES: int = int(os.getenv("LOG_COMPRESS_BLOCK_BYTES", str(64 * 1024)))
+    LOG_MAINTENANCE_INTERVAL: float = float(os.getenv("LOG_MAINTENANCE_INTERVAL", "30"))
+
+    # Writer asíncrono (cola + hilo dedicado)
+    LOG_QUEUE_MAX_SIZE: int = int(os.getenv("LOG_QUEUE_MAX_SIZE", "10000"))
+    LOG_BATCH_SIZE: int = int(os.getenv("LOG_BATCH_SIZE", "500"))
+    LOG_FLUSH_INTERVAL: float = float(os.getenv("LOG_FLUSH_INTERVAL", "0.5"))
+    LOG_RETRY_AFTER: int = int(os.getenv("LOG_RETRY_AFTER", "1"))
+    LOG_BATCH_MAX_RECORDS: int = int(os.getenv("LOG_BATCH_MAX_RECORDS", "1000"))  # Registros por POST /batch
+    
+    # Live tail (SSE)
+    TAIL_BUFFER_SIZE: int = int(os.getenv("TAIL_BUFFER_SIZE", "1000"))
+    TAIL_MAX_SUBSCRIBERS: int = int(os.getenv("TAIL_MAX_SUBSCRIBERS", "50"))
+    TAIL_KEEPALIVE_SECONDS: float = float(os.getenv("TAIL_KEEPALIVE_SECONDS", "15"))
+    
+    # Estadísticas de latencia a partir de request_log
+    STATS_SLOT_SECONDS: int = int(os.getenv("STATS_SLOT_SECONDS", "10"))
+    STATS_WINDOW_SECONDS: int = int(os.getenv("STATS_WINDOW_SECONDS", "900"))
+    # "aggregate": los request logs solo alimentan las estadísticas y se guarda un resumen por
+    # ruta cada REQUEST_SUMMARY_INTERVAL segundos; "raw": además se guarda una línea por request
+    REQUEST_LOG_MODE: str = os.getenv("REQUEST_LOG_MODE", "aggregate").lower()
+    REQUEST_SUMMARY_INTERVAL: float = float(os.getenv("REQUEST_SUMMARY_INTERVAL", "60"))
+    # En modo "aggregate" se guardan igualmente las requests con spans lentas o con error (5xx)
+    TRACE_KEEP_SLOW_MS: float = float(os.getenv("TRACE_KEEP_SLOW_MS", "500"))
+    
+    # Endpoints /debug (perfil de CPU y heap), lectura de logs (search, export, tail) y
+    # administración (PUT policy, stats): desactivados si DEBUG_TOKEN está vacío
+    DEBUG_TOKEN: str = os.getenv("DEBUG_TOKEN", "")
+    DEBUG_PROFILE_MAX_SECONDS: float = float(os.getenv("DEBUG_PROFILE_MAX_SECONDS", "60"))
     
     # Authorized Services
     AUTHORIZED_SERVICES: list[str] = [
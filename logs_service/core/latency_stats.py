@@ -0,0 +1,268 @@
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Mensaje de request_log en texto plano (clientes antiguos)
+REQUEST_LINE = re.compile(r"^request (\S+) (\S+) status=(\d+) time=([\d.]+)s")
+# Segmentos de ruta que parecen IDs (Firestore, UIDs, números) -> {id}
+ID_SEGMENT = re.compile(r"^(?:\d+|[A-Za-z0-9_-]{16,})$")
+
+RouteKey = Tuple[str, str, str]  # (service, method, route)
+
+
+class LatencyHistogram:
+    """Log-linear (HDR style) histogram of durations in microseconds.
+
+    Each power of two is split into ``SUB_BUCKETS`` linear buckets, so any
+    percentile is within ~1.6% of the true value with constant memory per route.
+    """
+
+    SUB_BUCKETS = 32
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    @classmethod
+    def _index(cls, micros: int) -> int:
+        if micros < cls.SUB_BUCKETS:
+            return micros
+        shift = micros.bit_length() - cls.SUB_BUCKETS.bit_length()
+        return cls.SUB_BUCKETS * (shift + 1) + (micros >> shift) - cls.SUB_BUCKETS
+
+    @classmethod
+    def _value(cls, index: int) -> float:
+        """Midpoint of a bucket, in microseconds"""
+        if index < cls.SUB_BUCKETS:
+            return float(index)
+        shift = index // cls.SUB_BUCKETS - 1
+        mantissa = index % cls.SUB_BUCKETS + cls.SUB_BUCKETS
+        return (mantissa << shift) + (1 << shift) / 2
+
+    def record(self, seconds: float, count: int = 1) -> None:
+        micros = max(int(seconds * 1_000_000), 0)
+        index = self._index(micros)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.count += count
+        self.total += seconds * count
+        self.max = max(self.max, seconds)
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for index, n in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + n
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, q: float) -> float:
+        """Percentile in milliseconds"""
+        if not self.count:
+            return 0.0
+        target = max(1, int(q * self.count + 0.999999))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return round(min(self._value(index) / 1000, self.max * 1000), 3)
+        return round(self.max * 1000, 3)
+
+
+class RouteStats:
+    """Latency histogram and status-code counters of one route in one time slot"""
+
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.statuses: Counter = Counter()
+
+    def record(self, status: int, seconds: float, count: int = 1) -> None:
+        self.histogram.record(seconds, count)
+        self.statuses[status] += count
+
+    def merge(self, other: "RouteStats") -> None:
+        self.histogram.merge(other.histogram)
+        self.statuses.update(other.statuses)
+
+    def summary(self, seconds: Optional[float] = None) -> Dict[str, Any]:
+        h = self.histogram
+        server_errors = sum(n for code, n in self.statuses.items() if code >= 500)
+        client_errors = sum(n for code, n in self.statuses.items() if 400 <= code < 500)
+        result = {
+            "count": h.count,
+            "p50_ms": h.percentile(0.50),
+            "p95_ms": h.percentile(0.95),
+            "p99_ms": h.percentile(0.99),
+            "max_ms": round(h.max * 1000, 3),
+            "mean_ms": round(h.total / h.count * 1000, 3) if h.count else 0.0,
+            "error_rate": round(server_errors / h.count, 4) if h.count else 0.0,
+            "client_error_rate": round(client_errors / h.count, 4) if h.count else 0.0,
+            "status": {str(code): n for code, n in sorted(self.statuses.items())},
+        }
+        if seconds:
+            result["rps"] = round(h.count / seconds, 3)
+        return result
+
+
+def normalize_path(path: str) -> str:
+    """Collapse ID-like path segments so /api/tasks/abc123... aggregates as /api/tasks/{id}"""
+    return "/".join("{id}" if ID_SEGMENT.match(part) else part for part in path.split("/"))
+
+
+def extract_request(message: str, meta: Dict[str, Any]) -> Optional[Tuple[str, str, str, int, float]]:
+    """Return (service, method, route, status, seconds) if a record is a request log"""
+    service = str(meta.get("service", "unknown"))
+    if meta.get("kind") == "request":
+        try:
+            return (
+                service,
+                str(meta["method"]),
+                str(meta.get("route") or normalize_path(str(meta.get("path", "")))),
+                int(meta["status"]),
+                float(meta["duration_ms"]) / 1000,
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    match = REQUEST_LINE.match(message or "")
+    if not match:
+        return None
+    method, path, status, seconds = match.groups()
+    return service, method, normalize_path(path), int(status), float(seconds)
+
+
+class LatencyAggregator:
+    """Per-service, per-route latency sketches over a sliding window.
+
+    Time is split into ``slot_seconds`` slots; a query merges the slots inside
+    the requested window. A second accumulator covers the current summary
+    interval and is periodically flushed to ``on_summary`` so request logs can be
+    stored as one record per route and interval instead of one per request.
+    """
+
+    def __init__(
+        self,
+        slot_seconds: int = 10,
+        window_seconds: int = 900,
+        summary_interval: float = 60.0,
+        on_summary: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+    ):
+        self.slot_seconds = slot_seconds
+        self.window_seconds = window_seconds
+        self.summary_interval = summary_interval
+        self.on_summary = on_summary
+
+        self._lock = threading.Lock()
+        self._slots: "OrderedDict[int, Dict[RouteKey, RouteStats]]" = OrderedDict()
+        self._interval: Dict[RouteKey, RouteStats] = {}
+        self._interval_start = time.time()
+        self._recorded = 0
+
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    def record(
+        self,
+        service: str,
+        method: str,
+        route: str,
+        status: int,
+        seconds: float,
+        ts: Optional[float] = None,
+        count: int = 1,
+    ) -> None:
+        """Add one request (or ``count`` when the client sampled its request logs)"""
+        now = time.time()
+        ts = min(ts or now, now)
+        slot = int(ts // self.slot_seconds)
+        oldest = int((now - self.window_seconds) // self.slot_seconds)
+        key = (service, method.upper(), route)
+        with self._lock:
+            # Un registro atrasado (p. ej. reenviado desde un spool) fuera de la ventana
+            # solo cuenta para el resumen del intervalo actual
+            if slot >= oldest:
+                routes = self._slots.get(slot)
+                if routes is None:
+                    late = bool(self._slots) and slot < next(reversed(self._slots))
+                    routes = self._slots[slot] = {}
+                    if late:
+                        # Mantener los slots ordenados para que la expiración siga siendo por la cabeza
+                        self._slots = OrderedDict(sorted(self._slots.items()))
+                    while self._slots and next(iter(self._slots)) < oldest:
+                        self._slots.popitem(last=False)
+                routes.setdefault(key, RouteStats()).record(status, seconds, count)
+            self._interval.setdefault(key, RouteStats()).record(status, seconds, count)
+            self._recorded += count
+
+    def snapshot(
+        self,
+        window: int = 300,
+        service: Optional[str] = None,
+        method: Optional[str] = None,
+        route: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        window = min(window, self.window_seconds)
+        now = time.time()
+        first_slot = int((now - window) // self.slot_seconds)
+        merged: Dict[RouteKey, RouteStats] = {}
+        with self._lock:
+            for slot, routes in self._slots.items():
+                if slot < first_slot:
+                    continue
+                for key, stats in routes.items():
+                    if service and key[0] != service:
+                        continue
+                    if method and key[1] != method.upper():
+                        continue
+                    if route and key[2] != route:
+                        continue
+                    merged.setdefault(key, RouteStats()).merge(stats)
+
+        routes = [
+            {"service": key[0], "method": key[1], "route": key[2], **stats.summary(window)}
+            for key, stats in merged.items()
+        ]
+        routes.sort(key=lambda r: r["count"], reverse=True)
+        return {"window_seconds": window, "generated_at": now, "routes": routes}
+
+    def flush_summaries(self) -> List[Dict[str, Any]]:
+        """Swap the current interval accumulator and return one summary per route"""
+        now = time.time()
+        with self._lock:
+            interval, self._interval = self._interval, {}
+            start, self._interval_start = self._interval_start, now
+        return [
+            {
+                "service": key[0],
+                "method": key[1],
+                "route": key[2],
+                "interval_start": start,
+                "interval_end": now,
+                **stats.summary(now - start),
+            }
+            for key, stats in interval.items()
+        ]
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="request-summaries", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stopping.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self._emit()
+
+    def _run(self) -> None:
+        while not self._stopping.wait(self.summary_interval):
+            self._emit()
+
+    def _emit(self) -> None:
+        summaries = self.flush_summaries()
+        if summaries and self.on_summary:
+            self.on_summary(summaries)
@@ -0,0 +1,115 @@
+import asyncio
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class TailFilter:
+    """Server-side filter evaluated against each record as it is ingested"""
+
+    def __init__(
+        self,
+        service: Optional[str] = None,
+        level: Optional[str] = None,
+        user: Optional[str] = None,
+        text: Optional[str] = None,
+    ):
+        self.service = service
+        self.level = level.lower() if level else None
+        self.user = user
+        self.text = text.lower() if text else None
+
+    def matches(self, record: Dict[str, Any]) -> bool:
+        if self.service and record.get("service") != self.service:
+            return False
+        if self.level and record.get("level") != self.level:
+            return False
+        if self.user and str(record.get("user")) != self.user:
+            return False
+        if self.text and self.text not in str(record.get("message", "")).lower():
+            return False
+        return True
+
+
+class TailSubscriber:
+    """Bounded per-subscriber buffer: when the consumer falls behind, the oldest records are dropped"""
+
+    def __init__(self, tail_filter: TailFilter, buffer_size: int, loop: asyncio.AbstractEventLoop):
+        self.filter = tail_filter
+        self.buffer: deque = deque(maxlen=buffer_size)
+        self.loop = loop
+        self.event = asyncio.Event()
+        self.dropped = 0
+        self.delivered = 0
+
+    def push(self, record: Dict[str, Any]) -> None:
+        if len(self.buffer) == self.buffer.maxlen:
+            self.dropped += 1
+        self.buffer.append(record)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(self.event.set)
+
+    async def next_batch(self, timeout: float) -> List[Dict[str, Any]]:
+        """Wait up to ``timeout`` seconds for records and drain the buffer"""
+        self.event.clear()
+        if not self.buffer:
+            try:
+                await asyncio.wait_for(self.event.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        batch = []
+        while self.buffer:
+            batch.append(self.buffer.popleft())
+        self.delivered += len(batch)
+        return batch
+
+
+class TailHub:
+    """Fan-out of newly ingested records to live subscribers.
+
+    ``publish`` never blocks or awaits: it filters and appends to each matching
+    subscriber's bounded buffer, so slow consumers cannot slow down ingestion.
+    """
+
+    def __init__(self, max_subscribers: int = 50):
+        self.max_subscribers = max_subscribers
+        self._lock = threading.Lock()
+        self._subscribers: Tuple[TailSubscriber, ...] = ()
+        self._published = 0
+
+    def subscribe(self, tail_filter: TailFilter, buffer_size: int) -> Optional[TailSubscriber]:
+        subscriber = TailSubscriber(tail_filter, buffer_size, asyncio.get_running_loop())
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                return None
+            self._subscribers = self._subscribers + (subscriber,)
+        return subscriber
+
+    def unsubscribe(self, subscriber: TailSubscriber) -> None:
+        with self._lock:
+            self._subscribers = tuple(s for s in self._subscribers if s is not subscriber)
+
+    def publish(self, record: Dict[str, Any]) -> None:
+        subscribers = self._subscribers
+        if not subscribers:
+            return
+        self._published += 1
+        for subscriber in subscribers:
+            if subscriber.filter.matches(record):
+                subscriber.push(record)
+
+    def stats(self) -> Dict[str, Any]:
+        subscribers = self._subscribers
+        return {
+            "subscribers": len(subscribers),
+            "max_subscribers": self.max_subscribers,
+            "published": self._published,
+            "buffered": sum(len(s.buffer) for s in subscribers),
+            "dropped": sum(s.dropped for s in subscribers),
+        }
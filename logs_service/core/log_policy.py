@@ -0,0 +1,112 @@
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from core.log_store import fcntl
+
+LEVELS = {"debug": 10, "info": 20, "warning": 30, "warn": 30, "error": 40, "critical": 50}
+RULE_FIELDS = ("min_level", "sample_rate")
+
+
+class InvalidPolicy(ValueError):
+    """Raised when a policy document does not have the expected shape"""
+
+
+def _validate_rule(rule: Any, where: str) -> Dict[str, Any]:
+    if not isinstance(rule, dict):
+        raise InvalidPolicy(f"{where} must be an object")
+    clean: Dict[str, Any] = {}
+    if "min_level" in rule:
+        level = str(rule["min_level"]).lower()
+        if level not in LEVELS:
+            raise InvalidPolicy(f"{where}.min_level must be one of {', '.join(LEVELS)}")
+        clean["min_level"] = level
+    if "sample_rate" in rule:
+        try:
+            rate = float(rule["sample_rate"])
+        except (TypeError, ValueError):
+            raise InvalidPolicy(f"{where}.sample_rate must be a number")
+        if not 0.0 <= rate <= 1.0:
+            raise InvalidPolicy(f"{where}.sample_rate must be between 0 and 1")
+        clean["sample_rate"] = rate
+    return clean
+
+
+def validate_policy(doc: Any) -> Dict[str, Any]:
+    """Normalize a policy document: ``default`` rule plus per-service rules with logger/action overrides"""
+    if not isinstance(doc, dict):
+        raise InvalidPolicy("policy must be a JSON object")
+    policy: Dict[str, Any] = {
+        "refresh_seconds": 30,
+        "default": _validate_rule(doc.get("default", {}), "default"),
+        "services": {},
+    }
+    if "refresh_seconds" in doc:
+        try:
+            policy["refresh_seconds"] = max(1, int(doc["refresh_seconds"]))
+        except (TypeError, ValueError):
+            raise InvalidPolicy("refresh_seconds must be an integer")
+
+    services = doc.get("services", {})
+    if not isinstance(services, dict):
+        raise InvalidPolicy("services must be an object")
+    for service, section in services.items():
+        where = f"services.{service}"
+        rule = _validate_rule(section, where)
+        for key in ("loggers", "actions"):
+            overrides = section.get(key, {})
+            if not isinstance(overrides, dict):
+                raise InvalidPolicy(f"{where}.{key} must be an object")
+            rule[key] = {name: _validate_rule(r, f"{where}.{key}.{name}") for name, r in overrides.items()}
+        policy["services"][service] = rule
+    return policy
+
+
+class LogPolicyStore:
+    """Log policy published to the services, persisted as JSON next to the segments.
+
+    Every update bumps ``version`` (served as the ETag). The file lives on the
+    volume every replica shares (``logs-data`` in k8s) and is re-read whenever
+    it is replaced, so all workers and replicas serve the same version; updates
+    take ``policy.lock`` so two of them never produce the same version.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._policy: Dict[str, Any] = {"version": 0, "updated_at": None, **validate_policy({})}
+
+    def get(self) -> Dict[str, Any]:
+        with self._lock:
+            try:
+                stat = self.path.stat()
+            except FileNotFoundError:
+                return self._policy
+            # Cada update reemplaza el archivo (inodo nuevo): el mtime solo puede repetirse
+            stamp = (stat.st_ino, stat.st_mtime_ns)
+            if stamp != self._stamp:
+                try:
+                    self._policy = json.loads(self.path.read_text(encoding="utf-8"))
+                    self._stamp = stamp
+                except (ValueError, FileNotFoundError):
+                    pass  # Reemplazado mientras se leía: se reintenta en la próxima lectura
+            return self._policy
+
+    def update(self, doc: Any) -> Dict[str, Any]:
+        """Replace the policy (raises InvalidPolicy) and return the stored version"""
+        policy = validate_policy(doc)
+        with open(self.path.with_suffix(".lock"), "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)  # Otros workers y réplicas esperan aquí
+            current = self.get()
+            with self._lock:
+                policy = {"version": int(current.get("version", 0)) + 1, "updated_at": time.time(), **policy}
+                tmp = self.path.with_suffix(".tmp")
+                tmp.write_text(json.dumps(policy, indent=2), encoding="utf-8")
+                tmp.replace(self.path)
+                stat = self.path.stat()
+                self._policy = policy
+                self._stamp = (stat.st_ino, stat.st_mtime_ns)
+        return policy
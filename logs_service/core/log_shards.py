@@ -0,0 +1,183 @@
+import base64
+import heapq
+import json
+import os
+import socket
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from core.log_store import LogStore
+
+# Orden total de los registros de todos los shards: (ts, shard, segmento, offset)
+Key = Tuple[float, str, int, int]
+
+
+def default_writer_id() -> str:
+    """One shard per process: pod name (HOSTNAME) plus pid covers replicas and uvicorn workers"""
+    return os.getenv("LOG_WRITER_ID") or f"{socket.gethostname()}-{os.getpid()}"
+
+
+def migrate_flat_layout(root: Path) -> None:
+    """Move segments written before sharding (directly under ``root``) into ``root/legacy``"""
+    files = [p for p in root.glob("*") if p.is_file() and (p.name.startswith("segment-") or p.name == "manifest.json")]
+    if not files:
+        return
+    legacy = root / "legacy"
+    legacy.mkdir(exist_ok=True)
+    for path in files:
+        try:
+            path.rename(legacy / path.name)
+        except FileNotFoundError:
+            pass  # Otro worker la movió primero
+
+
+def encode_cursor(key: Key) -> str:
+    raw = json.dumps(list(key), separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Key]:
+    if not cursor:
+        return None
+    padded = cursor + "=" * (-len(cursor) % 4)
+    data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    try:
+        ts, shard, seq, offset = data
+        return float(ts), str(shard), int(seq), int(offset)
+    except (TypeError, ValueError):
+        raise ValueError(f"invalid cursor: {cursor}")
+
+
+class ShardedLogReader:
+    """Merge-on-read view over every writer shard under ``root``.
+
+    Each worker/replica writes only its own shard; queries and exports open the
+    other shards read-only and merge their lazily-filtered streams by timestamp,
+    so callers see a single time-ordered stream. Replicas only see each other's
+    shards when ``root`` is on a shared volume (``logs-data`` in k8s).
+    """
+
+    def __init__(self, root: Path, local: LogStore, index_interval: int = 256, index_cache_size: int = 16):
+        self.root = Path(root)
+        self.local = local
+        self.index_interval = index_interval
+        self.index_cache_size = index_cache_size
+        self._lock = threading.Lock()
+        self._stores: Dict[str, LogStore] = {}
+
+    def stores(self) -> Dict[str, LogStore]:
+        """Current shards (local one included), opening newly discovered ones read-only"""
+        shards = {p.parent.name for p in self.root.glob("*/manifest.json")}
+        with self._lock:
+            for name in list(self._stores):
+                if name not in shards:
+                    del self._stores[name]
+            for name in shards:
+                if name == self.local.directory.name or name in self._stores:
+                    continue
+                self._stores[name] = LogStore(
+                    self.root / name,
+                    index_interval=self.index_interval,
+                    index_cache_size=self.index_cache_size,
+                    readonly=True,
+                )
+            stores = dict(self._stores)
+        stores[self.local.directory.name] = self.local
+        return stores
+
+    def index_cache_stats(self) -> Dict[str, int]:
+        """Sidecar index cache counters summed over the shards opened so far"""
+        with self._lock:
+            stores = list(self._stores.values())
+        stores.append(self.local)
+        return {
+            "hits": sum(s.index_hits for s in stores),
+            "misses": sum(s.index_misses for s in stores),
+            "entries": sum(len(s._index_cache) for s in stores),
+        }
+
+    def iter_merged(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        filters: Optional[Dict[str, str]] = None,
+        text: Optional[str] = None,
+        descending: bool = True,
+        after: Optional[Key] = None,
+        counters: Optional[Dict[str, int]] = None,
+    ) -> Iterator[Tuple[Key, Dict[str, Any]]]:
+        """Yield ``(key, record)`` across shards in timestamp order, strictly past the ``after`` key"""
+
+        def _tagged(shard: str, store: LogStore):
+            for ts, seq, offset, record in store.iter_records(
+                start, end, filters, text, descending, after[0] if after else None, counters
+            ):
+                key = (ts, shard, seq, offset)
+                if after is not None and (key >= after if descending else key <= after):
+                    continue
+                yield key, record
+
+        streams = [_tagged(shard, store) for shard, store in sorted(self.stores().items())]
+        return heapq.merge(*streams, key=lambda item: item[0], reverse=descending)
+
+    def search(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        service: Optional[str] = None,
+        level: Optional[str] = None,
+        user: Optional[str] = None,
+        trace_id: Optional[str] = None,
+        text: Optional[str] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        order: str = "desc",
+    ) -> Dict[str, Any]:
+        """Filter records across shards by time range, indexed fields and message text.
+
+        The opaque ``cursor`` holds the sort key (ts, shard, segment, offset) of
+        the last returned record, so the next page resumes right after it.
+        """
+        filters = {
+            field: value
+            for field, value in (("service", service), ("level", level), ("user", user), ("trace_id", trace_id))
+            if value
+        }
+        last = decode_cursor(cursor)
+        counters: Dict[str, int] = {"scanned": 0}
+        records: List[Dict[str, Any]] = []
+        more = False
+
+        for key, record in self.iter_merged(start, end, filters, text, order != "asc", last, counters):
+            if len(records) == limit:
+                more = True
+                break
+            record["writer"] = key[1]
+            records.append(record)
+            last = key
+
+        return {
+            "records": records,
+            "count": len(records),
+            "scanned": counters["scanned"],
+            "shards": len(self._stores) + 1,
+            "next_cursor": encode_cursor(last) if more else None,
+        }
+
+    def export(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        filters: Optional[Dict[str, str]] = None,
+        text: Optional[str] = None,
+    ) -> Iterator[bytes]:
+        """Time-ordered JSONL export of every shard (oldest first)"""
+        batch: List[str] = []
+        for key, record in self.iter_merged(start, end, filters, text, descending=False):
+            record["writer"] = key[1]
+            batch.append(json.dumps(record, default=str, ensure_ascii=False))
+            if len(batch) >= 500:
+                yield ("\n".join(batch) + "\n").encode("utf-8")
+                batch = []
+        if batch:
+            yield ("\n".join(batch) + "\n").encode("utf-8")
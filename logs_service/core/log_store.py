@@ -0,0 +1,713 @@
+import heapq
+import itertools
+import json
+import mmap
+import threading
+import time
+import zlib
+from bisect import bisect_right
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows (desarrollo local): sin bloqueo de shard
+    fcntl = None
+
+# Campos con posting list (valor -> offsets de los registros)
+INDEXED_FIELDS = ("service", "level", "user", "trace_id")
+# Un bloque del índice temporal no pasa de esto aunque no llegue a ``interval`` registros
+INDEX_BLOCK_BYTES = 64 * 1024
+
+
+def _raw_needle(needle: str) -> Optional[str]:
+    """The needle itself if it can be looked for in the raw JSON line, else None.
+
+    Quotes, backslashes and control characters are escaped in the line, so a
+    needle containing them would never be found there.
+    """
+    if any(c in '"\\' or ord(c) < 0x20 for c in needle):
+        return None
+    return needle
+
+
+class SegmentIndex:
+    """Sparse time index and posting lists for one JSONL segment.
+
+    ``blocks`` holds one ``[offset, min_ts, max_ts]`` entry per run of at most
+    ``interval`` records or ``INDEX_BLOCK_BYTES`` bytes. Records are in arrival
+    order, not time order (spool replays, batches from several services), so
+    neighbouring blocks may overlap in time; queries only rely on each block's
+    own bounds. ``postings`` maps field -> value -> sorted record offsets.
+    """
+
+    def __init__(self, interval: int = 256):
+        self.interval = interval
+        self.blocks: List[List[float]] = []
+        self.postings: Dict[str, Dict[str, List[int]]] = {field: {} for field in INDEXED_FIELDS}
+        self.count = 0
+        self.size = 0
+        self.min_ts: Optional[float] = None
+        self.max_ts: Optional[float] = None
+        # Registros del último bloque
+        self._block_count = 0
+        # Bloques gzip de un segmento comprimido: [raw_offset, gz_offset, gz_length]
+        self.gz_blocks: List[List[int]] = []
+
+    def add(self, record: Dict[str, Any], offset: int, length: int) -> None:
+        ts = float(record.get("ts") or 0.0)
+        block = self.blocks[-1] if self.blocks else None
+        if block is None or self._block_count >= self.interval or offset - block[0] >= INDEX_BLOCK_BYTES:
+            self.blocks.append([offset, ts, ts])
+            self._block_count = 0
+        else:
+            block[1] = min(block[1], ts)
+            block[2] = max(block[2], ts)
+        self._block_count += 1
+
+        for field in INDEXED_FIELDS:
+            value = record.get(field)
+            if value is not None:
+                self.postings[field].setdefault(str(value), []).append(offset)
+
+        self.min_ts = ts if self.min_ts is None else min(self.min_ts, ts)
+        self.max_ts = ts if self.max_ts is None else max(self.max_ts, ts)
+        self.count += 1
+        self.size = offset + length
+
+    def overlaps(self, start: Optional[float], end: Optional[float]) -> bool:
+        if self.count == 0:
+            return False
+        if start is not None and self.max_ts < start:
+            return False
+        if end is not None and self.min_ts > end:
+            return False
+        return True
+
+    def candidates(self, filters: Dict[str, str], size: int) -> Optional[List[int]]:
+        """Offsets matching every field filter, or None when no field filter applies"""
+        lists = []
+        for field, value in filters.items():
+            lists.append(self.postings.get(field, {}).get(value, []))
+        if not lists:
+            return None
+        lists.sort(key=len)
+        result = [offset for offset in lists[0] if offset < size]
+        for other in lists[1:]:
+            allowed = set(other)
+            result = [offset for offset in result if offset in allowed]
+        return result
+
+    def spans(
+        self, start: Optional[float], end: Optional[float], filters: Dict[str, str], size: int
+    ) -> List[Tuple[float, float, Any]]:
+        """Blocks that may hold matching records, as ``(min_ts, max_ts, span)``.
+
+        ``span`` is the block's byte range ``(start, end)``, or the list of its
+        candidate offsets when a field filter applies.
+        """
+        candidates = self.candidates(filters, size)
+        grouped: Dict[int, List[int]] = {}
+        if candidates is not None:
+            starts = [int(block[0]) for block in self.blocks]
+            for offset in candidates:
+                grouped.setdefault(bisect_right(starts, offset) - 1, []).append(offset)
+
+        result = []
+        for i, (offset, min_ts, max_ts) in enumerate(self.blocks):
+            if offset >= size:
+                break
+            if (start is not None and max_ts < start) or (end is not None and min_ts > end):
+                continue
+            if candidates is None:
+                block_end = int(self.blocks[i + 1][0]) if i + 1 < len(self.blocks) else size
+                result.append((min_ts, max_ts, (int(offset), min(block_end, size))))
+            elif i in grouped:
+                result.append((min_ts, max_ts, grouped[i]))
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "interval": self.interval,
+            "blocks": self.blocks,
+            "postings": self.postings,
+            "count": self.count,
+            "size": self.size,
+            "min_ts": self.min_ts,
+            "max_ts": self.max_ts,
+            "gz_blocks": self.gz_blocks,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SegmentIndex":
+        index = cls(data.get("interval", 256))
+        index.blocks = data.get("blocks", [])
+        index.postings = {field: data.get("postings", {}).get(field, {}) for field in INDEXED_FIELDS}
+        index.count = data.get("count", 0)
+        index.size = data.get("size", 0)
+        index.min_ts = data.get("min_ts")
+        index.max_ts = data.get("max_ts")
+        index.gz_blocks = data.get("gz_blocks", [])
+        # Sin saber cuántos registros tiene el último bloque, lo siguiente empieza uno nuevo
+        index._block_count = index.interval
+        return index
+
+
+ACTIVE = "active"
+SEALED = "sealed"
+COMPRESSED = "compressed"
+
+
+class _RawReader:
+    """Reads lines of an uncompressed segment through a memory map"""
+
+    def __init__(self, path: Path, size: int):
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), size, access=mmap.ACCESS_READ)
+        self.size = size
+
+    def line(self, offset: int) -> bytes:
+        newline = self._mm.find(b"\n", offset, self.size)
+        return self._mm[offset:newline if newline != -1 else self.size]
+
+    def lines(self, start: int, end: int) -> Iterator[Tuple[int, bytes]]:
+        pos = start
+        while pos < end:
+            newline = self._mm.find(b"\n", pos, end)
+            if newline == -1:
+                break
+            yield pos, self._mm[pos:newline]
+            pos = newline + 1
+
+    def close(self) -> None:
+        self._mm.close()
+        self._file.close()
+
+
+class _GzipReader:
+    """Reads lines of a compressed segment, inflating only the gzip blocks it needs.
+
+    The file is a concatenation of independent gzip members aligned on line
+    boundaries, so it is still a valid ``.gz`` for ``zcat``.
+    """
+
+    def __init__(self, path: Path, blocks: List[List[int]], size: int):
+        self._file = open(path, "rb")
+        self._blocks = blocks
+        self._starts = [block[0] for block in blocks]
+        self.size = size
+        self._cache: Tuple[int, bytes] = (-1, b"")
+
+    def _block(self, offset: int) -> Tuple[int, bytes]:
+        i = bisect_right(self._starts, offset) - 1
+        raw_offset, gz_offset, gz_length = self._blocks[i]
+        if self._cache[0] != raw_offset:
+            self._file.seek(gz_offset)
+            data = zlib.decompress(self._file.read(gz_length), 16 + zlib.MAX_WBITS)
+            self._cache = (raw_offset, data)
+        return self._cache
+
+    def line(self, offset: int) -> bytes:
+        raw_offset, data = self._block(offset)
+        rel = offset - raw_offset
+        newline = data.find(b"\n", rel)
+        return data[rel:newline if newline != -1 else len(data)]
+
+    def lines(self, start: int, end: int) -> Iterator[Tuple[int, bytes]]:
+        pos = start
+        while pos < min(end, self.size):
+            raw_offset, data = self._block(pos)
+            rel = pos - raw_offset
+            newline = data.find(b"\n", rel)
+            if newline == -1:
+                break
+            yield pos, data[rel:newline]
+            pos = raw_offset + newline + 1
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class Segment:
+    """A JSONL data file (plain or gzip), its index sidecar and its manifest entry.
+
+    Only the active segment and sealed segments waiting for the maintenance pass
+    keep their index in memory; older indexes are loaded on demand by the store.
+    """
+
+    def __init__(self, directory: Path, seq: int, index_interval: int = 256, state: str = ACTIVE):
+        self.seq = seq
+        self.state = state
+        self.path = directory / f"segment-{seq:08d}.jsonl"
+        self.gz_path = directory / f"segment-{seq:08d}.jsonl.gz"
+        self.index_path = directory / f"segment-{seq:08d}.idx.json"
+        self.index_interval = index_interval
+        self.index: Optional[SegmentIndex] = SegmentIndex(index_interval) if state == ACTIVE else None
+
+        self.created_at = time.time()
+        self.sealed_at: Optional[float] = None
+        self.count = 0
+        self.size = 0
+        self.disk_size = 0
+        self.min_ts: Optional[float] = None
+        self.max_ts: Optional[float] = None
+
+    def summarize(self, index: Optional[SegmentIndex] = None) -> None:
+        """Copy the index counters into the manifest fields"""
+        index = index or self.index
+        if index is None:
+            return
+        self.count = index.count
+        self.size = index.size
+        self.min_ts = index.min_ts
+        self.max_ts = index.max_ts
+        if self.state != COMPRESSED:
+            self.disk_size = self.size
+
+    def overlaps(self, start: Optional[float], end: Optional[float]) -> bool:
+        if self.count == 0:
+            return False
+        if start is not None and self.max_ts < start:
+            return False
+        if end is not None and self.min_ts > end:
+            return False
+        return True
+
+    def load_index(self) -> SegmentIndex:
+        """Load the sidecar index, rebuilding it from the plain data file if needed"""
+        if self.index_path.exists():
+            try:
+                index = SegmentIndex.from_dict(json.loads(self.index_path.read_text(encoding="utf-8")))
+                if self.state == COMPRESSED or (self.path.exists() and index.size == self.path.stat().st_size):
+                    return index
+            except (ValueError, OSError):
+                pass
+        return self.rebuild_index()
+
+    def rebuild_index(self, index: Optional[SegmentIndex] = None) -> SegmentIndex:
+        """Index the plain data file, continuing after ``index.size`` when given"""
+        index = index or SegmentIndex(self.index_interval)
+        if self.path.exists():
+            offset = index.size
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # Línea incompleta al final (escritura interrumpida)
+                    try:
+                        index.add(json.loads(line), offset, len(line))
+                    except ValueError:
+                        pass
+                    offset += len(line)
+        return index
+
+    def save_index(self, index: SegmentIndex) -> None:
+        tmp = self.index_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(index.to_dict()), encoding="utf-8")
+        tmp.replace(self.index_path)
+
+    def open_reader(self, index: SegmentIndex, size: int):
+        if self.state != COMPRESSED:
+            try:
+                return _RawReader(self.path, size)
+            except FileNotFoundError:
+                # Comprimido por el mantenimiento (propio o de otro writer) después del snapshot
+                if not self.gz_path.exists():
+                    raise
+                self.state = COMPRESSED
+        if not index.gz_blocks:
+            # Índice construido desde el archivo plano antes de la compresión
+            index = self.load_index()
+        return _GzipReader(self.gz_path, index.gz_blocks, size)
+
+    def delete(self) -> None:
+        self.path.unlink(missing_ok=True)
+        self.gz_path.unlink(missing_ok=True)
+        self.index_path.unlink(missing_ok=True)
+
+    def to_manifest(self) -> Dict[str, Any]:
+        return {
+            "seq": self.seq,
+            "state": self.state,
+            "file": (self.gz_path if self.state == COMPRESSED else self.path).name,
+            "index": self.index_path.name,
+            "created_at": self.created_at,
+            "sealed_at": self.sealed_at,
+            "count": self.count,
+            "size": self.size,
+            "disk_size": self.disk_size,
+            "min_ts": self.min_ts,
+            "max_ts": self.max_ts,
+        }
+
+    @classmethod
+    def from_manifest(cls, directory: Path, entry: Dict[str, Any], index_interval: int = 256) -> "Segment":
+        segment = cls(directory, entry["seq"], index_interval, state=entry.get("state", SEALED))
+        segment.index = None  # El índice se carga (o reconstruye) al leer
+        segment.created_at = entry.get("created_at") or segment.created_at
+        segment.sealed_at = entry.get("sealed_at")
+        segment.count = entry.get("count", 0)
+        segment.size = entry.get("size", 0)
+        segment.disk_size = entry.get("disk_size", 0)
+        segment.min_ts = entry.get("min_ts")
+        segment.max_ts = entry.get("max_ts")
+        return segment
+
+
+class ShardLocked(Exception):
+    """Raised when another live process owns the shard directory"""
+
+
+class LogStore:
+    """Append-only store of structured JSON lines split into indexed segments.
+
+    One store is one writer shard: the owning process holds ``writer.lock`` and its
+    writer thread calls ``write_batch``. Other processes open the same directory
+    with ``readonly=True`` to read it. ``manifest.json`` lists every segment with
+    its state and time range, so readers never list the directory. Plain segments
+    are read through memory-mapped files and compressed ones block by block, so a
+    query only touches the data selected by the indexes. Compression and
+    retention run in ``SegmentManager``.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        max_segment_bytes: int = 10 * 1024 * 1024,
+        index_interval: int = 256,
+        index_cache_size: int = 16,
+        readonly: bool = False,
+    ):
+        self.directory = Path(directory)
+        self.manifest_path = self.directory / "manifest.json"
+        self.max_segment_bytes = max_segment_bytes
+        self.index_interval = index_interval
+        self.index_cache_size = index_cache_size
+        self.readonly = readonly
+
+        self._lock = threading.RLock()
+        self._stream = None
+        self._lock_file = None
+        self._manifest_mtime: Optional[float] = None
+        self._index_cache: "OrderedDict[int, SegmentIndex]" = OrderedDict()
+        self.segments: List[Segment] = []
+        self.index_hits = 0
+        self.index_misses = 0
+
+        if readonly:
+            self.refresh()
+        else:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._acquire()
+            self._load()
+
+    # ---- propiedad del shard ---------------------------------------------
+
+    def _acquire(self) -> None:
+        """Take the shard's writer lock (non-blocking); a held lock means a live owner"""
+        if fcntl is None:
+            return
+        lock_file = open(self.directory / "writer.lock", "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            raise ShardLocked(str(self.directory))
+        self._lock_file = lock_file
+
+    def release(self) -> None:
+        self.close()
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    # ---- manifest --------------------------------------------------------
+
+    def _read_manifest(self) -> List[Segment]:
+        segments = []
+        manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        for entry in manifest.get("segments", []):
+            segment = Segment.from_manifest(self.directory, entry, self.index_interval)
+            data_path = segment.gz_path if segment.state == COMPRESSED else segment.path
+            if data_path.exists() or segment.state == ACTIVE:
+                segments.append(segment)
+        return segments
+
+    def refresh(self) -> None:
+        """Reload the manifest of a read-only shard if its owner rewrote it"""
+        try:
+            mtime = self.manifest_path.stat().st_mtime
+        except FileNotFoundError:
+            self.segments = []
+            return
+        if mtime == self._manifest_mtime:
+            return
+        try:
+            segments = self._read_manifest()
+        except (ValueError, OSError, KeyError):
+            return  # Manifest a medio escribir: se reintenta en la próxima lectura
+        with self._lock:
+            self.segments = segments
+            self._manifest_mtime = mtime
+
+    def _load(self) -> None:
+        if self.manifest_path.exists():
+            try:
+                self.segments = self._read_manifest()
+            except (ValueError, OSError, KeyError):
+                self.segments = []
+
+        if not self.segments:
+            # Sin manifest (o ilegible): recuperar los segmentos planos del directorio
+            seqs = sorted(
+                int(p.name[len("segment-"):-len(".jsonl")])
+                for p in self.directory.glob("segment-*.jsonl")
+            )
+            for seq in seqs:
+                segment = Segment(self.directory, seq, self.index_interval, state=SEALED)
+                segment.index = segment.load_index()
+                segment.summarize()
+                self.segments.append(segment)
+
+        # El último segmento sigue siendo el activo: reconstruir su índice desde el archivo
+        if self.segments and self.segments[-1].state != COMPRESSED:
+            active = self.segments[-1]
+            active.state = ACTIVE
+            active.sealed_at = None
+            active.index = active.rebuild_index()
+            active.summarize()
+        else:
+            next_seq = self.segments[-1].seq + 1 if self.segments else 1
+            self.segments.append(Segment(self.directory, next_seq, self.index_interval))
+        self.save_manifest()
+
+    def save_manifest(self) -> None:
+        if self.readonly:
+            return
+        with self._lock:
+            data = {"updated_at": time.time(), "segments": [s.to_manifest() for s in self.segments]}
+        tmp = self.manifest_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data), encoding="utf-8")
+        tmp.replace(self.manifest_path)
+
+    # ---- escritura -------------------------------------------------------
+
+    @property
+    def active(self) -> Segment:
+        return self.segments[-1]
+
+    def _open(self):
+        if self._stream is None:
+            active = self.active
+            # Descartar una posible línea incompleta antes de seguir escribiendo
+            if active.path.exists() and active.path.stat().st_size != active.index.size:
+                with open(active.path, "r+b") as f:
+                    f.truncate(active.index.size)
+            self._stream = open(active.path, "ab")
+        return self._stream
+
+    def write_batch(self, records: List[Dict[str, Any]]) -> None:
+        lines = [
+            (record, (json.dumps(record, default=str, ensure_ascii=False) + "\n").encode("utf-8"))
+            for record in records
+        ]
+        with self._lock:
+            # Partir el lote donde el segmento llegaría al máximo: un lote grande no lo desborda
+            chunk: List[Tuple[Dict[str, Any], bytes]] = []
+            size = self.active.index.size
+            for record, line in lines:
+                if size and size + len(line) > self.max_segment_bytes:
+                    self._append(chunk)
+                    chunk = []
+                    self.seal()
+                    size = 0
+                chunk.append((record, line))
+                size += len(line)
+            self._append(chunk)
+            if self.active.size >= self.max_segment_bytes:
+                self.seal()
+
+    def _append(self, lines: List[Tuple[Dict[str, Any], bytes]]) -> None:
+        """Write encoded lines to the active segment and index them (lock held)"""
+        if not lines:
+            return
+        stream = self._open()
+        stream.write(b"".join(line for _, line in lines))
+        stream.flush()
+        active = self.active
+        offset = active.index.size
+        for record, line in lines:
+            active.index.add(record, offset, len(line))
+            offset += len(line)
+        active.summarize()
+
+    def seal(self) -> Optional[Segment]:
+        """Close the active segment and start a new one.
+
+        Only renames state in memory and rewrites the small manifest; persisting the
+        index and compressing happen later on the maintenance thread.
+        """
+        with self._lock:
+            sealed = self.active
+            if sealed.count == 0:
+                return None
+            self.close()
+            sealed.state = SEALED
+            sealed.sealed_at = time.time()
+            self.segments.append(Segment(self.directory, sealed.seq + 1, self.index_interval))
+        self.save_manifest()
+        return sealed
+
+    def close(self) -> None:
+        with self._lock:
+            if self._stream is not None:
+                self._stream.close()
+                self._stream = None
+
+    # ---- lectura ---------------------------------------------------------
+
+    def index_for(self, segment: Segment) -> SegmentIndex:
+        """In-memory index of active/just-sealed segments, otherwise an LRU-cached sidecar.
+
+        For the active segment of a read-only shard the cached index is extended
+        with whatever the owner appended since the last read.
+        """
+        index = segment.index
+        if index is not None:
+            return index
+        with self._lock:
+            index = self._index_cache.get(segment.seq)
+            if index is not None:
+                self._index_cache.move_to_end(segment.seq)
+                if not (self.readonly and segment.state == ACTIVE):
+                    self.index_hits += 1
+                    return index
+            self.index_misses += 1
+        if self.readonly and segment.state == ACTIVE:
+            index = segment.rebuild_index(index)
+            segment.summarize(index)
+        else:
+            index = segment.load_index()
+        with self._lock:
+            self._index_cache[segment.seq] = index
+            while len(self._index_cache) > self.index_cache_size:
+                self._index_cache.popitem(last=False)
+        return index
+
+    def forget_index(self, seq: int) -> None:
+        with self._lock:
+            self._index_cache.pop(seq, None)
+
+    def _snapshot(self) -> List[Segment]:
+        if self.readonly:
+            self.refresh()
+            for segment in self.segments:
+                if segment.state == ACTIVE:
+                    self.index_for(segment)
+        with self._lock:
+            return list(self.segments)
+
+    @staticmethod
+    def _read(reader: Any, span: Any) -> Iterator[Tuple[int, bytes]]:
+        """Lines of a block: its candidate offsets, or every line of its byte range"""
+        if isinstance(span, list):
+            return ((offset, reader.line(offset)) for offset in span)
+        return reader.lines(*span)
+
+    def iter_records(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        filters: Optional[Dict[str, str]] = None,
+        text: Optional[str] = None,
+        descending: bool = True,
+        after: Optional[float] = None,
+        counters: Optional[Dict[str, int]] = None,
+    ) -> Iterator[Tuple[float, int, int, Dict[str, Any]]]:
+        """Lazily yield ``(ts, segment, offset, record)`` matching the filters, ordered by that key.
+
+        Segments hold records in arrival order, which is not time order: delayed
+        batches and spool replays keep their original ``ts``. Every index block is
+        only bounded by its own min/max ``ts``, so blocks (and whole segments,
+        before their index is loaded) are opened in order of that bound and their
+        records merged through a heap. A record is yielded once no unopened block
+        can hold an earlier one (a later one when ``descending``).
+
+        ``after`` is the ``ts`` of the last record a previous page returned: blocks
+        entirely before it are not read again. Records at exactly that ``ts`` still
+        come back, the caller skips the ones it already delivered.
+        """
+        filters = filters or {}
+        needle = text.lower() if text else None
+        raw_needle = _raw_needle(needle) if needle else None
+        # Descendente: claves negadas, el heap siempre saca la menor
+        sign = -1 if descending else 1
+
+        def bound(min_ts: float, max_ts: float) -> float:
+            return -max_ts if descending else min_ts
+
+        def done(min_ts: float, max_ts: float) -> bool:
+            """Entirely on the side of the cursor already delivered"""
+            if after is None:
+                return False
+            return min_ts > after if descending else max_ts < after
+
+        # (cota, desempate, segmento, tamaño, (índice, bloque) o None mientras no se haya cargado el índice)
+        pending: List[Tuple[float, int, Segment, int, Any]] = []
+        tiebreak = itertools.count()
+        for segment in self._snapshot():
+            size = segment.size
+            if size == 0 or not segment.overlaps(start, end) or done(segment.min_ts, segment.max_ts):
+                continue
+            heapq.heappush(pending, (bound(segment.min_ts, segment.max_ts), next(tiebreak), segment, size, None))
+
+        merged: List[Tuple[Tuple[float, int, int], Dict[str, Any]]] = []
+        readers: Dict[int, Any] = {}
+        try:
+            while True:
+                while pending and (not merged or pending[0][0] <= merged[0][0][0]):
+                    _, _, segment, size, block = heapq.heappop(pending)
+                    try:
+                        if block is None:
+                            index = self.index_for(segment)
+                            for min_ts, max_ts, span in index.spans(start, end, filters, size):
+                                if not done(min_ts, max_ts):
+                                    heapq.heappush(pending, (bound(min_ts, max_ts), next(tiebreak), segment, size, (index, span)))
+                            continue
+                        index, span = block
+                        reader = readers.get(segment.seq)
+                        if reader is None:
+                            reader = readers[segment.seq] = segment.open_reader(index, size)
+                    except FileNotFoundError:
+                        continue  # Eliminado por la retención
+
+                    for offset, line in self._read(reader, span):
+                        if counters is not None:
+                            counters["scanned"] = counters.get("scanned", 0) + 1
+                        # Descarte barato antes del json.loads; la comprobación exacta es la del mensaje
+                        if raw_needle and raw_needle not in line.decode("utf-8", "replace").lower():
+                            continue
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            continue
+
+                        ts = float(record.get("ts") or 0.0)
+                        if (start is not None and ts < start) or (end is not None and ts > end):
+                            continue
+                        if after is not None and (ts > after if descending else ts < after):
+                            continue
+                        if any(str(record.get(field)) != value for field, value in filters.items()):
+                            continue
+                        if needle and needle not in str(record.get("message", "")).lower():
+                            continue
+                        heapq.heappush(merged, ((sign * ts, sign * segment.seq, sign * offset), record))
+
+                if not merged:
+                    return
+                (ts, seq, offset), record = heapq.heappop(merged)
+                yield sign * ts, sign * seq, sign * offset, record
+        finally:
+            for reader in readers.values():
+                reader.close()
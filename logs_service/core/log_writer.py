@@ -0,0 +1,166 @@
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+
+class LogQueueFull(Exception):
+    """Raised when the writer queue is saturated and cannot accept more records"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Log writer queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class LogWriter:
+    """Bounded queue drained by a dedicated thread that writes buffered batches to a sink.
+
+    Producers never touch the disk: ``submit`` is a non-blocking put and raises
+    ``LogQueueFull`` when the queue is saturated so callers can apply backpressure.
+    """
+
+    def __init__(
+        self,
+        sink: Any,
+        max_queue_size: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 0.5,
+        retry_after: int = 1,
+    ):
+        self.sink = sink
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_after = retry_after
+
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._start_lock = threading.Lock()
+
+        # Métricas
+        self._latencies: deque = deque(maxlen=1024)
+        self._enqueued = 0
+        self._written = 0
+        self._batches = 0
+        self._dropped = 0
+        self._rejected = 0
+        self._write_errors = 0
+        self._last_flush: Optional[float] = None
+
+    def start(self) -> None:
+        """Start the writer thread (idempotent)"""
+        with self._start_lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Drain the queue and stop the writer thread (which closes the sink when it exits)"""
+        self._stopping.set()
+        if self._thread is None:
+            self.sink.close()
+            return
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            sys.stderr.write(f"log writer: still writing after {timeout}s, the sink closes when it finishes\n")
+
+    @property
+    def saturated(self) -> bool:
+        return self._queue.qsize() >= self.max_queue_size
+
+    def check_capacity(self) -> None:
+        """Raise LogQueueFull before doing any work for a record that would be rejected"""
+        if self.saturated:
+            self._rejected += 1
+            raise LogQueueFull(self.retry_after)
+
+    def submit(self, item: Any) -> None:
+        """Enqueue an item for the writer thread without blocking"""
+        if self._thread is None or not self._thread.is_alive():
+            self.start()
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self._dropped += 1
+            raise LogQueueFull(self.retry_after)
+        self._enqueued += 1
+
+    def _next_batch(self) -> List[Any]:
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._stopping.is_set():
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        try:
+            while True:
+                batch = self._next_batch()
+                if batch:
+                    self._flush(batch)
+                elif self._stopping.is_set():
+                    break
+        finally:
+            # Solo este hilo sabe cuándo terminó el último lote: stop() no cierra a mitad de uno
+            self.sink.close()
+
+    def _flush(self, batch: List[Any]) -> None:
+        start = time.perf_counter()
+        try:
+            self.sink.write_batch(batch)
+            self._written += len(batch)
+        except Exception as e:
+            # No usamos logging aquí: el handler de archivo volvería a encolar en este writer
+            self._write_errors += 1
+            sys.stderr.write(f"log writer: failed to write batch of {len(batch)}: {e}\n")
+        finally:
+            self._latencies.append(time.perf_counter() - start)
+            self._batches += 1
+            self._last_flush = time.time()
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of queue depth and write latency metrics"""
+        latencies = sorted(self._latencies)
+        depth = self._queue.qsize()
+
+        def _pct(p: float) -> float:
+            if not latencies:
+                return 0.0
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 3)
+
+        return {
+            "running": bool(self._thread and self._thread.is_alive()),
+            "queue_depth": depth,
+            "queue_max_size": self.max_queue_size,
+            "queue_utilization": round(depth / self.max_queue_size, 4) if self.max_queue_size else 0.0,
+            "batch_size": self.batch_size,
+            "flush_interval": self.flush_interval,
+            "enqueued": self._enqueued,
+            "written": self._written,
+            "batches": self._batches,
+            "dropped": self._dropped,
+            "rejected": self._rejected,
+            "write_errors": self._write_errors,
+            "last_flush": self._last_flush,
+            "write_latency_ms": {
+                "p50": _pct(0.50),
+                "p95": _pct(0.95),
+                "p99": _pct(0.99),
+                "max": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+            },
+        }
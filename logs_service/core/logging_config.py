@@ -1,12 +1,103 @@
 import logging
-from logging.handlers import RotatingFileHandler
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
+from core.config import settings
+from core.log_store import LogStore
+from core.latency_stats import LatencyAggregator, normalize_path
+from core.live_tail import TailHub
+from core.log_policy import LogPolicyStore
+from core.log_shards import ShardedLogReader, default_writer_id, migrate_flat_layout
+from core.log_writer import LogWriter, LogQueueFull
+from core.segment_manager import SegmentManager
+from core.tracing import current_trace
 
 # SOLO el logs_service tiene carpeta logs
-LOG_DIR = Path(__file__).parent / "../logs"
+LOG_DIR = Path(settings.LOG_DIR)
 LOG_DIR.mkdir(parents=True, exist_ok=True)
 
+# Registros estructurados (JSON lines) en segmentos indexados. Cada proceso (worker de
+# uvicorn o réplica) escribe solo en su propio shard; las lecturas los combinan por tiempo
+SEGMENTS_DIR = LOG_DIR / "segments"
+SEGMENTS_DIR.mkdir(parents=True, exist_ok=True)
+migrate_flat_layout(SEGMENTS_DIR)
+WRITER_ID = default_writer_id()
+
+log_store = LogStore(
+    SEGMENTS_DIR / WRITER_ID,
+    max_segment_bytes=settings.LOG_MAX_SIZE,
+    index_interval=settings.LOG_INDEX_INTERVAL,
+    index_cache_size=settings.LOG_INDEX_CACHE_SIZE,
+)
+
+log_reader = ShardedLogReader(
+    SEGMENTS_DIR,
+    log_store,
+    index_interval=settings.LOG_INDEX_INTERVAL,
+    index_cache_size=settings.LOG_INDEX_CACHE_SIZE,
+)
+
+# Cierre por antigüedad, compresión y retención en segundo plano
+segment_manager = SegmentManager(
+    log_store,
+    max_segment_age=settings.LOG_SEGMENT_MAX_AGE,
+    retention_seconds=settings.LOG_RETENTION_SECONDS,
+    max_total_bytes=settings.LOG_MAX_TOTAL_BYTES,
+    compress_block_bytes=settings.LOG_COMPRESS_BLOCK_BYTES,
+    interval=settings.LOG_MAINTENANCE_INTERVAL,
+)
+
+# Un único writer compartido por todos los loggers: la escritura a disco (y la rotación)
+# ocurre en su propio hilo, nunca en el event loop
+log_writer = LogWriter(
+    log_store,
+    max_queue_size=settings.LOG_QUEUE_MAX_SIZE,
+    batch_size=settings.LOG_BATCH_SIZE,
+    flush_interval=settings.LOG_FLUSH_INTERVAL,
+    retry_after=settings.LOG_RETRY_AFTER,
+)
+
+# Suscriptores del tail en vivo
+tail_hub = TailHub(max_subscribers=settings.TAIL_MAX_SUBSCRIBERS)
+
+# Política de niveles y muestreo que los servicios consultan y aplican en origen
+log_policy = LogPolicyStore(LOG_DIR / "policy.json")
+
+class QueuedFileHandler(logging.Handler):
+    """Turns log records into structured entries and hands them to the writer thread"""
+
+    def __init__(self, writer: LogWriter):
+        super().__init__()
+        self.writer = writer
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            data = getattr(record, "structured", None) or {
+                "service": settings.SERVICE_NAME,
+                "logger": record.name,
+                "user": None,
+                "message": record.getMessage(),
+                "meta": {},
+            }
+            entry = {
+                "ts": record.created,
+                "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+                "level": record.levelname.lower(),
+                **data,
+            }
+            if "trace_id" not in entry:
+                # Registros propios: la traza de la request que se está atendiendo
+                trace = current_trace()
+                entry["trace_id"] = trace.trace_id if trace else None
+            self.writer.submit(entry)
+            tail_hub.publish(entry)
+        except LogQueueFull:
+            # Registros de clientes: el 429 hace que los reenvíen. Los propios solo cuentan en las métricas
+            if getattr(record, "backpressure", False):
+                raise
+        except Exception:
+            self.handleError(record)
+
 def get_logger(name: str = "logs_service") -> logging.Logger:
     """Only logs_service has file handler, others not use it"""
     logger = logging.getLogger(name)
@@ -22,19 +113,26 @@ def get_logger(name: str = "logs_service") -> logging.Logger:
     ch.setFormatter(formatter)
     logger.addHandler(ch)
 
-    # File handler (rotating) - SOLO aquí se escriben archivos
-    fh = RotatingFileHandler(
-        LOG_DIR / "centralized.log", 
-        maxBytes=10 * 1024 * 1024, 
-        backupCount=5, 
-        encoding='utf-8'
-    )
+    # File handler (cola + writer en hilo dedicado) - SOLO aquí se escriben archivos
+    fh = QueuedFileHandler(log_writer)
     fh.setLevel(logging.INFO)
-    fh.setFormatter(formatter)
     logger.addHandler(fh)
 
     return logger
 
+def _emit(logger: logging.Logger, level: str, msg: str, structured: Dict[str, Any], backpressure: bool = False) -> None:
+    lvl = level.lower()
+    extra = {"structured": structured, "backpressure": backpressure}
+
+    if lvl == "debug":
+        logger.debug(msg, extra=extra)
+    elif lvl in ("warning", "warn"):
+        logger.warning(msg, extra=extra)
+    elif lvl == "error":
+        logger.error(msg, extra=extra)
+    else:
+        logger.info(msg, extra=extra)
+
 def write(level: str, message: str, name: Optional[str] = None, **meta: Any) -> None:
     """General logging function"""
     logger = get_logger(name or "logs_service")
@@ -44,25 +142,72 @@ def write(level: str, message: str, name: Optional[str] = None, **meta: Any) ->
     else:
         meta_str = ""
 
-    msg = f"{message}{meta_str}"
-    lvl = level.lower()
+    _emit(logger, level, f"{message}{meta_str}", {
+        "service": settings.SERVICE_NAME,
+        "logger": logger.name,
+        "user": meta.get("user"),
+        "message": message,
+        "meta": meta,
+    })
 
-    if lvl == "debug":
-        logger.debug(msg)
-    elif lvl in ("warning", "warn"):
-        logger.warning(msg)
-    elif lvl == "error":
-        logger.error(msg)
-    else:
-        logger.info(msg)
+def client_log(level: str, message: str, user: Optional[str] = None, meta: Optional[Dict[str, Any]] = None, ts: Optional[float] = None, trace_id: Optional[str] = None) -> None:
+    """Log events from clients/services.
 
-def client_log(level: str, message: str, user: Optional[str] = None, meta: Optional[Dict[str, Any]] = None) -> None:
-    """Log events from clients/services"""
+    ``ts`` keeps the client's original time (e.g. records replayed from a spool) and
+    ``trace_id`` the trace of the request that produced the record, not of the ingestion call.
+    Raises LogQueueFull when the writer is saturated (also if it fills up between the
+    capacity check and the enqueue) so the caller can answer 429.
+    """
+    log_writer.check_capacity()
     meta = meta or {}
     if user is not None:
         meta['user'] = user
-    write(level, message, name="client", **meta)
 
-def request_log(method: str, path: str, status: int, time: float, auth: bool = False, name: Optional[str] = None) -> None:
-    """Log HTTP requests"""
-    write("info", f"request {method} {path} status={status} time={time:.3f}s auth={auth}", name=name or "request")
\ No newline at end of file
+    service = meta.get("service", "unknown")
+    logger_name = meta.get("logger_name", "client")
+    meta_str = " " + " ".join(f"{k}={v}" for k, v in meta.items()) if meta else ""
+
+    structured = {
+        "service": str(service),
+        "logger": str(logger_name),
+        "user": str(user) if user is not None else None,
+        "message": message,
+        "meta": meta,
+        "trace_id": str(trace_id) if trace_id else None,
+    }
+    if ts is not None:
+        structured["ts"] = ts
+        structured["timestamp"] = datetime.fromtimestamp(ts, timezone.utc).isoformat()
+
+    _emit(get_logger("client"), level, f"[Service = {service}, logger_name = {logger_name}] {message}{meta_str}", structured, backpressure=True)
+
+def _store_request_summaries(summaries: List[Dict[str, Any]]) -> None:
+    """Persist one structured record per route and interval (REQUEST_LOG_MODE=aggregate)"""
+    logger = get_logger("request_summary")
+    for summary in summaries:
+        msg = (f"request_summary {summary['method']} {summary['route']} count={summary['count']} "
+               f"p50={summary['p50_ms']}ms p99={summary['p99_ms']}ms")
+        _emit(logger, "info", msg, {
+            "service": summary["service"],
+            "logger": "request_summary",
+            "user": None,
+            "message": msg,
+            "meta": {"kind": "request_summary", **summary},
+        })
+
+# Sketches de latencia por servicio/ruta (ventana deslizante) y resúmenes por intervalo
+request_stats = LatencyAggregator(
+    slot_seconds=settings.STATS_SLOT_SECONDS,
+    window_seconds=settings.STATS_WINDOW_SECONDS,
+    summary_interval=settings.REQUEST_SUMMARY_INTERVAL,
+    on_summary=_store_request_summaries if settings.REQUEST_LOG_MODE == "aggregate" else None,
+)
+
+# Las propias peticiones de ingesta no se escriben como línea (duplicarían el volumen)
+INGESTION_PATHS = ("/api/logs/client", "/api/logs/batch")
+
+def request_log(method: str, path: str, status: int, time: float, auth: bool = False, name: Optional[str] = None, route: Optional[str] = None) -> None:
+    """Log HTTP requests: always into the latency stats, as a line only in raw mode"""
+    request_stats.record(settings.SERVICE_NAME, method, route or normalize_path(path), status, time)
+    if settings.REQUEST_LOG_MODE == "raw" and path not in INGESTION_PATHS:
+        write("info", f"request {method} {path} status={status} time={time:.3f}s auth={auth}", name=name or "request")
@@ -0,0 +1,236 @@
+import shutil
+import sys
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Set
+from core.log_store import LogStore, Segment, ShardLocked, SEALED, COMPRESSED, ACTIVE, fcntl
+
+
+class SegmentManager:
+    """Background maintenance of the log store segments.
+
+    On every pass it seals the active segment when it gets too old, persists the
+    index of sealed segments, compresses them into line-aligned gzip blocks and
+    enforces retention by age and by one disk budget shared by every shard under
+    the segments root. All the heavy work runs on this thread; the writer only
+    ever swaps the active segment.
+
+    Shards whose writer process is gone (their ``writer.lock`` can be taken) are
+    adopted: sealed, compressed and expired like our own, and removed once empty.
+    """
+
+    def __init__(
+        self,
+        store: LogStore,
+        max_segment_age: float = 3600,
+        retention_seconds: float = 7 * 24 * 3600,
+        max_total_bytes: int = 1024 * 1024 * 1024,
+        compress_block_bytes: int = 64 * 1024,
+        compression_level: int = 6,
+        interval: float = 30.0,
+    ):
+        self.store = store
+        self.max_segment_age = max_segment_age
+        self.retention_seconds = retention_seconds
+        self.max_total_bytes = max_total_bytes
+        self.compress_block_bytes = compress_block_bytes
+        self.compression_level = compression_level
+        self.interval = interval
+
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+        # Métricas
+        self._passes = 0
+        self._compressed = 0
+        self._deleted = 0
+        self._adopted = 0
+        self._errors = 0
+        self._last_pass: Optional[float] = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="segment-manager", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stopping.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stopping.wait(self.interval):
+            self.run_once()
+
+    def run_once(self) -> None:
+        """One maintenance pass (also callable directly, e.g. on shutdown)"""
+        try:
+            self._seal_by_age()
+            self._maintain(self.store)
+            self._adopt_orphans()
+        except Exception as e:
+            self._errors += 1
+            sys.stderr.write(f"segment manager: maintenance pass failed: {e}\n")
+        finally:
+            self._passes += 1
+            self._last_pass = time.time()
+
+    def _seal_by_age(self) -> None:
+        active = self.store.active
+        if active.count and time.time() - active.created_at >= self.max_segment_age:
+            self.store.seal()
+
+    def _maintain(self, store: LogStore) -> None:
+        for segment in [s for s in store.segments if s.state == SEALED]:
+            if self._stopping.is_set():
+                return
+            self._compress(store, segment)
+        self._enforce_retention(store)
+
+    def _adopt_orphans(self) -> None:
+        if fcntl is None:
+            return  # Sin writer.lock no se puede saber si el dueño de un shard sigue vivo
+        root = self.store.directory.parent
+        for shard_dir in root.iterdir():
+            if shard_dir == self.store.directory or not (shard_dir / "manifest.json").exists():
+                continue
+            try:
+                orphan = LogStore(
+                    shard_dir,
+                    max_segment_bytes=self.store.max_segment_bytes,
+                    index_interval=self.store.index_interval,
+                )
+            except ShardLocked:
+                continue  # Su writer sigue vivo
+            try:
+                orphan.seal()
+                self._maintain(orphan)
+                empty = all(s.count == 0 for s in orphan.segments)
+            finally:
+                orphan.release()
+            if empty:
+                shutil.rmtree(shard_dir, ignore_errors=True)
+            self._adopted += 1
+
+    def _compress(self, store: LogStore, segment: Segment) -> None:
+        """Write ``segment-N.jsonl.gz`` as independent gzip members aligned to index blocks"""
+        index = segment.index or segment.load_index()
+
+        # Agrupar bloques del índice hasta ~compress_block_bytes (siempre en límites de línea)
+        boundaries: List[int] = []
+        last = None
+        for offset, _, _ in index.blocks:
+            offset = int(offset)
+            if last is None or offset - last >= self.compress_block_bytes:
+                boundaries.append(offset)
+                last = offset
+        boundaries.append(index.size)
+
+        gz_blocks: List[List[int]] = []
+        tmp = segment.gz_path.with_suffix(".tmp")
+        with open(segment.path, "rb") as src, open(tmp, "wb") as dst:
+            for raw_start, raw_end in zip(boundaries, boundaries[1:]):
+                src.seek(raw_start)
+                compressor = zlib.compressobj(self.compression_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+                data = compressor.compress(src.read(raw_end - raw_start)) + compressor.flush()
+                gz_blocks.append([raw_start, dst.tell(), len(data)])
+                dst.write(data)
+            disk_size = dst.tell()
+        tmp.replace(segment.gz_path)
+
+        index.gz_blocks = gz_blocks
+        segment.save_index(index)
+
+        with store._lock:
+            segment.state = COMPRESSED
+            segment.disk_size = disk_size
+            segment.index = None
+        store.forget_index(segment.seq)
+        store.save_manifest()
+        # Los lectores que ya tenían el archivo plano abierto siguen leyendo del inode
+        segment.path.unlink(missing_ok=True)
+        self._compressed += 1
+
+    def _expired(self, segment: Segment, now: float) -> bool:
+        return segment.state != ACTIVE and segment.max_ts is not None and now - segment.max_ts > self.retention_seconds
+
+    def _shard_segments(self, store: LogStore) -> Dict[str, List[Segment]]:
+        """Segments of every shard under the segments root (the ones we write from memory)"""
+        shards = {s.directory.name: list(s.segments) for s in (self.store, store)}
+        for manifest in self.store.directory.parent.glob("*/manifest.json"):
+            name = manifest.parent.name
+            if name not in shards:
+                shards[name] = LogStore(manifest.parent, index_interval=self.store.index_interval, readonly=True).segments
+        return shards
+
+    def _over_budget(self, store: LogStore, now: float) -> Set[int]:
+        """Seqs of ``store``'s segments among the oldest sealed ones of all shards past the disk budget.
+
+        Every process makes the same selection over the same manifests and only
+        deletes its own share (and that of the shards it adopted), so the budget
+        holds for the whole root without touching shards of other live writers.
+        """
+        total = 0
+        sealed = []
+        for shard, segments in self._shard_segments(store).items():
+            for segment in segments:
+                if self._expired(segment, now):
+                    continue  # Su dueño lo borra por antigüedad en esta misma pasada
+                total += segment.disk_size
+                if segment.state != ACTIVE:
+                    sealed.append((segment.max_ts or 0.0, shard, segment.seq, segment.disk_size))
+        ours: Set[int] = set()
+        for _, shard, seq, size in sorted(sealed):
+            if total <= self.max_total_bytes:
+                break
+            total -= size
+            if shard == store.directory.name:
+                ours.add(seq)
+        return ours
+
+    def _enforce_retention(self, store: LogStore) -> None:
+        now = time.time()
+        over_budget = self._over_budget(store, now)
+        with store._lock:
+            victims = [
+                s for s in store.segments
+                if s.state != ACTIVE and (self._expired(s, now) or s.seq in over_budget)
+            ]
+            if not victims:
+                return
+            store.segments = [s for s in store.segments if s not in victims]
+
+        store.save_manifest()
+        for segment in victims:
+            store.forget_index(segment.seq)
+            segment.delete()
+            self._deleted += 1
+
+    def stats(self) -> Dict[str, Any]:
+        segments = list(self.store.segments)
+        shards = self._shard_segments(self.store)
+        return {
+            "running": bool(self._thread and self._thread.is_alive()),
+            "segments": len(segments),
+            "by_state": {
+                state: sum(1 for s in segments if s.state == state)
+                for state in (ACTIVE, SEALED, COMPRESSED)
+            },
+            "records": sum(s.count for s in segments),
+            "raw_bytes": sum(s.size for s in segments),
+            "disk_bytes": sum(s.disk_size for s in segments),
+            "oldest_ts": min((s.min_ts for s in segments if s.min_ts is not None), default=None),
+            "shards": len(shards),
+            "all_shards_disk_bytes": sum(s.disk_size for shard in shards.values() for s in shard),
+            "max_total_bytes": self.max_total_bytes,
+            "retention_seconds": self.retention_seconds,
+            "passes": self._passes,
+            "compressed": self._compressed,
+            "deleted": self._deleted,
+            "adopted_shards": self._adopted,
+            "errors": self._errors,
+            "last_pass": self._last_pass,
+        }
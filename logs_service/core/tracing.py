@@ -0,0 +1,62 @@
+import os
+from contextvars import ContextVar, Token
+from typing import Dict, Mapping, Optional, Tuple
+
+
+class Trace:
+    """W3C trace context of one incoming request"""
+
+    __slots__ = ("trace_id", "span_id", "parent_id", "flags", "request_id")
+
+    def __init__(self, trace_id: str, parent_id: Optional[str], flags: str, request_id: str):
+        self.trace_id = trace_id
+        self.span_id = _new_id(8)
+        self.parent_id = parent_id
+        self.flags = flags
+        self.request_id = request_id
+
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{self.flags}"
+
+
+_trace: ContextVar[Optional[Trace]] = ContextVar("trace", default=None)
+
+
+def _new_id(nbytes: int) -> str:
+    return os.urandom(nbytes).hex()
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[Tuple[str, str, str]]:
+    """``(trace_id, parent_id, flags)`` of a valid ``traceparent`` header, else None"""
+    parts = value.strip().lower().split("-") if value else []
+    if len(parts) < 4 or len(parts[0]) != 2 or parts[0] == "ff":
+        return None
+    trace_id, parent_id, flags = parts[1:4]
+    if len(trace_id) != 32 or len(parent_id) != 16 or len(flags) != 2:
+        return None
+    if trace_id == "0" * 32 or parent_id == "0" * 16:
+        return None
+    try:
+        int(trace_id, 16), int(parent_id, 16), int(flags, 16)
+    except ValueError:
+        return None
+    return trace_id, parent_id, flags
+
+
+def start_trace(headers: Mapping[str, str]) -> Token:
+    """Continue the caller's trace (``traceparent``/``X-Request-ID``) or start a new one"""
+    trace_id, parent_id, flags = parse_traceparent(headers.get("traceparent")) or (_new_id(16), None, "01")
+    request_id = (headers.get("x-request-id") or trace_id)[:128]
+    return _trace.set(Trace(trace_id, parent_id, flags, request_id))
+
+
+def end_trace(token: Token) -> None:
+    _trace.reset(token)
+
+
+def current_trace() -> Optional[Trace]:
+    return _trace.get()
+
+
+def response_headers(trace: Trace) -> Dict[str, str]:
+    return {"traceparent": trace.traceparent(), "X-Request-ID": trace.request_id}
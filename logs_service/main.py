@@ -1,12 +1,16 @@
 from fastapi import FastAPI, Request
 from starlette.middleware.cors import CORSMiddleware
 from core.config import settings
-from core.logging_config import get_logger, request_log
-from routers import logs
+from core.logging_config import get_logger, request_log, log_writer, log_reader, segment_manager, request_stats
+from core.metrics import REQUESTS_IN_FLIGHT, caches, loop_lag, metrics_response, observe_request
+from core.tracing import current_trace, end_trace, response_headers, start_trace
+from routers import debug, logs
 import time
 
 logger = get_logger(__name__)
 
+caches.register("segment_index", log_reader.index_cache_stats)
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description=settings.DESCRIPTION,
@@ -15,18 +19,44 @@ app = FastAPI(
 
 @app.on_event("startup")
 async def startup_event():
+    log_writer.start()
+    segment_manager.start()
+    request_stats.start()
+    loop_lag.start()
     logger.info("Starting Logs Service: %s version=%s", settings.PROJECT_NAME, settings.VERSION)
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    loop_lag.stop()
+    # Vaciar la cola antes de salir
+    request_stats.stop()
+    segment_manager.stop()
+    log_writer.stop()
+
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    start_time = time.time()
-    response = await call_next(request)
-    process_time = time.time() - start_time
-    has_auth = bool(request.headers.get("authorization"))
-    request_log(request.method, request.url.path, response.status_code, process_time, auth=has_auth, name=__name__)
-    return response
+    # Continúa la traza del llamante (traceparent) o abre una nueva
+    trace_token = start_trace(request.headers)
+    # La traza se cierra aunque call_next lance
+    try:
+        start_time = time.time()
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            response = await call_next(request)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+        process_time = time.time() - start_time
+        has_auth = bool(request.headers.get("authorization"))
+        route = getattr(request.scope.get("route"), "path", None)
+        observe_request(request.method, route, response.status_code, process_time)
+        response.headers.update(response_headers(current_trace()))
+        request_log(request.method, request.url.path, response.status_code, process_time, auth=has_auth, name=__name__, route=route)
+        return response
+    finally:
+        end_trace(trace_token)
 
 app.include_router(logs.router, prefix="/api/logs")
+app.include_router(debug.router, prefix="/debug", include_in_schema=False)
 
 app.add_middleware(
     CORSMiddleware,
@@ -38,4 +68,9 @@ app.add_middleware(
 
 @app.get("/health")
 async def health():
-    return {"status": "healthy", "service": "logs"}
\ No newline at end of file
+    return {"status": "healthy", "service": "logs"}
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    return metrics_response()
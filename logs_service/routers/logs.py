@@ -1,24 +1,150 @@
-from fastapi import APIRouter, Request
-from core.logging_config import client_log, write
+import json
+from datetime import datetime, timezone
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from core.config import settings
+from core.latency_stats import extract_request
+from core.live_tail import TailFilter
+from core.log_policy import InvalidPolicy
+from core.logging_config import client_log, write, log_writer, log_reader, segment_manager, tail_hub, request_stats, log_policy
+from core.log_writer import LogQueueFull
+from routers.debug import require_debug_token
 
 router = APIRouter(tags=["logs"])
 
+def _sample_weight(meta: dict) -> int:
+    """How many requests a record stands for when the client sampled it (policy sample_rate)"""
+    try:
+        rate = float(meta.get("sample_rate", 1))
+    except (TypeError, ValueError):
+        return 1
+    return max(1, round(1 / rate)) if 0 < rate < 1 else 1
+
+def _keep_trace(meta: dict) -> bool:
+    """Slow or failed requests keep their line (and span timings) even in aggregate mode"""
+    if not meta.get("spans"):
+        return False
+    try:
+        return float(meta.get("duration_ms", 0)) >= settings.TRACE_KEEP_SLOW_MS or int(meta.get("status", 0)) >= 500
+    except (TypeError, ValueError):
+        return False
+
+def _ingest(body: dict) -> bool:
+    """Store one client record; returns True when it was only aggregated into the request stats"""
+    level = str(body.get("level", "info")).lower()
+    message = body.get("message", "")
+    user = body.get("user")
+    meta = body.get("meta") or {}
+    try:
+        ts = float(body["ts"]) if body.get("ts") is not None else None
+    except (TypeError, ValueError):
+        ts = None
+
+    # Los request logs alimentan las estadísticas de latencia; en modo "aggregate"
+    # solo se guarda el resumen periódico por ruta, no una línea por request
+    request_info = extract_request(message, meta)
+    if request_info:
+        request_stats.record(*request_info, ts=ts, count=_sample_weight(meta))
+        if settings.REQUEST_LOG_MODE == "aggregate" and not _keep_trace(meta):
+            return True
+
+    # Log centralizado - aquí SÍ se escribe en archivo (vía la cola del writer)
+    client_log(level, message, user=user, meta=meta, ts=ts, trace_id=body.get("trace_id") or meta.get("trace_id"))
+    return False
+
 @router.post("/client")
 async def ingest_client_log(request: Request):
     """Endpoint centralizado para recibir logs de todos los servicios"""
     body = await request.json()
-    level = body.get("level", "info").lower()
-    message = body.get("message", "")
-    user = body.get("user")
-    meta = body.get("meta", {})
-    
-    service = meta.get("service", "unknown")
-    logger_name = meta.get("logger_name", "client")
-    
-    # Log centralizado - aquí SÍ se escribe en archivo
-    client_log(level, f"[Service = {service}, logger_name = {logger_name}] {message}", user=user, meta=meta)
+    service = (body.get("meta") or {}).get("service", "unknown")
+    try:
+        aggregated = _ingest(body)
+    except LogQueueFull as e:
+        raise HTTPException(
+            status_code=429,
+            detail="Log queue is saturated",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    if aggregated:
+        return {"status": "ok", "received_from": service, "aggregated": True}
     return {"status": "ok", "received_from": service}
 
+@router.post("/batch")
+async def ingest_batch(request: Request):
+    """Batch ingestion used by the services' log shippers (live batches and spool replays).
+
+    Records keep their original ``ts``, so they are stored out of time order;
+    the store's index and queries only rely on per-block ts bounds. Entries
+    that are not objects are counted as ``rejected``, not ``accepted``. On a
+    saturated queue the 429 reports how many leading records were processed so
+    the client only resends the rest.
+    """
+    body = await request.json()
+    records = body.get("records") if isinstance(body, dict) else None
+    if not isinstance(records, list):
+        raise HTTPException(status_code=400, detail="Expected a JSON object with a 'records' list")
+    if len(records) > settings.LOG_BATCH_MAX_RECORDS:
+        raise HTTPException(status_code=413, detail=f"At most {settings.LOG_BATCH_MAX_RECORDS} records per batch")
+
+    accepted = aggregated = 0
+    for processed, record in enumerate(records):
+        if not isinstance(record, dict):
+            continue
+        try:
+            aggregated += _ingest(record)
+        except LogQueueFull as e:
+            raise HTTPException(
+                status_code=429,
+                detail={"message": "Log queue is saturated", "accepted": accepted, "processed": processed},
+                headers={"Retry-After": str(e.retry_after)},
+            )
+        accepted += 1
+    return {"status": "ok", "accepted": accepted, "rejected": len(records) - accepted, "aggregated": aggregated}
+
+@router.get("/policy")
+async def get_policy(request: Request):
+    """Log level and sampling policy polled by the services (304 while their ETag is current)"""
+    policy = log_policy.get()
+    etag = f'"{policy["version"]}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return JSONResponse(policy, headers={"ETag": etag})
+
+@router.put("/policy", dependencies=[Depends(require_debug_token)])
+async def put_policy(request: Request):
+    """Replace the policy (X-Debug-Token); services pick it up on their next poll (no redeploy)"""
+    try:
+        doc = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON body")
+    try:
+        policy = log_policy.update(doc)
+    except InvalidPolicy as e:
+        raise HTTPException(status_code=400, detail=f"Invalid policy: {e}")
+    write("info", "log_policy_updated", version=policy["version"])
+    return policy
+
+@router.get("/writer/stats", dependencies=[Depends(require_debug_token)])
+async def writer_stats():
+    """Queue depth and write latency metrics of the file writer"""
+    return log_writer.stats()
+
+@router.get("/segments/stats", dependencies=[Depends(require_debug_token)])
+async def segments_stats():
+    """Segment counts, disk usage and maintenance metrics"""
+    return segment_manager.stats()
+
+@router.get("/stats")
+async def latency_stats(
+    window: int = Query(300, ge=1, description="Ventana en segundos"),
+    service: Optional[str] = None,
+    method: Optional[str] = None,
+    route: Optional[str] = None,
+):
+    """p50/p95/p99 latency, throughput and error rates per service and route"""
+    return request_stats.snapshot(window, service=service, method=method, route=route)
+
 @router.get("/test")
 async def test_logging():
     """Test endpoint - solo para el logs_service"""
@@ -26,4 +152,123 @@ async def test_logging():
     write("info", "test_logging: info message")
     write("warning", "test_logging: warning message")
     write("error", "test_logging: error message")
-    return {"status": "ok", "message": "logs emitted from logs_service"}
\ No newline at end of file
+    return {"status": "ok", "message": "logs emitted from logs_service"}
+
+def _parse_time(value: Optional[str], field: str) -> Optional[float]:
+    """Accept epoch seconds or ISO 8601 (naive values are taken as UTC)"""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {field}: {value}")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+@router.get("/search", dependencies=[Depends(require_debug_token)])
+def search_logs(
+    start: Optional[str] = Query(None, description="Desde (epoch o ISO 8601)"),
+    end: Optional[str] = Query(None, description="Hasta (epoch o ISO 8601)"),
+    service: Optional[str] = None,
+    level: Optional[str] = None,
+    user: Optional[str] = None,
+    trace_id: Optional[str] = Query(None, description="Registros de una traza (todos los servicios)"),
+    q: Optional[str] = Query(None, description="Texto a buscar en el mensaje"),
+    limit: int = Query(100, ge=1),
+    cursor: Optional[str] = None,
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+):
+    """Search structured log records of every writer shard (sync: runs in the threadpool)"""
+    try:
+        return log_reader.search(
+            start=_parse_time(start, "start"),
+            end=_parse_time(end, "end"),
+            service=service,
+            level=level.lower() if level else None,
+            user=user,
+            trace_id=trace_id.lower() if trace_id else None,
+            text=q,
+            limit=min(limit, settings.SEARCH_MAX_LIMIT),
+            cursor=cursor,
+            order=order,
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {cursor}")
+
+@router.get("/export", dependencies=[Depends(require_debug_token)])
+def export_logs(
+    start: Optional[str] = Query(None, description="Desde (epoch o ISO 8601)"),
+    end: Optional[str] = Query(None, description="Hasta (epoch o ISO 8601)"),
+    service: Optional[str] = None,
+    level: Optional[str] = None,
+    user: Optional[str] = None,
+    trace_id: Optional[str] = None,
+    q: Optional[str] = Query(None, description="Texto a buscar en el mensaje"),
+):
+    """Stream matching records of every shard as time-ordered JSON lines"""
+    filters = {
+        field: value
+        for field, value in (
+            ("service", service),
+            ("level", level.lower() if level else None),
+            ("user", user),
+            ("trace_id", trace_id.lower() if trace_id else None),
+        )
+        if value
+    }
+    return StreamingResponse(
+        log_reader.export(_parse_time(start, "start"), _parse_time(end, "end"), filters, q),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="logs.jsonl"'},
+    )
+
+@router.get("/tail", dependencies=[Depends(require_debug_token)])
+async def tail_logs(
+    request: Request,
+    service: Optional[str] = None,
+    level: Optional[str] = None,
+    user: Optional[str] = None,
+    q: Optional[str] = Query(None, description="Texto a buscar en el mensaje"),
+    buffer: int = Query(settings.TAIL_BUFFER_SIZE, ge=1, le=10000),
+):
+    """Stream newly ingested records as Server-Sent Events.
+
+    Filters are applied at ingestion time; a consumer that falls behind loses its
+    oldest buffered records (reported as a ``dropped`` event) instead of slowing
+    down ingestion.
+    """
+    subscriber = tail_hub.subscribe(TailFilter(service, level, user, q), buffer)
+    if subscriber is None:
+        raise HTTPException(status_code=503, detail="Too many tail subscribers", headers={"Retry-After": "10"})
+
+    async def event_stream():
+        reported_drops = 0
+        try:
+            yield ": connected\n\n"
+            while not await request.is_disconnected():
+                records = await subscriber.next_batch(settings.TAIL_KEEPALIVE_SECONDS)
+                if subscriber.dropped > reported_drops:
+                    yield f"event: dropped\ndata: {subscriber.dropped - reported_drops}\n\n"
+                    reported_drops = subscriber.dropped
+                if not records:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield "".join(f"data: {json.dumps(record, default=str)}\n\n" for record in records)
+        finally:
+            tail_hub.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/tail/stats", dependencies=[Depends(require_debug_token)])
+async def tail_stats():
+    """Live tail subscribers and drop counters"""
+    return tail_hub.stats()
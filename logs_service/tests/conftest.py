@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Los módulos del servicio se importan como paquetes de primer nivel (core, routers)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+# core.logging_config abre los shards al importarse: que no escriba en el directorio del repo
+os.environ.setdefault("LOG_DIR", tempfile.mkdtemp(prefix="logs-service-tests-"))
@@ -0,0 +1,50 @@
+import pytest
+from fastapi.testclient import TestClient
+from core.config import settings
+from main import app
+
+TOKEN = "test-token"
+
+ADMIN_ROUTES = [
+    ("put", "/api/logs/policy"),
+    ("get", "/api/logs/writer/stats"),
+    ("get", "/api/logs/segments/stats"),
+    ("get", "/api/logs/tail/stats"),
+    # Los registros guardados llevan UIDs, query strings y mensajes de los servicios
+    ("get", "/api/logs/search"),
+    ("get", "/api/logs/export"),
+    ("get", "/api/logs/tail"),
+]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(settings, "DEBUG_TOKEN", TOKEN)
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("method,path", ADMIN_ROUTES)
+def test_admin_routes_require_token(client, method, path):
+    assert client.request(method, path, json={}).status_code == 403
+    assert client.request(method, path, json={}, headers={"X-Debug-Token": "wrong"}).status_code == 403
+
+
+@pytest.mark.parametrize("method,path", ADMIN_ROUTES)
+def test_admin_routes_hidden_without_token(monkeypatch, method, path):
+    monkeypatch.setattr(settings, "DEBUG_TOKEN", "")
+    assert TestClient(app).request(method, path, json={}).status_code == 404
+
+
+def test_policy_update_with_token(client):
+    headers = {"X-Debug-Token": TOKEN}
+    response = client.put("/api/logs/policy", json={"default": {"min_level": "warning"}}, headers=headers)
+    assert response.status_code == 200
+    assert client.get("/api/logs/policy").json()["version"] == response.json()["version"]
+    assert client.put("/api/logs/policy", json={"default": {"min_level": "loud"}}, headers=headers).status_code == 400
+    assert client.get("/api/logs/segments/stats", headers=headers).status_code == 200
+
+
+def test_search_with_token(client):
+    response = client.get("/api/logs/search", params={"limit": 5}, headers={"X-Debug-Token": TOKEN})
+    assert response.status_code == 200
+    assert "records" in response.json()
@@ -0,0 +1,89 @@
+import random
+import time
+
+import pytest
+from core.latency_stats import LatencyAggregator, LatencyHistogram, extract_request, normalize_path
+
+
+def test_percentiles_are_within_the_bucket_error():
+    rng = random.Random(7)
+    samples = sorted(rng.lognormvariate(-4, 1.2) for _ in range(20000))
+    histogram = LatencyHistogram()
+    for seconds in samples:
+        histogram.record(seconds)
+    for q in (0.5, 0.9, 0.95, 0.99):
+        exact = samples[int(q * len(samples)) - 1] * 1000
+        assert histogram.percentile(q) == pytest.approx(exact, rel=0.02)
+    assert histogram.percentile(1.0) <= round(samples[-1] * 1000, 3)
+
+
+def test_bucket_index_is_monotonic_and_round_trips():
+    previous = -1
+    for micros in range(0, 1 << 16):
+        index = LatencyHistogram._index(micros)
+        assert index >= previous
+        previous = index
+        # El punto medio del bucket está a menos de 1/32 del valor original
+        assert abs(LatencyHistogram._value(index) - micros) <= max(micros / LatencyHistogram.SUB_BUCKETS, 1)
+
+
+def test_merge_matches_a_single_histogram():
+    a, b, both = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+    for i in range(1, 500):
+        (a if i % 2 else b).record(i / 1000)
+        both.record(i / 1000)
+    a.merge(b)
+    assert a.counts == both.counts
+    assert a.count == both.count
+    assert a.max == both.max
+    assert a.percentile(0.99) == both.percentile(0.99)
+
+
+def test_empty_histogram():
+    assert LatencyHistogram().percentile(0.99) == 0.0
+
+
+def test_extract_request_from_structured_and_plain_records():
+    meta = {"service": "tasks", "kind": "request", "method": "GET", "route": "/api/tasks/{task_id}", "status": 200, "duration_ms": 12.5}
+    assert extract_request("", meta) == ("tasks", "GET", "/api/tasks/{task_id}", 200, 0.0125)
+    plain = "request GET /api/tasks/AbCdEfGhIjKlMnOpQrSt status=404 time=0.0200s"
+    assert extract_request(plain, {"service": "tasks"}) == ("tasks", "GET", "/api/tasks/{id}", 404, 0.02)
+    assert extract_request("hello", {"service": "tasks"}) is None
+    assert extract_request("", {"kind": "request", "method": "GET"}) is None
+
+
+def test_normalize_path_collapses_ids():
+    assert normalize_path("/api/tasks/123/collaborators") == "/api/tasks/{id}/collaborators"
+    assert normalize_path("/api/tasks") == "/api/tasks"
+
+
+def test_snapshot_window_and_filters():
+    aggregator = LatencyAggregator(slot_seconds=10, window_seconds=900)
+    now = time.time()
+    for _ in range(10):
+        aggregator.record("tasks", "get", "/api/tasks", 200, 0.01, ts=now)
+    aggregator.record("tasks", "get", "/api/tasks", 500, 0.2, ts=now - 600)
+    aggregator.record("auth", "post", "/api/auth/verify", 200, 0.005, ts=now)
+
+    recent = aggregator.snapshot(window=60, service="tasks")
+    assert [(r["route"], r["count"]) for r in recent["routes"]] == [("/api/tasks", 10)]
+    assert recent["routes"][0]["error_rate"] == 0.0
+
+    wide = aggregator.snapshot(window=900, service="tasks", method="GET")
+    assert wide["routes"][0]["count"] == 11
+    assert wide["routes"][0]["status"] == {"200": 10, "500": 1}
+
+
+def test_late_records_outside_the_window_only_count_for_the_interval():
+    aggregator = LatencyAggregator(slot_seconds=10, window_seconds=60)
+    aggregator.record("tasks", "GET", "/api/tasks", 200, 0.01, ts=time.time() - 3600)
+    assert aggregator.snapshot(window=60)["routes"] == []
+    summaries = aggregator.flush_summaries()
+    assert [(s["route"], s["count"]) for s in summaries] == [("/api/tasks", 1)]
+    assert aggregator.flush_summaries() == []
+
+
+def test_sampled_requests_are_weighted():
+    aggregator = LatencyAggregator()
+    aggregator.record("tasks", "GET", "/api/tasks", 200, 0.01, count=10)
+    assert aggregator.snapshot()["routes"][0]["count"] == 10
@@ -0,0 +1,81 @@
+import json
+import time
+from core.log_shards import ShardedLogReader
+from core.log_store import INDEX_BLOCK_BYTES, LogStore
+
+
+def _reader(tmp_path):
+    """Two shards whose segments hold records out of time order (delayed batches, spool replays)"""
+    now = time.time()
+    local = LogStore(tmp_path / "a", index_interval=2)
+    other = LogStore(tmp_path / "b", index_interval=2)
+    local.write_batch([{"ts": now - 10, "message": "t=10s ago"}, {"ts": now - 5, "message": "t=5s ago"}])
+    local.write_batch([{"ts": now - 100, "message": "t=100s ago"}, {"ts": now - 90, "message": "t=90s ago"}])
+    other.write_batch([{"ts": now - 1, "message": "t=1s ago"}, {"ts": now - 50, "message": "t=50s ago"}])
+    other.seal()
+    other.write_batch([{"ts": now - 95, "message": "t=95s ago"}])
+    other.release()
+    return ShardedLogReader(tmp_path, local), now
+
+
+EXPECTED = ["t=100s ago", "t=95s ago", "t=90s ago", "t=50s ago", "t=10s ago", "t=5s ago", "t=1s ago"]
+
+
+def test_search_is_time_ordered_in_both_directions(tmp_path):
+    reader, _ = _reader(tmp_path)
+    assert [r["message"] for r in reader.search(order="asc")["records"]] == EXPECTED
+    assert [r["message"] for r in reader.search(order="desc")["records"]] == EXPECTED[::-1]
+
+
+def test_search_pages_resume_in_order(tmp_path):
+    reader, _ = _reader(tmp_path)
+    for order, expected in (("asc", EXPECTED), ("desc", EXPECTED[::-1])):
+        messages, cursor = [], None
+        while True:
+            page = reader.search(order=order, limit=2, cursor=cursor)
+            messages += [r["message"] for r in page["records"]]
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+        assert messages == expected
+
+
+def test_time_range_keeps_late_records(tmp_path):
+    reader, now = _reader(tmp_path)
+    records = reader.search(start=now - 96, end=now - 8, order="asc")["records"]
+    assert [r["message"] for r in records] == ["t=95s ago", "t=90s ago", "t=50s ago", "t=10s ago"]
+
+
+def test_export_is_time_ordered(tmp_path):
+    reader, _ = _reader(tmp_path)
+    lines = b"".join(reader.export()).splitlines()
+    assert [json.loads(line)["message"] for line in lines] == EXPECTED
+
+
+def test_interleaved_batches_keep_the_index_sparse(tmp_path):
+    now = time.time()
+    store = LogStore(tmp_path / "a", index_interval=16)
+    # Lotes de varios servicios y reenvíos del spool: cada registro llega muy fuera de orden
+    records = [
+        {"ts": now - (3600 if i % 3 == 0 else 60) + i, "service": f"svc-{i % 3}", "message": f"r{i}"}
+        for i in range(160)
+    ]
+    for i in range(0, len(records), 20):
+        store.write_batch(records[i:i + 20])
+
+    index = store.active.index
+    assert len(index.blocks) == 10
+    assert all(min_ts <= max_ts for _, min_ts, max_ts in index.blocks)
+
+    start, end = now - 3600 + 30, now - 3600 + 90
+    found = [r["message"] for _, _, _, r in store.iter_records(start=start, end=end, descending=False)]
+    assert found == [r["message"] for r in records if start <= r["ts"] <= end]
+
+
+def test_index_blocks_are_bounded_by_bytes(tmp_path):
+    store = LogStore(tmp_path / "a", index_interval=10_000)
+    store.write_batch([{"ts": float(i), "message": "x" * 1000} for i in range(300)])
+    index = store.active.index
+    assert len(index.blocks) > 1
+    starts = [int(offset) for offset, _, _ in index.blocks] + [index.size]
+    assert all(end - start <= INDEX_BLOCK_BYTES + 2048 for start, end in zip(starts, starts[1:]))
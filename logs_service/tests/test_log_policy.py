@@ -0,0 +1,29 @@
+import threading
+from core.log_policy import LogPolicyStore
+
+
+def test_replicas_sharing_the_file_serve_the_same_version(tmp_path):
+    # Dos réplicas sobre el mismo volumen: cada una con su propio LogPolicyStore
+    a = LogPolicyStore(tmp_path / "policy.json")
+    b = LogPolicyStore(tmp_path / "policy.json")
+    assert a.update({"default": {"min_level": "warning"}})["version"] == 1
+    assert b.get()["version"] == 1
+    # Updates seguidos (mismo tick de mtime) en réplicas distintas no repiten versión
+    assert b.update({"default": {"min_level": "error"}})["version"] == 2
+    assert a.update({"default": {"sample_rate": 0.5}})["version"] == 3
+    assert b.get() == a.get()
+    assert b.get()["default"] == {"sample_rate": 0.5}
+
+
+def test_concurrent_updates_get_distinct_versions(tmp_path):
+    stores = [LogPolicyStore(tmp_path / "policy.json") for _ in range(8)]
+    versions = []
+    threads = [
+        threading.Thread(target=lambda s=store: versions.extend(s.update({})["version"] for _ in range(10)))
+        for store in stores
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(versions) == list(range(1, 81))
@@ -0,0 +1,60 @@
+import time
+
+import pytest
+from core.log_shards import ShardedLogReader, decode_cursor, encode_cursor
+from core.log_store import LogStore
+
+
+def test_cursor_round_trip():
+    key = (1700000000.25, "pod-a-12", 3, 4096)
+    cursor = encode_cursor(key)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == key
+    assert decode_cursor(None) is None
+    assert decode_cursor("") is None
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor((1.0, "a", 2))[:-2] + "xx"])
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_pages_split_records_with_the_same_timestamp(tmp_path):
+    # Mismo ts en ambos shards: el desempate (shard, segmento, offset) no debe perder ni repetir registros
+    ts = time.time()
+    local = LogStore(tmp_path / "a")
+    other = LogStore(tmp_path / "b")
+    local.write_batch([{"ts": ts, "message": f"a{i}"} for i in range(3)])
+    other.write_batch([{"ts": ts, "message": f"b{i}"} for i in range(3)])
+    other.release()
+    reader = ShardedLogReader(tmp_path, local)
+
+    for order in ("asc", "desc"):
+        messages, cursor = [], None
+        while True:
+            page = reader.search(order=order, limit=2, cursor=cursor)
+            messages += [r["message"] for r in page["records"]]
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+        expected = ["a0", "a1", "a2", "b0", "b1", "b2"]
+        assert messages == (expected if order == "asc" else expected[::-1])
+
+
+def test_search_merges_shards_and_tags_the_writer(tmp_path):
+    now = time.time()
+    local = LogStore(tmp_path / "a")
+    other = LogStore(tmp_path / "b")
+    local.write_batch([{"ts": now - 2, "service": "tasks", "message": "local"}])
+    other.write_batch([
+        {"ts": now - 1, "service": "tasks", "message": "other"},
+        {"ts": now - 3, "service": "auth", "message": "filtered out"},
+    ])
+    other.release()
+    reader = ShardedLogReader(tmp_path, local)
+
+    page = reader.search(service="tasks")
+    assert [(r["message"], r["writer"]) for r in page["records"]] == [("other", "b"), ("local", "a")]
+    assert page["shards"] == 2
+    assert page["next_cursor"] is None
@@ -0,0 +1,82 @@
+import threading
+import time
+from fastapi.testclient import TestClient
+from core import logging_config
+from core.log_writer import LogQueueFull, LogWriter
+from main import app
+
+
+class SlowSink:
+    def __init__(self, delay):
+        self.delay = delay
+        self.events = []
+        self.writing = threading.Event()
+
+    def write_batch(self, batch):
+        self.writing.set()
+        time.sleep(self.delay)
+        self.events.append(("write", len(batch)))
+
+    def close(self):
+        self.events.append(("close",))
+
+
+def test_stop_never_closes_the_sink_under_a_running_batch():
+    sink = SlowSink(0.3)
+    writer = LogWriter(sink, flush_interval=0.01)
+    writer.submit({"message": "x"})
+    assert sink.writing.wait(1)
+    writer.stop(timeout=0.01)
+    assert sink.events == []
+    writer._thread.join(2)
+    assert sink.events == [("write", 1), ("close",)]
+
+
+def test_stop_without_thread_closes_the_sink():
+    sink = SlowSink(0)
+    LogWriter(sink).stop()
+    assert sink.events == [("close",)]
+
+
+def test_queue_filling_after_the_capacity_check_answers_429(monkeypatch):
+    def full(item):
+        raise LogQueueFull(3)
+
+    # Otra request llenó la cola entre check_capacity() y submit()
+    monkeypatch.setattr(logging_config.log_writer, "check_capacity", lambda: None)
+    monkeypatch.setattr(logging_config.log_writer, "submit", full)
+    response = TestClient(app).post("/api/logs/client", json={"level": "error", "message": "boom"})
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "3"
+
+
+def test_own_records_are_dropped_quietly_when_the_queue_is_full(monkeypatch):
+    def full(item):
+        raise LogQueueFull(1)
+
+    monkeypatch.setattr(logging_config.log_writer, "submit", full)
+    logging_config.write("info", "not stored")
+
+
+def test_batch_counts_only_submitted_records():
+    records = [{"level": "info", "message": "one"}, "not a record", {"level": "info", "message": "two"}, 3]
+    response = TestClient(app).post("/api/logs/batch", json={"records": records})
+    assert response.status_code == 200
+    assert (response.json()["accepted"], response.json()["rejected"]) == (2, 2)
+
+
+def test_batch_429_reports_processed_prefix(monkeypatch):
+    submitted = []
+
+    def submit(item):
+        if len(submitted) == 1:
+            raise LogQueueFull(1)
+        submitted.append(item)
+
+    monkeypatch.setattr(logging_config.log_writer, "submit", submit)
+    records = ["bad", {"message": "one"}, {"message": "two"}, {"message": "three"}]
+    response = TestClient(app).post("/api/logs/batch", json={"records": records})
+    assert response.status_code == 429
+    assert response.json()["detail"]["accepted"] == 1
+    # El cliente reenvía records[processed:]
+    assert response.json()["detail"]["processed"] == 2
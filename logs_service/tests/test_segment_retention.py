@@ -0,0 +1,54 @@
+import time
+from core.log_store import ACTIVE, LogStore
+from core.segment_manager import SegmentManager
+
+
+def _sealed_segments(store, start, count):
+    """One sealed and compressed segment per hour, ``count`` hours from ``start``"""
+    for hour in range(count):
+        store.write_batch([{"ts": start + hour * 3600 + i, "message": f"record {i}"} for i in range(20)])
+        store.seal()
+    SegmentManager(store, max_total_bytes=10**12).run_once()
+
+
+def _sealed(store):
+    return [s for s in store.segments if s.state != ACTIVE]
+
+
+def _size(store):
+    return sum(s.disk_size for s in store.segments)
+
+
+def test_disk_budget_is_shared_by_all_shards(tmp_path):
+    start = time.time() - 24 * 3600
+    a = LogStore(tmp_path / "a")
+    b = LogStore(tmp_path / "b")
+    # a tiene los segmentos más viejos; b los más nuevos, y cada uno cabe solo en el presupuesto
+    _sealed_segments(a, start, 4)
+    _sealed_segments(b, start + 4 * 3600, 4)
+    budget = _size(b) + 1
+
+    for store in (a, b):
+        SegmentManager(store, max_total_bytes=budget).run_once()
+
+    assert _size(a) + _size(b) <= budget
+    assert _sealed(a) == []
+    assert len(_sealed(b)) == 4
+
+
+def test_each_manager_only_deletes_its_own_shard(tmp_path):
+    start = time.time() - 24 * 3600
+    a = LogStore(tmp_path / "a")
+    b = LogStore(tmp_path / "b")
+    _sealed_segments(a, start, 2)
+    _sealed_segments(b, start + 2 * 3600, 2)
+    budget = _size(b) + 1
+
+    # Solo pasa el manager de b: lo que sobra es de a, que tiene su propio writer vivo
+    SegmentManager(b, max_total_bytes=budget).run_once()
+    assert len(_sealed(a)) == 2
+    assert len(_sealed(b)) == 2
+
+    SegmentManager(a, max_total_bytes=budget).run_once()
+    assert _sealed(a) == []
+    assert len(_sealed(b)) == 2
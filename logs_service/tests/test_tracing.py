@@ -0,0 +1,21 @@
+import asyncio
+
+import pytest
+from starlette.requests import Request
+from core.tracing import current_trace
+from main import log_requests
+
+
+def test_trace_is_closed_when_the_handler_raises():
+    request = Request({"type": "http", "method": "GET", "path": "/boom", "headers": [], "query_string": b""})
+
+    async def call_next(_request):
+        assert current_trace() is not None
+        raise RuntimeError("boom")
+
+    async def run():
+        with pytest.raises(RuntimeError):
+            await log_requests(request, call_next)
+        return current_trace()
+
+    assert asyncio.run(run()) is None
@@ -0,0 +1,217 @@
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from core import config
+from core.metrics import ADMISSION_LIMIT, ADMISSION_QUEUE_DELAY, ADMISSION_REJECTED
+
+# Clases de prioridad (menor = más prioritaria); las críticas nunca se rechazan ni cuentan en el límite
+CRITICAL, WRITE, READ = 0, 1, 2
+PRIORITY_NAMES = {CRITICAL: "critical", WRITE: "write", READ: "read"}
+CRITICAL_PREFIXES = ("/health", "/metrics", "/debug")
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Ventana de muestras entre ajustes del límite
+WINDOW_SECONDS = 0.5
+WINDOW_MIN_SAMPLES = 5
+# Cuánto sube por ventana la latencia sin carga: sigue a un servicio que de verdad se volvió más lento
+BASELINE_DRIFT = 1.01
+
+
+def classify(request: Request) -> int:
+    if request.url.path.startswith(CRITICAL_PREFIXES):
+        return CRITICAL
+    return READ if request.method in READ_METHODS else WRITE
+
+
+class GradientLimit:
+    """Concurrency limit adapted from latency, in the style of Netflix's gradient limiter.
+
+    The baseline is the lowest window latency seen (the no-load latency),
+    drifting up slowly so it follows a service that really got slower. Each
+    window's mean latency is compared with it: within ``tolerance`` times the
+    baseline the limit grows (smoothed) by about its square root; when requests
+    queue behind each other and latency climbs, it shrinks at once in
+    proportion, down to half per window. It only grows while at least half of
+    the limit is in use, so an idle pod does not drift to the maximum.
+    """
+
+    def __init__(
+        self,
+        initial: float,
+        min_limit: float,
+        max_limit: float,
+        tolerance: float = 1.5,
+        smoothing: float = 0.2,
+    ):
+        self.limit = float(initial)
+        self.min_limit = float(min_limit)
+        self.max_limit = float(max_limit)
+        self.tolerance = tolerance
+        self.smoothing = smoothing
+        self.baseline: Optional[float] = None
+        self.recent: Optional[float] = None
+        self._window: List[float] = []
+        self._window_start = time.monotonic()
+        self._window_peak = 0
+
+    def sample(self, latency: float, in_flight: int) -> None:
+        self._window.append(latency)
+        self._window_peak = max(self._window_peak, in_flight)
+        now = time.monotonic()
+        if len(self._window) < WINDOW_MIN_SAMPLES or now - self._window_start < WINDOW_SECONDS:
+            return
+        recent = sum(self._window) / len(self._window)
+        peak = self._window_peak
+        self._window, self._window_start, self._window_peak = [], now, 0
+        self.recent = recent
+        self.baseline = recent if self.baseline is None else min(self.baseline * BASELINE_DRIFT, recent)
+        gradient = max(0.5, min(1.0, self.tolerance * self.baseline / recent)) if recent > 0 else 1.0
+        if gradient == 1.0 and peak < self.limit / 2:
+            return
+        target = self.limit * gradient + math.sqrt(self.limit)
+        # Bajar de golpe (la cola ya está ahí), subir suavizado: el AIMD de TCP
+        limit = target if target < self.limit else self.limit * (1 - self.smoothing) + target * self.smoothing
+        self.limit = max(self.min_limit, min(self.max_limit, limit))
+
+
+class AdmissionController:
+    """Admits requests up to the adaptive limit, queues a few briefly and sheds the rest with 503.
+
+    Writes may use the whole limit; reads only ``read_share`` of it, so under
+    pressure reads are shed first and writes still get through. Critical
+    requests (health checks, metrics, /debug) bypass the limit entirely.
+    Queued requests are woken by priority, then arrival order. Everything runs
+    on the event loop, so no locking is needed.
+    """
+
+    def __init__(
+        self,
+        limit: GradientLimit,
+        read_share: float = 0.8,
+        queue_timeout: float = 0.1,
+        max_queue: int = 100,
+        enabled: bool = True,
+    ):
+        self.limit = limit
+        self.read_share = read_share
+        self.queue_timeout = queue_timeout
+        self.max_queue = max_queue
+        self.enabled = enabled
+        self.in_flight = 0
+        self._queue: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._admitted: Counter = Counter()
+        self._rejected: Counter = Counter()
+        self._queued: Counter = Counter()
+        ADMISSION_LIMIT.set(self.limit.limit)
+
+    def capacity(self, priority: int) -> int:
+        limit = self.limit.limit
+        if priority == READ:
+            limit *= self.read_share
+        return max(1, int(limit))
+
+    def _can_start(self, priority: int) -> bool:
+        if self.in_flight >= self.capacity(priority):
+            return False
+        # Sin colarse: los que esperan con igual o más prioridad van antes
+        return not any(p <= priority and not f.done() for p, _, f in self._queue)
+
+    async def acquire(self, priority: int) -> bool:
+        """True if the request may run (then ``release`` must follow), False if it was shed"""
+        if priority == CRITICAL or not self.enabled:
+            return True
+        name = PRIORITY_NAMES[priority]
+        if self._can_start(priority):
+            self.in_flight += 1
+            self._admitted[name] += 1
+            return True
+        if self.queue_timeout <= 0 or len(self._queue) >= self.max_queue:
+            return self._reject(name)
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._sequence), future))
+        self._queued[name] += 1
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if not future.done():
+                future.cancel()
+                return self._reject(name)
+        except asyncio.CancelledError:
+            # El cliente se fue mientras esperaba: devolver la plaza si ya se le había dado
+            if future.done() and not future.cancelled():
+                self.in_flight -= 1
+                self._wake()
+            future.cancel()
+            raise
+        finally:
+            ADMISSION_QUEUE_DELAY.labels(name).observe(time.perf_counter() - start)
+        # _wake ya contó la plaza al despertarlo
+        self._admitted[name] += 1
+        return True
+
+    def _reject(self, name: str) -> bool:
+        self._rejected[name] += 1
+        ADMISSION_REJECTED.labels(name).inc()
+        return False
+
+    def release(self, priority: int, latency: float) -> None:
+        if priority == CRITICAL or not self.enabled:
+            return
+        self.in_flight -= 1
+        self.limit.sample(latency, self.in_flight + 1)
+        ADMISSION_LIMIT.set(self.limit.limit)
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._queue:
+            priority, _, future = self._queue[0]
+            if future.done():
+                heapq.heappop(self._queue)
+                continue
+            if self.in_flight >= self.capacity(priority):
+                return
+            heapq.heappop(self._queue)
+            self.in_flight += 1
+            future.set_result(None)
+
+    def retry_after(self) -> int:
+        """Seconds until a retry is likely to find room: roughly the time to drain the current work"""
+        latency = self.limit.recent or 0.0
+        return max(1, math.ceil(latency * (self.in_flight + len(self._queue)) / max(self.limit.limit, 1)))
+
+    def reject_response(self) -> JSONResponse:
+        return JSONResponse(
+            {"detail": "Service overloaded, retry later"},
+            status_code=503,
+            headers={"Retry-After": str(self.retry_after())},
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "limit": round(self.limit.limit, 2),
+            "in_flight": self.in_flight,
+            "queued": sum(1 for _, _, f in self._queue if not f.done()),
+            "latency_baseline_ms": round((self.limit.baseline or 0) * 1000, 3),
+            "latency_recent_ms": round((self.limit.recent or 0) * 1000, 3),
+            "admitted": dict(self._admitted),
+            "queued_total": dict(self._queued),
+            "rejected": dict(self._rejected),
+        }
+
+
+admission = AdmissionController(
+    GradientLimit(config.ADMISSION_INITIAL_LIMIT, config.ADMISSION_MIN_LIMIT, config.ADMISSION_MAX_LIMIT),
+    read_share=config.ADMISSION_READ_SHARE,
+    queue_timeout=config.ADMISSION_QUEUE_TIMEOUT_MS / 1000,
+    max_queue=config.ADMISSION_MAX_QUEUE,
+    enabled=config.ADMISSION_CONTROL,
+)
@@ -1,28 +1,152 @@
 from fastapi import Depends, HTTPException, Header
-from typing import Dict, Any, Optional
-import requests
+from typing import Dict, Any, Optional, Set
+import asyncio
+import math
+import httpx
 from core import config
 from core.logging_config import get_logger
+from core.auth_cache import ClaimsCache
+from core.log_shipper import CLOSED, HALF_OPEN, CircuitBreaker
+from core.metrics import AUTH_CIRCUIT_OPEN, AUTH_VERIFICATIONS, caches
+from core.outbound_policy import auth_policy
+from core.tracing import current_trace, outbound_headers
 
 logger = get_logger(__name__)
 
+_http: Optional[httpx.AsyncClient] = None
+
+def auth_http() -> httpx.AsyncClient:
+    """Pooled client for the auth service (keep-alive connections shared by all requests)"""
+    global _http
+    if _http is None:
+        _http = httpx.AsyncClient(
+            timeout=config.AUTH_REQUEST_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=config.AUTH_MAX_CONNECTIONS,
+                max_keepalive_connections=config.AUTH_MAX_CONNECTIONS,
+            ),
+        )
+    return _http
+
+# Claims de tokens ya verificados: con el auth lento o reiniciándose se sirven mientras el token no expire
+claims_cache = ClaimsCache(
+    config.AUTH_CACHE_TTL_SECONDS, config.AUTH_CACHE_MAX_STALE_SECONDS, config.AUTH_CACHE_MAX_ENTRIES
+)
+caches.register("auth_claims", claims_cache.stats)
+auth_breaker = CircuitBreaker(config.AUTH_BREAKER_FAILURES, config.AUTH_BREAKER_RESET_SECONDS)
+# Revalidaciones en segundo plano (referencias fuertes + tokens en curso)
+_background: Set[asyncio.Task] = set()
+_refreshing: Set[str] = set()
+
+async def close_auth_http() -> None:
+    global _http
+    if _http is not None:
+        await _http.aclose()
+        _http = None
+
+def _record(failed: bool) -> None:
+    if failed:
+        auth_breaker.record_failure()
+    else:
+        auth_breaker.record_success()
+    AUTH_CIRCUIT_OPEN.set(auth_breaker.state != CLOSED)
+
+def _unavailable(detail: str, retry_after: Optional[str] = None) -> HTTPException:
+    # 503 y no 401: el token puede ser válido, el cliente debe reintentar en vez de cerrar la sesión
+    return HTTPException(
+        status_code=503,
+        detail=detail,
+        headers={"Retry-After": retry_after or str(math.ceil(auth_breaker.reset_timeout))}
+    )
+
+async def _verify_remote(token: str) -> Optional[Dict[str, Any]]:
+    """Ask the auth service; caches the claims of a valid token and forgets those of a rejected one"""
+    try:
+        # Con plazo, hedge tras el p95 y reintento si el presupuesto lo permite: la cola del auth es la de cada endpoint
+        response = await auth_policy.call(
+            "verify",
+            lambda timeout: auth_http().get(
+                f"{config.AUTH_SERVICE_URL}/verify",
+                headers={"Authorization": f"Bearer {token}", **outbound_headers(timeout)},
+                timeout=timeout,
+            ),
+        )
+    except asyncio.CancelledError:
+        # Cancelada no dice nada del auth, pero una prueba a medias no puede dejar el breaker sin cerrar ni abrir
+        if auth_breaker.state == HALF_OPEN:
+            _record(failed=True)
+        raise
+    except Exception:
+        _record(failed=True)
+        raise
+    _record(failed=response.status_code >= 500)
+    if response.status_code == 200:
+        user = response.json()
+        claims_cache.put(token, user)
+        return user
+    if response.status_code == 503:
+        # El auth_service está descartando carga: 503 al cliente, no un 401 que lo desloguearía
+        raise _unavailable("Authentication service overloaded", response.headers.get("Retry-After", "1"))
+    if response.status_code >= 500:
+        raise _unavailable("Authentication service unavailable")
+    claims_cache.invalidate(token)
+    logger.error(f"Token verification error: {response.status_code} - {response.text}")
+    return None
+
+async def _refresh(token: str) -> None:
+    try:
+        await _verify_remote(token)
+    except Exception as e:
+        logger.warning(f"Background token revalidation failed: {e}")
+    finally:
+        _refreshing.discard(token)
+
+def _revalidate(token: str) -> bool:
+    """Verify a stale token again in the background; False if the breaker does not let the call through"""
+    if token in _refreshing:
+        return True
+    if not auth_breaker.allow():
+        return False
+    _refreshing.add(token)
+    task = asyncio.create_task(_refresh(token))
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+    return True
+
 async def verify_token(token: str) -> Dict[str, Any]:
     """
     Verifys an auth token with the auth service and returns user info if valid.
-    Returns None if the token is invalid or an error occurs
+    Recently verified tokens are answered from ``claims_cache`` (stale ones are
+    revalidated in the background), so an auth outage does not log users out.
+    Returns None if the token is invalid; raises 503/504 if auth cannot tell.
     """
+    claims = claims_cache.get(token)
+    if claims is not None:
+        if claims_cache.is_fresh(claims):
+            AUTH_VERIFICATIONS.labels("cache").inc()
+        elif _revalidate(token):
+            AUTH_VERIFICATIONS.labels("stale").inc()
+        else:
+            # Breaker abierto: el auth no responde y los claims del token aún vigente sustituyen a la verificación
+            AUTH_VERIFICATIONS.labels("fallback").inc()
+        return claims.user
+
+    if not auth_breaker.allow():
+        AUTH_VERIFICATIONS.labels("rejected").inc()
+        raise _unavailable("Authentication service unavailable")
     try:
-        response = requests.get(
-            f"{config.AUTH_SERVICE_URL}/verify",
-            headers={"Authorization": f"Bearer {token}"}
-        )
-        if response.status_code == 200:
-            return response.json()
-        logger.error(f"Token verification error: {response.status_code} - {response.text}")
-        return None
+        user = await _verify_remote(token)
+    except HTTPException:
+        raise
+    except TimeoutError as e:
+        # Sin respuesta a tiempo no se sabe si el token es válido: 504, no un 401
+        logger.error(f"Authentication service timed out: {e}")
+        raise HTTPException(status_code=504, detail="Authentication service timed out")
     except Exception as e:
         logger.error(f"Error connecting to the authentication service: {e}")
-        return None
+        raise _unavailable("Authentication service unavailable")
+    AUTH_VERIFICATIONS.labels("auth").inc()
+    return user
 
 async def get_current_user(authorization: Optional[str] = Header(None)) -> Dict[str, Any]:
     """
@@ -51,4 +175,8 @@ async def get_current_user(authorization: Optional[str] = Header(None)) -> Dict[
             status_code=401,
             detail="Invalid or expired token"
         )
+    # UID autenticado en la traza: viaja en el request log
+    trace = current_trace()
+    if trace is not None:
+        trace.user = user.get("uid")
     return user
\ No newline at end of file
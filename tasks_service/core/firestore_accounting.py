@@ -0,0 +1,72 @@
+from typing import Any, Iterator, List
+from core.metrics import observe_outbound
+
+# Categorías de la contabilidad por request (Server-Timing y campo "ops" del request log)
+READ = "firestore-read"
+QUERY = "firestore-query"
+WRITE = "firestore-write"
+
+
+class AccountedQuery:
+    """Query wrapper: each execution is one timed, counted round trip to Firestore"""
+
+    def __init__(self, query: Any):
+        self._query = query
+
+    def where(self, *args: Any, **kwargs: Any) -> "AccountedQuery":
+        return AccountedQuery(self._query.where(*args, **kwargs))
+
+    def order_by(self, *args: Any, **kwargs: Any) -> "AccountedQuery":
+        return AccountedQuery(self._query.order_by(*args, **kwargs))
+
+    def limit(self, count: int) -> "AccountedQuery":
+        return AccountedQuery(self._query.limit(count))
+
+    def stream(self, *args: Any, **kwargs: Any) -> Iterator[Any]:
+        # Se consume dentro de la medición: el tiempo de red está en la iteración
+        with observe_outbound("firestore", "query", QUERY):
+            docs = list(self._query.stream(*args, **kwargs))
+        return iter(docs)
+
+    def get(self, *args: Any, **kwargs: Any) -> List[Any]:
+        with observe_outbound("firestore", "query", QUERY):
+            return list(self._query.get(*args, **kwargs))
+
+
+class AccountedDocument:
+    """Document reference wrapper; ``ref`` is the raw reference (e.g. for ``transaction.update``)"""
+
+    def __init__(self, ref: Any):
+        self.ref = ref
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.ref, name)
+
+    def get(self, *args: Any, **kwargs: Any) -> Any:
+        with observe_outbound("firestore", "get", READ):
+            return self.ref.get(*args, **kwargs)
+
+    def set(self, *args: Any, **kwargs: Any) -> Any:
+        with observe_outbound("firestore", "set", WRITE):
+            return self.ref.set(*args, **kwargs)
+
+    def update(self, *args: Any, **kwargs: Any) -> Any:
+        with observe_outbound("firestore", "update", WRITE):
+            return self.ref.update(*args, **kwargs)
+
+    def delete(self, *args: Any, **kwargs: Any) -> Any:
+        with observe_outbound("firestore", "delete", WRITE):
+            return self.ref.delete(*args, **kwargs)
+
+
+class AccountedCollection(AccountedQuery):
+    """Collection wrapper counting document and query operations per request category"""
+
+    def __init__(self, collection: Any):
+        super().__init__(collection)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._query, name)
+
+    def document(self, *args: Any, **kwargs: Any) -> AccountedDocument:
+        return AccountedDocument(self._query.document(*args, **kwargs))
@@ -0,0 +1,120 @@
+import firebase_admin
+from firebase_admin import credentials, firestore
+from google.api_core import exceptions as google_exceptions
+from typing import Any, Callable, Dict, List, Optional
+from pathlib import Path
+from core.firestore_accounting import WRITE, AccountedCollection
+from core.metrics import observe_outbound
+from core.repository import (
+    DELETE_FIELD,
+    ArrayRemove,
+    ArrayUnion,
+    Changes,
+    Document,
+    NotFound,
+    TaskRepository,
+    TransactionFn,
+)
+from core import config
+
+
+def initialize_firebase():
+    if not firebase_admin._apps:
+        cred_path = Path(config.FIREBASE_CRED_PATH)
+        if not cred_path.is_file():
+            raise FileNotFoundError(f"Firebase credentials not found at {cred_path}")
+        cred = credentials.Certificate(str(cred_path))
+        firebase_admin.initialize_app(cred)
+    return firestore.client()
+
+
+def _document(snapshot: Any) -> Optional[Document]:
+    task = snapshot.to_dict() if snapshot.exists else None
+    if task is None:
+        return None
+    task["id"] = snapshot.id
+    return task
+
+
+def _value(value: Any) -> Any:
+    if value is DELETE_FIELD:
+        return firestore.DELETE_FIELD
+    if isinstance(value, ArrayUnion):
+        return firestore.ArrayUnion(value.values)
+    if isinstance(value, ArrayRemove):
+        return firestore.ArrayRemove(value.values)
+    return value
+
+
+def _encode(changes: Changes) -> Dict[str, Any]:
+    """Repository changes as a Firestore update (tuple paths are escaped segment by segment)"""
+    return {
+        firestore.FieldPath(*path).to_api_repr() if isinstance(path, tuple) else path: _value(value)
+        for path, value in changes.items()
+    }
+
+
+class FirestoreTaskRepository(TaskRepository):
+    """Task documents in a Firestore collection; every operation is accounted per request"""
+
+    def __init__(self, db: Any, collection: str):
+        self.db = db
+        # Cada lectura/escritura cuenta en la contabilidad de la request (Server-Timing)
+        self.collection = AccountedCollection(db.collection(collection))
+
+    def create(self, data: Document) -> str:
+        doc_ref = self.collection.document()
+        doc_ref.set(data)
+        return doc_ref.id
+
+    def get(self, task_id: str) -> Optional[Document]:
+        return _document(self.collection.document(task_id).get())
+
+    def _query(self, query: Any) -> List[Document]:
+        return [task for task in map(_document, query.stream()) if task is not None]
+
+    def find_by_owner(self, owner_id: str) -> List[Document]:
+        return self._query(self.collection.where("owner_id", "==", owner_id))
+
+    def find_by_collaborator(self, uid: str) -> List[Document]:
+        return self._query(self.collection.where("collaborators", "array_contains", uid))
+
+    def update(self, task_id: str, changes: Changes) -> None:
+        try:
+            self.collection.document(task_id).update(_encode(changes))
+        except google_exceptions.NotFound as e:
+            raise NotFound(f"No document to update: {task_id}") from e
+
+    def delete(self, task_id: str) -> None:
+        self.collection.document(task_id).delete()
+
+    def batch_update(self, changes: Dict[str, Changes]) -> None:
+        batch = self.db.batch()
+        for task_id, update in changes.items():
+            batch.update(self.collection.document(task_id).ref, _encode(update))
+        try:
+            with observe_outbound("firestore", "batch", WRITE):
+                batch.commit()
+        except google_exceptions.NotFound as e:
+            raise NotFound(str(e)) from e
+
+    def transaction(self, task_id: str, fn: TransactionFn) -> Any:
+        doc_ref = self.collection.document(task_id)
+
+        @firestore.transactional
+        def _apply(transaction):
+            result, changes = fn(_document(doc_ref.get(transaction=transaction)))
+            if changes:
+                transaction.update(doc_ref.ref, _encode(changes))
+            return result
+
+        # Cuenta como una escritura (commit); su lectura transaccional ya cuenta como lectura
+        with observe_outbound("firestore", "transaction", WRITE):
+            return _apply(self.db.transaction())
+
+    def watch(self, task_id: str, callback: Callable[[Optional[Document]], None]) -> Any:
+        def _on_snapshot(snapshots, changes, read_time):
+            for snapshot in snapshots:
+                callback(_document(snapshot))
+
+        return self.collection.document(task_id).on_snapshot(_on_snapshot)
@@ -1,12 +1,27 @@
 import logging
 import os
+import sys
 from datetime import datetime
-import requests
 from typing import Any, Dict, Optional
 from core import config
+from core.log_policy import LogPolicy
+from core.log_shipper import CircuitBreaker, LogShipper, LogSpool
+from core.tracing import current_trace
 
-# URL del servicio de logs
-LOGS_SERVICE_URL = config.LOGS_SERVICE_URL
+# Envío en segundo plano al logs_service: si no responde, los registros van al spool
+# local (circuit breaker abierto) y se reenvían en lotes cuando vuelve
+log_shipper = LogShipper(
+    config.LOGS_BATCH_URL,
+    LogSpool(config.LOG_SPOOL_DIR, max_bytes=config.LOG_SPOOL_MAX_BYTES, file_bytes=config.LOG_SPOOL_FILE_BYTES),
+    CircuitBreaker(failure_threshold=config.LOG_BREAKER_FAILURES, reset_timeout=config.LOG_BREAKER_RESET_SECONDS),
+    max_queue_size=config.LOG_SHIP_QUEUE_SIZE,
+    batch_size=config.LOG_SHIP_BATCH_SIZE,
+    flush_interval=config.LOG_SHIP_FLUSH_INTERVAL,
+    timeout=config.LOG_SHIP_TIMEOUT,
+)
+
+# Nivel mínimo y muestreo por servicio/logger/acción publicados por el logs_service
+log_policy = LogPolicy(config.LOG_POLICY_URL, config.SERVICE_NAME, refresh_interval=config.LOG_POLICY_REFRESH_SECONDS)
 
 def get_logger(name: str) -> logging.Logger:
     """Logger config with console handler and sending to log service"""
@@ -26,11 +41,18 @@ def get_logger(name: str) -> logging.Logger:
     
     return logger
 
-def format_log_data(action: str, data: Dict[str, Any]) -> Dict[str, Any]:
+# Tope de la query string guardada en cada request log
+REQUEST_QUERY_MAX_CHARS = 512
+
+def _caller_name() -> str:
+    """Module that called write()/request_log(): the logger the policy's ``loggers`` rules match"""
+    return sys._getframe(2).f_globals.get("__name__", __name__)
+
+def format_log_data(action: str, data: Dict[str, Any], name: str = __name__) -> Dict[str, Any]:
     """Data log format for sending to centralized service"""
     meta = {
         "service": config.SERVICE_NAME,
-        "logger_name": __name__,
+        "logger_name": name,
         "action": action,
         "timestamp": datetime.utcnow().isoformat(),
         **data
@@ -38,30 +60,70 @@ def format_log_data(action: str, data: Dict[str, Any]) -> Dict[str, Any]:
     return meta
 
 def send_to_log_service(level: str, message: str, user: Optional[str] = None, meta: Dict[str, Any] = None) -> None:
-    """Send log to centralized service"""
-    try:
-        payload = {
-            "level": level,
-            "message": message,
-            "user": user,
-            "meta": meta or {}
-        }
-        requests.post(LOGS_SERVICE_URL, json=payload, timeout=1)
-    except Exception as e:
-        # Si falla el envío al servicio de logs, al menos logueamos localmente
-        logger = get_logger(__name__)
-        logger.error(f"Error sending log to logs service: {e}")
+    """Send log to centralized service (non-blocking, delivered by the shipper thread)"""
+    record = {
+        "level": level,
+        "message": message,
+        "user": user,
+        "meta": meta or {}
+    }
+    # La traza se toma aquí, en el contexto de la request (el hilo del shipper no la ve)
+    trace = current_trace()
+    if trace:
+        record["trace_id"] = trace.trace_id
+        record["meta"]["request_id"] = trace.request_id
+    log_shipper.ship(record)
 
-def write(level: str, action: str, **kwargs: Any) -> None:
-    """Write structured log and send it to centralized service"""
-    meta = format_log_data(action, kwargs)
+def write(level: str, action: str, name: Optional[str] = None, **kwargs: Any) -> None:
+    """Write structured log and send it to centralized service (``name`` defaults to the calling module)"""
+    name = name or _caller_name()
     user = kwargs.get("user")
     message = f"{action}: " + " ".join(f"{k}={v}" for k, v in kwargs.items() if k != "user")
     
-    # Enviar al servicio de logs
-    send_to_log_service(level, message, user=user, meta=meta)
+    # Enviar al servicio de logs, si la política lo permite (se decide antes de serializar)
+    rate = log_policy.check(level, name, action)
+    if rate is not None:
+        meta = format_log_data(action, kwargs, name)
+        if rate < 1.0:
+            meta["sample_rate"] = rate
+        send_to_log_service(level, message, user=user, meta=meta)
     
     # También mantener log local para desarrollo/debug
-    logger = get_logger(__name__)
+    logger = get_logger(name)
     level_method = getattr(logger, level.lower(), logger.info)
-    level_method(message)
\ No newline at end of file
+    level_method(message)
+
+def request_log(method: str, path: str, status: int, time: float, auth: bool = False, name: Optional[str] = None, route: Optional[str] = None, query: Optional[str] = None) -> None:
+    """Send an HTTP request record (kind=request) for the logs_service latency stats"""
+    name = name or _caller_name()
+    rate = log_policy.check("info", name, "request")
+    if rate is None:
+        return
+    meta = format_log_data("request", {
+        "kind": "request",
+        "method": method,
+        "path": path,
+        "route": route or path,
+        "status": status,
+        "duration_ms": round(time * 1000, 3),
+    }, name)
+    if query:
+        # Necesaria para reproducir el tráfico (benchmarks/capture.py), con un tope de tamaño
+        meta["query"] = query[:REQUEST_QUERY_MAX_CHARS]
+    if rate < 1.0:
+        meta["sample_rate"] = rate  # El logs_service pondera las estadísticas por 1/rate
+    trace = current_trace()
+    if trace and trace.ops:
+        # Operaciones y tiempo por categoría (lecturas/escrituras de Firestore, auth)
+        meta["ops"] = trace.ops_summary()
+    if trace and trace.spans:
+        # Tiempos de cada llamada saliente (auth, firestore) para atribuir la latencia de cola
+        meta["spans"] = trace.spans
+        if trace.dropped_spans:
+            meta["dropped_spans"] = trace.dropped_spans
+    send_to_log_service(
+        "info",
+        f"request {method} {path} status={status} time={time:.3f}s auth={auth}",
+        user=trace.user if trace else None,
+        meta=meta,
+    )
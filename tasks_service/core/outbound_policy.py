@@ -0,0 +1,265 @@
+import asyncio
+import random
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Set
+import httpx
+from core import config
+from core.metrics import OUTBOUND_EXTRA_ATTEMPTS, observe_outbound_async
+from core.tracing import current_trace
+
+# Respuestas que merecen otro intento; 503 no: es el destino descartando carga y pide esperar (Retry-After)
+RETRY_STATUSES = (500, 502, 504)
+# Por debajo de este tiempo restante no se empieza un intento: no llegaría a volver
+MIN_ATTEMPT_SECONDS = 0.01
+# Latencias recientes por operación sobre las que se calcula el retardo del hedge
+LATENCY_WINDOW = 512
+
+
+class OutboundTimeout(TimeoutError):
+    """A call ran out of its own timeout or of the incoming request's remaining budget"""
+
+
+class LatencyWindow:
+    """Latencies of the last ``size`` successful calls of one operation"""
+
+    def __init__(self, size: int = LATENCY_WINDOW):
+        self._samples: Deque[float] = deque(maxlen=size)
+
+    def add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, p: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+class RetryBudget:
+    """Token bucket shared by the hedges and retries of one target.
+
+    Every call deposits ``ratio`` tokens and every extra attempt takes one, so
+    extra attempts stay under ``ratio`` of the calls however badly the target
+    fails; ``min_per_second`` keeps a few retries possible at low traffic. When
+    the target is down, retrying everything would multiply its load exactly
+    when it can least take it (a retry storm): the budget runs dry instead.
+    """
+
+    def __init__(self, ratio: float = 0.1, min_per_second: float = 1.0, max_tokens: float = 10.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, deposit: float) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.max_tokens, self._tokens + (now - self._updated) * self.min_per_second + deposit)
+        self._updated = now
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._refill(self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            self._refill(0.0)
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    @property
+    def tokens(self) -> float:
+        with self._lock:
+            self._refill(0.0)
+            return self._tokens
+
+
+class OutboundPolicy:
+    """Deadlines, hedging and budgeted retries for the calls to one target.
+
+    Each attempt gets the target's ``timeout`` or what is left of the incoming
+    request's deadline, whichever is shorter. Idempotent calls that have not
+    answered after the ``hedge_percentile`` latency of their operation get a
+    second, parallel attempt and the first good answer wins; calls that fail
+    (connection errors, timeouts, 500/502/504) are retried once the first
+    attempt is back. Both kinds of extra attempt come out of the same
+    ``RetryBudget``, so a slow or failing target sees at most ``ratio`` more
+    traffic than it would without them.
+    """
+
+    def __init__(
+        self,
+        target: str,
+        timeout: float,
+        budget: RetryBudget,
+        max_attempts: int = 2,
+        hedging: bool = True,
+        hedge_percentile: float = 95.0,
+        hedge_min_delay: float = 0.005,
+        hedge_min_samples: int = 20,
+        backoff: float = 0.02,
+    ):
+        self.target = target
+        self.timeout = timeout
+        self.budget = budget
+        self.max_attempts = max(1, max_attempts)
+        self.hedging = hedging
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_min_samples = hedge_min_samples
+        self.backoff = backoff
+        self._latencies: Dict[str, LatencyWindow] = {}
+        self._stats: Dict[str, Counter] = {}
+
+    def hedge_delay(self, operation: str) -> Optional[float]:
+        """How long to wait for the first attempt before hedging, None until there are enough samples"""
+        window = self._latencies.get(operation)
+        if not self.hedging or window is None or len(window) < self.hedge_min_samples:
+            return None
+        return max(self.hedge_min_delay, window.percentile(self.hedge_percentile))
+
+    def attempt_timeout(self) -> float:
+        """Timeout of the next attempt: the target's own, cut to the request's remaining budget"""
+        trace = current_trace()
+        remaining = trace.remaining() if trace is not None else None
+        if remaining is None:
+            return self.timeout
+        if remaining < MIN_ATTEMPT_SECONDS:
+            raise OutboundTimeout(f"request deadline exceeded before calling {self.target}")
+        return min(self.timeout, remaining)
+
+    def _count(self, operation: str, event: str) -> None:
+        self._stats.setdefault(operation, Counter())[event] += 1
+
+    def _extra(self, operation: str, kind: str) -> bool:
+        """Take a token for a hedge or a retry; False (and counted as denied) when the budget is empty"""
+        allowed = self.budget.withdraw()
+        result = "sent" if allowed else "denied"
+        OUTBOUND_EXTRA_ATTEMPTS.labels(self.target, kind, result).inc()
+        self._count(operation, f"{kind}_{result}")
+        return allowed
+
+    async def _observed(self, operation: str, send: Callable[[float], Awaitable[Any]], timeout: float) -> Any:
+        async with observe_outbound_async(self.target, operation):
+            return await send(timeout)
+
+    async def _attempt(self, operation: str, send: Callable[[float], Awaitable[Any]], timeout: float) -> Any:
+        start = time.perf_counter()
+        try:
+            # El plazo cubre el intento entero, también la latencia inyectada por FAULT_INJECTION
+            response = await asyncio.wait_for(self._observed(operation, send, timeout), timeout)
+        except (asyncio.TimeoutError, httpx.TimeoutException) as e:
+            raise OutboundTimeout(f"{self.target} {operation} timed out after {timeout * 1000:.0f} ms") from e
+        if getattr(response, "status_code", 200) < 500:
+            self._latencies.setdefault(operation, LatencyWindow()).add(time.perf_counter() - start)
+        return response
+
+    async def call(self, operation: str, send: Callable[[float], Awaitable[Any]], idempotent: bool = True) -> Any:
+        """Run ``send(timeout)`` under the policy and return the first good response.
+
+        If every attempt fails, returns the last retryable response or raises the
+        last error (``OutboundTimeout`` when the time ran out). Only idempotent
+        calls are hedged or retried.
+        """
+        self.budget.deposit()
+        self._count(operation, "calls")
+        pending: Set[asyncio.Future] = set()
+        attempts = 0
+        last_response: Any = None
+        last_error: Optional[BaseException] = None
+
+        def launch() -> bool:
+            nonlocal attempts, last_error
+            try:
+                timeout = self.attempt_timeout()
+            except OutboundTimeout as e:
+                # El error del intento anterior explica más que "sin tiempo para otro"
+                last_error = last_error or e
+                return False
+            attempts += 1
+            pending.add(asyncio.ensure_future(self._attempt(operation, send, timeout)))
+            return True
+
+        if not launch():
+            raise last_error
+        hedge_delay = self.hedge_delay(operation) if idempotent else None
+        try:
+            while pending:
+                wait = hedge_delay if attempts == 1 and attempts < self.max_attempts else None
+                done, _ = await asyncio.wait(pending, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # El primer intento ya va por la cola de la distribución: un segundo en paralelo
+                    hedge_delay = None
+                    if self._extra(operation, "hedge"):
+                        launch()
+                    continue
+                for task in done:
+                    pending.discard(task)
+                    try:
+                        response = task.result()
+                    except Exception as e:
+                        last_error = e
+                        continue
+                    if getattr(response, "status_code", 200) not in RETRY_STATUSES:
+                        if attempts > 1:
+                            self._count(operation, "recovered")
+                        return response
+                    last_response = response
+                if pending or not idempotent or attempts >= self.max_attempts:
+                    continue
+                if not self._extra(operation, "retry"):
+                    break
+                # Espera corta con jitter: los reintentos de muchas requests no llegan juntos
+                await asyncio.sleep(random.uniform(0, self.backoff))
+                launch()
+        finally:
+            for task in pending:
+                task.cancel()
+        self._count(operation, "failed")
+        if last_response is not None:
+            return last_response
+        raise last_error
+
+    def stats(self) -> Dict[str, Any]:
+        operations = {}
+        for operation, counts in self._stats.items():
+            delay = self.hedge_delay(operation)
+            window = self._latencies.get(operation)
+            p50 = window.percentile(50) if window else None
+            operations[operation] = {
+                **counts,
+                "latency_p50_ms": round(p50 * 1000, 3) if p50 is not None else None,
+                "hedge_delay_ms": round(delay * 1000, 3) if delay is not None else None,
+            }
+        return {
+            "timeout_ms": self.timeout * 1000,
+            "max_attempts": self.max_attempts,
+            "hedging": self.hedging,
+            "retry_budget_tokens": round(self.budget.tokens, 2),
+            "operations": operations,
+        }
+
+
+def create_policy(target: str, timeout: float) -> OutboundPolicy:
+    """Policy for one target with the OUTBOUND_* and RETRY_BUDGET_* settings"""
+    return OutboundPolicy(
+        target,
+        timeout,
+        RetryBudget(config.RETRY_BUDGET_RATIO, config.RETRY_BUDGET_MIN_PER_SECOND, config.RETRY_BUDGET_MAX_TOKENS),
+        max_attempts=config.OUTBOUND_MAX_ATTEMPTS,
+        hedging=config.OUTBOUND_HEDGING,
+        hedge_percentile=config.OUTBOUND_HEDGE_PERCENTILE,
+        hedge_min_delay=config.OUTBOUND_HEDGE_MIN_DELAY_MS / 1000,
+        hedge_min_samples=config.OUTBOUND_HEDGE_MIN_SAMPLES,
+    )
+
+
+auth_policy = create_policy("auth", config.AUTH_REQUEST_TIMEOUT)
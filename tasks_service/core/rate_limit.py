@@ -0,0 +1,190 @@
+import json
+import math
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+from fastapi import Depends, HTTPException, Request, Response
+from core import config
+from core.auth_middleware import get_current_user
+
+PERIODS = {"s": 1, "second": 1, "m": 60, "minute": 60, "h": 3600, "hour": 3600}
+_LIMIT = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*/\s*([a-z]+)\s*(?:,\s*burst\s*=\s*(\d+)\s*)?$")
+
+
+@dataclass(frozen=True)
+class Limit:
+    """A token bucket: ``rate`` tokens per second up to ``burst``"""
+
+    rate: float
+    burst: int
+    window: int
+
+    @classmethod
+    def parse(cls, spec: str) -> "Limit":
+        """``"120/minute"`` (burst = the whole window) or ``"120/minute, burst=20"``"""
+        match = _LIMIT.match(spec.lower())
+        if not match or match.group(2) not in PERIODS:
+            raise ValueError(f"invalid rate limit {spec!r}, expected e.g. '120/minute' or '10/second, burst=20'")
+        count, window = float(match.group(1)), PERIODS[match.group(2)]
+        burst = int(match.group(3)) if match.group(3) else max(1, int(count))
+        if count <= 0 or burst <= 0:
+            raise ValueError(f"invalid rate limit {spec!r}: must be positive")
+        return cls(rate=count / window, burst=burst, window=window)
+
+    def policy(self) -> str:
+        """``RateLimit-Policy`` value (draft-ietf-httpapi-ratelimit-headers)"""
+        return f"{round(self.rate * self.window)};w={self.window};burst={self.burst}"
+
+
+@dataclass
+class Decision:
+    allowed: bool
+    limit: Limit
+    remaining: int
+    # Segundos hasta tener el cubo lleno / hasta la próxima ficha
+    reset: float
+    retry_after: float
+
+    def headers(self) -> Dict[str, str]:
+        headers = {
+            "RateLimit-Limit": str(self.limit.burst),
+            "RateLimit-Remaining": str(self.remaining),
+            "RateLimit-Reset": str(math.ceil(self.reset)),
+            "RateLimit-Policy": self.limit.policy(),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(1, math.ceil(self.retry_after)))
+        return headers
+
+
+class RateLimitStore(ABC):
+    """Where the token buckets live.
+
+    ``take`` must be atomic per key: a shared implementation (Redis, Memcached)
+    would run it as one script or compare-and-set so replicas share the buckets.
+    """
+
+    @abstractmethod
+    def take(self, key: str, limit: Limit, cost: float = 1.0) -> Decision: ...
+
+
+class InMemoryRateLimitStore(RateLimitStore):
+    """Buckets of this process only: each replica (and worker) enforces the limit on its own share.
+
+    Keeps at most ``max_keys`` buckets, evicting the least recently used; an
+    evicted bucket comes back full, which only errs on the side of the client.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, limit: Limit, cost: float = 1.0) -> Decision:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (float(limit.burst), now))
+            tokens = min(float(limit.burst), tokens + (now - updated) * limit.rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return Decision(
+            allowed=allowed,
+            limit=limit,
+            remaining=int(tokens),
+            reset=(limit.burst - tokens) / limit.rate,
+            retry_after=0.0 if allowed else (cost - tokens) / limit.rate,
+        )
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+def create_store() -> RateLimitStore:
+    """Store selected by RATE_LIMIT_STORE"""
+    if config.RATE_LIMIT_STORE == "memory":
+        return InMemoryRateLimitStore(config.RATE_LIMIT_MAX_KEYS)
+    raise ValueError(f"Unknown RATE_LIMIT_STORE: {config.RATE_LIMIT_STORE!r} (expected 'memory')")
+
+
+def _route_key(request: Request) -> str:
+    route = request.scope.get("route")
+    return f"{request.method} {getattr(route, 'path', request.url.path)}"
+
+
+class RateLimiter:
+    """Per-IP and per-user token buckets; per-route limits (``"METHOD /route/template"``) replace the user default"""
+
+    def __init__(
+        self,
+        store: RateLimitStore,
+        user_limit: Limit,
+        ip_limit: Optional[Limit] = None,
+        routes: Optional[Dict[str, Limit]] = None,
+        trusted_proxies: int = 0,
+        enabled: bool = True,
+    ):
+        self.store = store
+        self.user_limit = user_limit
+        self.ip_limit = ip_limit
+        self.routes = routes or {}
+        self.trusted_proxies = trusted_proxies
+        self.enabled = enabled
+
+    def client_ip(self, request: Request) -> str:
+        """The address the closest trusted proxy saw (X-Forwarded-For from the right), else the peer"""
+        if self.trusted_proxies:
+            forwarded = [a.strip() for a in request.headers.get("x-forwarded-for", "").split(",") if a.strip()]
+            if len(forwarded) >= self.trusted_proxies:
+                return forwarded[-self.trusted_proxies]
+        return request.client.host if request.client else "unknown"
+
+    def _check(self, key: str, limit: Limit, response: Response, detail: str) -> None:
+        decision = self.store.take(key, limit)
+        if not decision.allowed:
+            raise HTTPException(status_code=429, detail=detail, headers=decision.headers())
+        response.headers.update(decision.headers())
+
+    def check_ip(self, request: Request, response: Response) -> None:
+        if self.enabled and self.ip_limit is not None:
+            self._check(f"ip:{self.client_ip(request)}", self.ip_limit, response, "Too many requests from this address")
+
+    def check_user(self, request: Request, response: Response, uid: str) -> None:
+        if not self.enabled:
+            return
+        route = _route_key(request)
+        limit = self.routes.get(route)
+        # Con límite propio, la ruta tiene su cubo aparte; si no, comparte el del usuario
+        key = f"user:{uid}:{route}" if limit else f"user:{uid}"
+        self._check(key, limit or self.user_limit, response, "Too many requests")
+
+
+def _routes(value: str) -> Dict[str, Limit]:
+    return {route: Limit.parse(spec) for route, spec in json.loads(value or "{}").items()}
+
+
+rate_limiter = RateLimiter(
+    create_store(),
+    Limit.parse(config.RATE_LIMIT_USER),
+    Limit.parse(config.RATE_LIMIT_IP) if config.RATE_LIMIT_IP else None,
+    _routes(config.RATE_LIMIT_ROUTES),
+    config.RATE_LIMIT_TRUSTED_PROXIES,
+    config.RATE_LIMIT_ENABLED,
+)
+
+
+async def limit_by_ip(request: Request, response: Response) -> None:
+    """Before authenticating: a flood from one address never reaches the auth service"""
+    rate_limiter.check_ip(request, response)
+
+
+async def limit_by_user(request: Request, response: Response, current_user: Dict = Depends(get_current_user)) -> None:
+    """After authenticating (the route reuses the same ``get_current_user`` result)"""
+    rate_limiter.check_user(request, response, current_user.get("uid", ""))
@@ -0,0 +1,175 @@
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+
+# Tope de spans guardados por request (un lote de colaboradores puede hacer decenas de llamadas)
+MAX_SPANS = 128
+# Presupuesto restante del llamante en milisegundos: el servicio siguiente no trabaja más allá de él
+DEADLINE_HEADER = "x-request-timeout-ms"
+
+
+class Trace:
+    """W3C trace context of one incoming request, the spans it has finished and its per-category op counts"""
+
+    __slots__ = (
+        "trace_id", "span_id", "parent_id", "flags", "request_id", "started", "deadline", "spans", "dropped_spans", "ops", "user",
+    )
+
+    def __init__(self, trace_id: str, parent_id: Optional[str], flags: str, request_id: str):
+        self.trace_id = trace_id
+        self.span_id = _new_id(8)
+        self.parent_id = parent_id
+        self.flags = flags
+        self.request_id = request_id
+        self.started = time.perf_counter()
+        # Instante (perf_counter) en que la request deja de tener sentido; None: sin plazo
+        self.deadline: Optional[float] = None
+        self.spans: List[Dict[str, Any]] = []
+        self.dropped_spans = 0
+        # Categoría (firestore-read, auth, ...) -> [operaciones, segundos]
+        self.ops: Dict[str, List[float]] = {}
+        # UID autenticado (lo fija get_current_user); viaja en el request log
+        self.user: Optional[str] = None
+
+    def traceparent(self, span_id: Optional[str] = None) -> str:
+        return f"00-{self.trace_id}-{span_id or self.span_id}-{self.flags}"
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline (negative once past it), None without one"""
+        return None if self.deadline is None else self.deadline - time.perf_counter()
+
+    def account(self, category: str, seconds: float) -> None:
+        entry = self.ops.get(category)
+        if entry is None:
+            entry = self.ops[category] = [0, 0.0]
+        entry[0] += 1
+        entry[1] += seconds
+
+    def ops_summary(self) -> Dict[str, Dict[str, float]]:
+        """Operation count and total time per category, for the request log record"""
+        return {category: {"count": int(n), "ms": round(s * 1000, 3)} for category, (n, s) in self.ops.items()}
+
+    def server_timing(self, total: float) -> str:
+        """``Server-Timing`` value: one metric per category (desc = number of operations) plus the total"""
+        metrics = [f'{category};desc="{int(n)}";dur={s * 1000:.1f}' for category, (n, s) in self.ops.items()]
+        metrics.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(metrics)
+
+
+_trace: ContextVar[Optional[Trace]] = ContextVar("trace", default=None)
+# Span en curso: padre de las llamadas salientes hechas dentro de él
+_span: ContextVar[Optional[str]] = ContextVar("span", default=None)
+
+
+def _new_id(nbytes: int) -> str:
+    return os.urandom(nbytes).hex()
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[Tuple[str, str, str]]:
+    """``(trace_id, parent_id, flags)`` of a valid ``traceparent`` header, else None"""
+    parts = value.strip().lower().split("-") if value else []
+    if len(parts) < 4 or len(parts[0]) != 2 or parts[0] == "ff":
+        return None
+    trace_id, parent_id, flags = parts[1:4]
+    if len(trace_id) != 32 or len(parent_id) != 16 or len(flags) != 2:
+        return None
+    if trace_id == "0" * 32 or parent_id == "0" * 16:
+        return None
+    try:
+        int(trace_id, 16), int(parent_id, 16), int(flags, 16)
+    except ValueError:
+        return None
+    return trace_id, parent_id, flags
+
+
+def parse_budget(value: Optional[str]) -> Optional[float]:
+    """Seconds of a ``X-Request-Timeout-Ms`` header, None if absent or invalid"""
+    try:
+        ms = float(value) if value else None
+    except ValueError:
+        return None
+    return ms / 1000 if ms is not None and ms >= 0 else None
+
+
+def start_trace(headers: Mapping[str, str], budget: Optional[float] = None) -> Token:
+    """Continue the caller's trace (``traceparent``/``X-Request-ID``) or start a new one.
+
+    The deadline is the caller's remaining budget (``X-Request-Timeout-Ms``)
+    or ``budget`` seconds, whichever ends first.
+    """
+    trace_id, parent_id, flags = parse_traceparent(headers.get("traceparent")) or (_new_id(16), None, "01")
+    request_id = (headers.get("x-request-id") or trace_id)[:128]
+    trace = Trace(trace_id, parent_id, flags, request_id)
+    budgets = [b for b in (parse_budget(headers.get(DEADLINE_HEADER)), budget) if b is not None]
+    if budgets:
+        trace.deadline = trace.started + min(budgets)
+    return _trace.set(trace)
+
+
+def end_trace(token: Token) -> None:
+    _trace.reset(token)
+
+
+def current_trace() -> Optional[Trace]:
+    return _trace.get()
+
+
+def response_headers(trace: Trace, total: float) -> Dict[str, str]:
+    return {
+        "traceparent": trace.traceparent(),
+        "X-Request-ID": trace.request_id,
+        "Server-Timing": trace.server_timing(total),
+    }
+
+
+def outbound_headers(timeout: Optional[float] = None) -> Dict[str, str]:
+    """Headers that link an outbound call to the current request (empty outside a request).
+
+    With a deadline or a ``timeout`` for the call, the callee also gets the time left in ``X-Request-Timeout-Ms``.
+    """
+    trace = _trace.get()
+    if trace is None:
+        return {}
+    headers = {"traceparent": trace.traceparent(_span.get()), "X-Request-ID": trace.request_id}
+    left = [t for t in (trace.remaining(), timeout) if t is not None]
+    if left:
+        headers["X-Request-Timeout-Ms"] = str(max(0, int(min(left) * 1000)))
+    return headers
+
+
+@contextmanager
+def span(name: str, category: Optional[str] = None) -> Iterator[None]:
+    """Time a child span of the current request; its id is the parent sent on outbound calls.
+
+    With ``category`` the call is also counted in the request's operation accounting.
+    """
+    trace = _trace.get()
+    if trace is None:
+        yield
+        return
+    parent_id = _span.get() or trace.span_id
+    span_id = _new_id(8)
+    token = _span.set(span_id)
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        end = time.perf_counter()
+        _span.reset(token)
+        if category:
+            trace.account(category, end - start)
+        if len(trace.spans) < MAX_SPANS:
+            trace.spans.append({
+                "name": name,
+                "span_id": span_id,
+                "parent_id": parent_id,
+                "start_ms": round((start - trace.started) * 1000, 3),
+                "duration_ms": round((end - start) * 1000, 3),
+                "outcome": outcome,
+            })
+        else:
+            trace.dropped_spans += 1
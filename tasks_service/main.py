@@ -1,8 +1,14 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from routers import tasks
-from core.logging_config import get_logger
+from routers import debug, tasks
+from core.logging_config import get_logger, request_log, log_shipper, log_policy
+from core.admission import admission, classify
+from core.auth_middleware import auth_breaker, claims_cache, close_auth_http
+from core.metrics import REQUESTS_IN_FLIGHT, loop_lag, metrics_response, observe_request
+from core.outbound_policy import auth_policy
+from core.tracing import current_trace, end_trace, response_headers, start_trace
 from core import config
+import time
 
 logger = get_logger(__name__)
 
@@ -12,7 +18,54 @@ app = FastAPI(
     description=config.DESCRIPTION
 )
 
-# Configurar CORS
+@app.on_event("startup")
+async def startup_event():
+    log_shipper.start()
+    log_policy.start()
+    loop_lag.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await close_auth_http()
+    loop_lag.stop()
+    log_policy.stop()
+    # Lo que no se pudo entregar queda en el spool y se reenvía al arrancar
+    log_shipper.stop()
+
+@app.middleware("http")
+async def log_requests(request: Request, call_next):
+    # Continúa la traza del llamante (traceparent) o abre una nueva
+    trace_token = start_trace(request.headers, config.REQUEST_DEADLINE_MS / 1000)
+    # La traza se cierra aunque call_next lance
+    try:
+        start_time = time.time()
+        REQUESTS_IN_FLIGHT.inc()
+        # Control de admisión: con el pod saturado se rechaza pronto (503) en vez de acumular latencia
+        priority = classify(request)
+        try:
+            if await admission.acquire(priority):
+                admitted_at = time.time()
+                try:
+                    response = await call_next(request)
+                finally:
+                    admission.release(priority, time.time() - admitted_at)
+            else:
+                response = admission.reject_response()
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+        process_time = time.time() - start_time
+        has_auth = bool(request.headers.get("authorization"))
+        route = getattr(request.scope.get("route"), "path", None)
+        observe_request(request.method, route, response.status_code, process_time)
+        response.headers.update(response_headers(current_trace(), process_time))
+        # Solo encola el registro: el envío lo hace el hilo del log_shipper
+        request_log(request.method, request.url.path, response.status_code, process_time, auth=has_auth, name=__name__, route=route, query=request.url.query)
+        return response
+    finally:
+        end_trace(trace_token)
+
+# Configurar CORS. Se registra después del middleware http para envolverlo: los 503
+# del control de admisión también llevan las cabeceras CORS (el navegador puede leerlos)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # En producción, especificar los orígenes permitidos
@@ -23,6 +76,7 @@ app.add_middleware(
 
 # Incluir routers
 app.include_router(tasks.router, prefix="/api")
+app.include_router(debug.router, prefix="/debug", include_in_schema=False)
 
 @app.get("/health")
 async def health_check():
@@ -32,6 +86,30 @@ async def health_check():
         "version": config.VERSION
     }
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    return metrics_response()
+
+@app.get("/health/admission")
+async def admission_health():
+    """Adaptive concurrency limit, in-flight and queued requests, and what was shed per priority class"""
+    return admission.stats()
+
+@app.get("/health/outbound")
+async def outbound_health():
+    """Hedges, retries and retry-budget tokens of the calls to the auth service, its breaker and the claims cache"""
+    return {
+        "auth": auth_policy.stats(),
+        "auth_breaker": {"state": auth_breaker.state, "opens": auth_breaker.opens},
+        "auth_claims": claims_cache.stats(),
+    }
+
+@app.get("/health/logging")
+async def logging_health():
+    """Delivery metrics of the log shipper (breaker state, spool usage) and the active log policy"""
+    return {**log_shipper.stats(), "policy": log_policy.stats()}
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -3,10 +3,12 @@ from typing import List, Dict, Any, Optional
 from services.task_service import task_service
 from models.schemas import Task, TaskCreate, TaskUpdate
 from core.auth_middleware import get_current_user
+from core.rate_limit import limit_by_ip, limit_by_user
 from core.logging_config import write, get_logger
 
 logger = get_logger(__name__)
-router = APIRouter(prefix="/tasks", tags=["tasks"])
+# Primero por IP (sin llamar al auth_service), después por usuario autenticado
+router = APIRouter(prefix="/tasks", tags=["tasks"], dependencies=[Depends(limit_by_ip), Depends(limit_by_user)])
 
 @router.post("", response_model=Task)
 def create_task(task_input: TaskCreate, current_user: Dict[str, Any] = Depends(get_current_user)):
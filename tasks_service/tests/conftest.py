@@ -0,0 +1,11 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Los módulos del servicio se importan como paquetes de primer nivel (core, services, routers)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+# El spool del log shipper se crea al importar core.logging_config: fuera del árbol del repo
+os.environ.setdefault("LOG_SPOOL_DIR", tempfile.mkdtemp(prefix="tasks-service-tests-"))
+# services.task_service crea su repositorio al importarse: sin Firestore
+os.environ.setdefault("TASK_REPOSITORY", "memory")
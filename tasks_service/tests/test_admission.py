@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from core import admission as admission_module
+from core.admission import CRITICAL, READ, WRITE, AdmissionController, GradientLimit, admission
+from main import app
+
+
+def test_shed_requests_keep_cors_headers(monkeypatch):
+    async def reject(priority):
+        return False
+
+    monkeypatch.setattr(admission, "acquire", reject)
+    response = TestClient(app).get("/api/tasks", headers={"Origin": "http://frontend.example"})
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
+    assert response.headers["access-control-allow-origin"] == "*"
+
+
+@pytest.fixture
+def instant_windows(monkeypatch):
+    # Cada WINDOW_MIN_SAMPLES muestras cierran una ventana, sin esperar WINDOW_SECONDS
+    monkeypatch.setattr(admission_module, "WINDOW_SECONDS", 0)
+
+
+def _window(limit, latency, in_flight):
+    for _ in range(admission_module.WINDOW_MIN_SAMPLES):
+        limit.sample(latency, in_flight)
+
+
+def test_limit_grows_while_busy_and_latency_holds(instant_windows):
+    limit = GradientLimit(initial=10, min_limit=2, max_limit=40)
+    previous = limit.limit
+    for _ in range(50):
+        _window(limit, 0.01, in_flight=int(limit.limit))
+        assert limit.limit >= previous
+        previous = limit.limit
+    assert limit.limit == 40
+
+
+def test_idle_pod_does_not_grow(instant_windows):
+    limit = GradientLimit(initial=10, min_limit=2, max_limit=40)
+    for _ in range(10):
+        _window(limit, 0.01, in_flight=1)
+    assert limit.limit == 10
+
+
+def test_limit_shrinks_when_latency_climbs(instant_windows):
+    limit = GradientLimit(initial=20, min_limit=5, max_limit=40)
+    _window(limit, 0.01, in_flight=20)
+    before = limit.limit
+    _window(limit, 0.1, in_flight=20)
+    # A lo sumo a la mitad por ventana (más la raíz)
+    assert before / 2 <= limit.limit < before
+    for _ in range(20):
+        _window(limit, 1.0, in_flight=20)
+    assert limit.limit == 5
+
+
+def _controller(limit=4, **kwargs):
+    return AdmissionController(GradientLimit(limit, 1, limit), **kwargs)
+
+
+def test_reads_are_shed_before_writes():
+    controller = _controller(limit=5, read_share=0.6, queue_timeout=0)
+
+    async def fill():
+        reads = [await controller.acquire(READ) for _ in range(4)]
+        writes = [await controller.acquire(WRITE) for _ in range(3)]
+        return reads, writes, await controller.acquire(CRITICAL)
+
+    reads, writes, critical = asyncio.run(fill())
+    assert reads == [True, True, True, False]
+    assert writes == [True, True, False]
+    assert critical
+    assert controller.stats()["rejected"] == {"read": 1, "write": 1}
+
+
+def test_queued_requests_are_woken_by_priority():
+    controller = _controller(limit=1, queue_timeout=1.0)
+
+    async def run():
+        assert await controller.acquire(WRITE)
+        order = []
+
+        async def waiter(priority, name):
+            assert await controller.acquire(priority)
+            order.append(name)
+            await asyncio.sleep(0)
+            controller.release(priority, 0.001)
+
+        tasks = [asyncio.ensure_future(waiter(READ, "read")), asyncio.ensure_future(waiter(WRITE, "write"))]
+        await asyncio.sleep(0.01)
+        controller.release(WRITE, 0.001)
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(run()) == ["write", "read"]
+    assert controller.in_flight == 0
+
+
+def test_queued_request_times_out_with_503():
+    controller = _controller(limit=1, queue_timeout=0.01)
+
+    async def run():
+        assert await controller.acquire(WRITE)
+        return await controller.acquire(WRITE)
+
+    assert asyncio.run(run()) is False
+    response = controller.reject_response()
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) >= 1
@@ -0,0 +1,151 @@
+import asyncio
+import base64
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from core import auth_cache, auth_middleware
+from core.auth_cache import ClaimsCache, token_expiry
+from core.log_shipper import CircuitBreaker
+
+
+class Clock:
+    def __init__(self):
+        self.monotonic = 1000.0
+        self.wall = 1_700_000_000.0
+
+    def advance(self, seconds):
+        self.monotonic += seconds
+        self.wall += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    # Solo el reloj de auth_cache: asyncio y el breaker siguen con el real
+    monkeypatch.setattr(auth_cache, "time", SimpleNamespace(monotonic=lambda: clock.monotonic, time=lambda: clock.wall))
+    return clock
+
+
+def _jwt(exp=None):
+    payload = base64.urlsafe_b64encode(json.dumps({"uid": "u1", **({"exp": exp} if exp else {})}).encode()).decode().rstrip("=")
+    return f"header.{payload}.signature"
+
+
+def test_token_expiry():
+    assert token_expiry(_jwt(exp=1_700_000_100)) == 1_700_000_100
+    assert token_expiry(_jwt()) is None
+    assert token_expiry("opaque-token") is None
+    assert token_expiry("a.!!!.c") is None
+
+
+def test_entry_goes_stale_after_the_ttl(clock):
+    cache = ClaimsCache(ttl=30, max_stale=900)
+    token = _jwt(exp=clock.wall + 3600)
+    cache.put(token, {"uid": "u1"})
+    assert cache.is_fresh(cache.get(token))
+    clock.advance(31)
+    entry = cache.get(token)
+    assert entry.user == {"uid": "u1"}
+    assert not cache.is_fresh(entry)
+    assert cache.stats()["stale_hits"] == 1
+
+
+def test_stale_entry_is_bounded_by_exp_and_max_stale(clock):
+    cache = ClaimsCache(ttl=30, max_stale=900)
+    expiring = _jwt(exp=clock.wall + 60)
+    opaque = "opaque-token"
+    cache.put(expiring, {"uid": "u1"})
+    cache.put(opaque, {"uid": "u2"})
+    clock.advance(61)
+    assert cache.get(expiring) is None
+    assert cache.get(opaque) is not None
+    clock.advance(900)
+    assert cache.get(opaque) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_cache_is_bounded_and_can_be_invalidated(clock):
+    cache = ClaimsCache(max_entries=2)
+    for token in ("a", "b", "c"):
+        cache.put(token, {"uid": token})
+    assert cache.get("a") is None
+    assert cache.stats()["evictions"] == 1
+    cache.invalidate("b")
+    assert cache.get("b") is None
+    assert cache.get("c").user == {"uid": "c"}
+
+
+@pytest.fixture
+def auth(monkeypatch, clock):
+    """Fresh cache and breaker, and a scripted auth service"""
+    cache = ClaimsCache(ttl=30, max_stale=900)
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    monkeypatch.setattr(auth_middleware, "claims_cache", cache)
+    monkeypatch.setattr(auth_middleware, "auth_breaker", breaker)
+    calls = []
+
+    async def verify_remote(token):
+        calls.append(token)
+        answer = auth.answers.pop(0)
+        if isinstance(answer, Exception):
+            auth_middleware._record(failed=True)
+            raise answer
+        auth_middleware._record(failed=False)
+        if answer is None:
+            cache.invalidate(token)
+            return None
+        cache.put(token, answer)
+        return answer
+
+    monkeypatch.setattr(auth_middleware, "_verify_remote", verify_remote)
+    auth.answers = []
+    auth.calls, auth.cache, auth.breaker = calls, cache, breaker
+    return auth
+
+
+def _verify(token):
+    async def run():
+        user = await auth_middleware.verify_token(token)
+        # Deja terminar la revalidación en segundo plano
+        await asyncio.gather(*auth_middleware._background)
+        return user
+
+    return asyncio.run(run())
+
+
+def test_stale_claims_are_served_and_revalidated(auth, clock):
+    token = _jwt(exp=clock.wall + 3600)
+    auth.answers = [{"uid": "u1"}, {"uid": "u1", "role": "admin"}]
+    assert _verify(token) == {"uid": "u1"}
+    clock.advance(31)
+    assert _verify(token) == {"uid": "u1"}
+    assert len(auth.calls) == 2
+    assert auth.cache.get(token).user == {"uid": "u1", "role": "admin"}
+
+
+def test_auth_outage_falls_back_to_unexpired_claims(auth, clock):
+    token = _jwt(exp=clock.wall + 3600)
+    auth.answers = [{"uid": "u1"}, ConnectionError("auth down")]
+    _verify(token)
+    clock.advance(31)
+    # La revalidación falla y abre el breaker; los claims siguen sirviendo
+    assert _verify(token) == {"uid": "u1"}
+    assert auth.breaker.state == "open"
+    assert _verify(token) == {"uid": "u1"}
+    assert len(auth.calls) == 2
+
+    # Un token nunca visto no tiene con qué sustituir la verificación
+    with pytest.raises(HTTPException) as exc:
+        _verify(_jwt(exp=clock.wall + 3600) + "x")
+    assert exc.value.status_code == 503
+
+
+def test_revoked_token_is_forgotten_on_revalidation(auth, clock):
+    token = _jwt(exp=clock.wall + 3600)
+    auth.answers = [{"uid": "u1"}, None]
+    _verify(token)
+    clock.advance(31)
+    _verify(token)
+    assert auth.cache.get(token) is None
@@ -0,0 +1,130 @@
+import time
+
+from core.log_shipper import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, LogShipper, LogSpool
+
+
+def test_each_process_gets_its_own_spool_directory(tmp_path):
+    # Dos workers de uvicorn con el mismo LOG_SPOOL_DIR
+    first = LogSpool(tmp_path)
+    second = LogSpool(tmp_path)
+    assert first.directory != second.directory
+    first.append([{"message": "from first"}])
+    second.append([{"message": "from second"}])
+    assert [r["message"] for r in first.peek(10)[0]] == ["from first"]
+    assert [r["message"] for r in second.peek(10)[0]] == ["from second"]
+
+
+def test_restarted_worker_takes_over_its_predecessor_spool(tmp_path):
+    spool = LogSpool(tmp_path)
+    spool.append([{"message": "undelivered"}])
+    spool.release()
+    restarted = LogSpool(tmp_path)
+    assert restarted.directory == spool.directory
+    assert [r["message"] for r in restarted.peek(10)[0]] == ["undelivered"]
+
+
+def _messages(records):
+    return [r["message"] for r in records]
+
+
+def test_replay_resumes_after_the_committed_offset(tmp_path):
+    spool = LogSpool(tmp_path, file_bytes=64)
+    spool.append([{"message": f"m{i}"} for i in range(3)])
+    spool.append([{"message": f"m{i}"} for i in range(3, 6)])
+    records, ends = spool.peek(2)
+    assert _messages(records) == ["m0", "m1"]
+    spool.commit(ends[-1])
+    spool.release()
+
+    # Tras un reinicio la posición de lectura se conserva
+    restarted = LogSpool(tmp_path, file_bytes=64)
+    replayed = []
+    while restarted.pending_bytes:
+        records, ends = restarted.peek(10)
+        replayed += _messages(records)
+        restarted.commit(ends[-1])
+    assert replayed == ["m2", "m3", "m4", "m5"]
+    assert restarted.stats()["files"] == 0
+
+
+def test_corrupt_lines_are_skipped(tmp_path):
+    spool = LogSpool(tmp_path)
+    spool.append([{"message": "before"}])
+    with open(spool._path(spool._files[-1]), "ab") as f:
+        f.write(b"{not json\n")
+    spool._sizes[spool._files[-1]] += len(b"{not json\n")
+    spool.append([{"message": "after"}])
+    records, ends = spool.peek(10)
+    assert _messages(records) == ["before", "after"]
+    spool.commit(ends[-1])
+    assert spool.pending_bytes == 0
+
+
+def test_cap_drops_the_oldest_files(tmp_path):
+    spool = LogSpool(tmp_path, max_bytes=200, file_bytes=64)
+    for i in range(20):
+        spool.append([{"message": f"m{i:02d}"}])
+    assert spool.pending_bytes <= 200
+    assert spool.dropped > 0
+    remaining = []
+    while spool.pending_bytes:
+        records, ends = spool.peek(100)
+        remaining += _messages(records)
+        spool.commit(ends[-1])
+    assert remaining[-1] == "m19"
+    assert len(remaining) + spool.dropped == 20
+
+
+class _FakeShipper(LogShipper):
+    """Answers each POST from a scripted list of accepted counts (None = all)"""
+
+    def __init__(self, spool, answers):
+        super().__init__("http://logs/api/logs/batch", spool, CircuitBreaker(failure_threshold=1, reset_timeout=0), batch_size=3)
+        self.answers = list(answers)
+        self.posted = []
+
+    def _post(self, records):
+        self.posted.append(_messages(records))
+        answer = self.answers.pop(0) if self.answers else None
+        return len(records) if answer is None else answer
+
+
+def test_failed_batch_goes_to_the_spool_and_is_replayed(tmp_path):
+    shipper = _FakeShipper(LogSpool(tmp_path), answers=[0])
+    shipper._deliver([{"message": f"m{i}"} for i in range(4)])
+    assert shipper.breaker.state == OPEN
+    assert shipper.stats()["spooled"] == 4
+
+    shipper._replay()
+    assert shipper.posted[1:] == [["m0", "m1", "m2"], ["m3"]]
+    assert shipper.spool.pending_bytes == 0
+    assert shipper.stats()["replayed"] == 4
+    assert shipper.breaker.state == CLOSED
+
+
+def test_partial_replay_commits_only_the_accepted_prefix(tmp_path):
+    spool = LogSpool(tmp_path)
+    spool.append([{"message": f"m{i}"} for i in range(3)])
+    shipper = _FakeShipper(spool, answers=[1])
+    shipper._replay()
+    # 429 con processed=1: m0 entregado, m1 y m2 siguen en el spool
+    assert shipper.posted == [["m0", "m1", "m2"]]
+    records, _ = spool.peek(10)
+    assert _messages(records) == ["m1", "m2"]
+    shipper._replay()
+    assert spool.pending_bytes == 0
+
+
+def test_breaker_lets_one_probe_through_after_the_timeout():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.opens == 2
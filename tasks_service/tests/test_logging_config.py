@@ -0,0 +1,30 @@
+import pytest
+from core import config, logging_config
+from core.logging_config import log_policy, request_log, write
+
+
+@pytest.fixture
+def shipped(monkeypatch):
+    records = []
+    monkeypatch.setattr(logging_config.log_shipper, "ship", records.append)
+    monkeypatch.setattr(log_policy, "_policy", log_policy._policy)
+    monkeypatch.setattr(log_policy, "_rules", {})
+    return records
+
+
+def test_logger_rules_match_the_calling_module(shipped):
+    log_policy.apply({"services": {config.SERVICE_NAME: {"loggers": {__name__: {"min_level": "error"}}}}})
+    write("info", "dropped")
+    write("error", "kept")
+    write("info", "other_logger", name="routers.tasks")
+    assert [(r["meta"]["action"], r["meta"]["logger_name"]) for r in shipped] == [
+        ("kept", __name__),
+        ("other_logger", "routers.tasks"),
+    ]
+
+
+def test_request_log_uses_the_given_logger(shipped):
+    log_policy.apply({"services": {config.SERVICE_NAME: {"loggers": {"main": {"sample_rate": 0}}}}})
+    request_log("GET", "/api/tasks", 200, 0.01, name="main")
+    request_log("GET", "/api/tasks", 200, 0.01, name="other")
+    assert [r["meta"]["logger_name"] for r in shipped] == ["other"]
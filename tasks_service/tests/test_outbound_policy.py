@@ -0,0 +1,121 @@
+import asyncio
+
+import pytest
+from core.outbound_policy import OutboundPolicy, OutboundTimeout, RetryBudget
+from core.tracing import end_trace, start_trace
+
+
+class Response:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+def _policy(tokens=10.0, **kwargs):
+    kwargs.setdefault("backoff", 0)
+    return OutboundPolicy("auth", 1.0, RetryBudget(ratio=0.1, min_per_second=0, max_tokens=tokens), **kwargs)
+
+
+def _script(*steps):
+    """``send`` that plays one step per attempt: a status code, an exception or (delay, status)"""
+    calls = []
+
+    async def send(timeout):
+        step = steps[len(calls)]
+        calls.append(timeout)
+        if isinstance(step, tuple):
+            await asyncio.sleep(step[0])
+            step = step[1]
+        if isinstance(step, BaseException):
+            raise step
+        return Response(step)
+
+    return send, calls
+
+
+def test_budget_limits_extra_attempts_to_the_ratio():
+    budget = RetryBudget(ratio=0.25, min_per_second=0, max_tokens=2)
+    assert budget.withdraw() and budget.withdraw()
+    assert not budget.withdraw()
+    for _ in range(3):
+        budget.deposit()
+    assert not budget.withdraw()
+    budget.deposit()
+    assert budget.withdraw()
+
+
+def test_failed_call_is_retried_once():
+    policy = _policy()
+    send, calls = _script(502, 200)
+    assert asyncio.run(policy.call("verify", send)).status_code == 200
+    assert len(calls) == 2
+    stats = policy.stats()["operations"]["verify"]
+    assert stats["retry_sent"] == 1
+    assert stats["recovered"] == 1
+
+
+def test_connection_errors_are_retried_and_the_last_one_raised():
+    policy = _policy()
+    send, calls = _script(ConnectionError("first"), ConnectionError("second"))
+    with pytest.raises(ConnectionError, match="second"):
+        asyncio.run(policy.call("verify", send))
+    assert len(calls) == 2
+    assert policy.stats()["operations"]["verify"]["failed"] == 1
+
+
+def test_non_idempotent_calls_and_503_are_not_retried():
+    policy = _policy()
+    send, calls = _script(502)
+    assert asyncio.run(policy.call("create", send, idempotent=False)).status_code == 502
+    send, calls = _script(503)
+    assert asyncio.run(policy.call("verify", send)).status_code == 503
+    assert len(calls) == 1
+
+
+def test_empty_budget_denies_the_retry():
+    policy = _policy(tokens=0)
+    send, calls = _script(500, 200)
+    assert asyncio.run(policy.call("verify", send)).status_code == 500
+    assert len(calls) == 1
+    assert policy.stats()["operations"]["verify"]["retry_denied"] == 1
+
+
+def test_slow_call_is_hedged_and_the_first_answer_wins():
+    policy = _policy(hedge_min_samples=5, hedge_min_delay=0.01)
+    for _ in range(5):
+        send, _ = _script(200)
+        asyncio.run(policy.call("verify", send))
+    assert policy.hedge_delay("verify") == pytest.approx(0.01, abs=0.01)
+
+    send, calls = _script((1.0, 200), (0, 201))
+    assert asyncio.run(policy.call("verify", send)).status_code == 201
+    assert len(calls) == 2
+    assert policy.stats()["operations"]["verify"]["hedge_sent"] == 1
+
+
+def test_no_hedging_before_enough_samples():
+    policy = _policy(hedge_min_samples=20)
+    assert policy.hedge_delay("verify") is None
+
+
+def test_attempt_timeout_raises_outbound_timeout():
+    policy = OutboundPolicy("auth", 0.05, RetryBudget(max_tokens=0), backoff=0)
+    send, _ = _script((1.0, 200))
+    with pytest.raises(OutboundTimeout):
+        asyncio.run(policy.call("verify", send))
+
+
+def test_attempts_are_cut_to_the_request_deadline():
+    policy = _policy()
+    send, calls = _script(200)
+
+    async def within_request(budget):
+        token = start_trace({}, budget)
+        try:
+            return await policy.call("verify", send)
+        finally:
+            end_trace(token)
+
+    asyncio.run(within_request(0.2))
+    assert 0 < calls[0] <= 0.2
+    with pytest.raises(OutboundTimeout, match="deadline"):
+        asyncio.run(within_request(0.001))
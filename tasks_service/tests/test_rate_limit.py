@@ -0,0 +1,109 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException, Response
+from starlette.requests import Request
+from core import rate_limit
+from core.rate_limit import InMemoryRateLimitStore, Limit, RateLimiter
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit, "time", SimpleNamespace(monotonic=clock))
+    return clock
+
+
+@pytest.mark.parametrize(
+    "spec, rate, burst, window",
+    [
+        ("120/minute", 2.0, 120, 60),
+        ("10/second, burst=20", 10.0, 20, 1),
+        (" 3600 / H ", 1.0, 3600, 3600),
+        ("0.5/s", 0.5, 1, 1),
+    ],
+)
+def test_parse(spec, rate, burst, window):
+    assert Limit.parse(spec) == Limit(rate=rate, burst=burst, window=window)
+
+
+@pytest.mark.parametrize("spec", ["", "120", "120/day", "-1/minute", "0/minute", "10/s, burst=0", "10/s burst=5"])
+def test_parse_rejects_invalid_specs(spec):
+    with pytest.raises(ValueError):
+        Limit.parse(spec)
+
+
+def test_policy_header():
+    assert Limit.parse("120/minute, burst=20").policy() == "120;w=60;burst=20"
+
+
+def test_bucket_allows_the_burst_then_refills_at_the_rate(clock):
+    store = InMemoryRateLimitStore()
+    limit = Limit.parse("60/minute, burst=3")
+    assert [store.take("u", limit).allowed for _ in range(4)] == [True, True, True, False]
+
+    denied = store.take("u", limit)
+    assert denied.remaining == 0
+    assert denied.retry_after == pytest.approx(1.0)
+    assert denied.headers()["Retry-After"] == "1"
+
+    clock.now += 1.0
+    assert store.take("u", limit).allowed
+    assert not store.take("u", limit).allowed
+    clock.now += 60
+    decision = store.take("u", limit)
+    assert decision.remaining == 2
+    assert decision.reset == pytest.approx(1.0)
+
+
+def test_keys_have_separate_buckets_and_the_oldest_is_evicted(clock):
+    store = InMemoryRateLimitStore(max_keys=2)
+    limit = Limit.parse("1/minute")
+    assert store.take("a", limit).allowed
+    assert store.take("b", limit).allowed
+    assert not store.take("a", limit).allowed
+    store.take("c", limit)
+    assert len(store) == 2
+    # "b" era el menos usado: vuelve con el cubo lleno
+    assert store.take("b", limit).allowed
+
+
+def _request(path="/api/tasks", method="GET", forwarded=None, peer="10.0.0.9"):
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded else []
+    return Request({"type": "http", "method": method, "path": path, "headers": headers, "client": (peer, 1234), "query_string": b""})
+
+
+def test_client_ip_honours_only_trusted_proxies():
+    limiter = RateLimiter(InMemoryRateLimitStore(), Limit.parse("10/s"), trusted_proxies=1)
+    assert limiter.client_ip(_request(forwarded="1.1.1.1, 2.2.2.2")) == "2.2.2.2"
+    assert limiter.client_ip(_request()) == "10.0.0.9"
+    untrusted = RateLimiter(InMemoryRateLimitStore(), Limit.parse("10/s"))
+    assert untrusted.client_ip(_request(forwarded="1.1.1.1")) == "10.0.0.9"
+
+
+def test_route_limits_use_their_own_bucket(clock):
+    limiter = RateLimiter(
+        InMemoryRateLimitStore(),
+        Limit.parse("2/minute"),
+        routes={"POST /api/tasks": Limit.parse("1/minute")},
+    )
+    response = Response()
+    limiter.check_user(_request(method="POST"), response, "uid-1")
+    assert response.headers["RateLimit-Limit"] == "1"
+    with pytest.raises(HTTPException) as exc:
+        limiter.check_user(_request(method="POST"), Response(), "uid-1")
+    assert exc.value.status_code == 429
+    assert "Retry-After" in exc.value.headers
+    # El cubo general del usuario sigue intacto
+    limiter.check_user(_request(), Response(), "uid-1")
+    limiter.check_user(_request(), Response(), "uid-1")
+    with pytest.raises(HTTPException):
+        limiter.check_user(_request(), Response(), "uid-1")
@@ -0,0 +1,115 @@
+import pytest
+from core.repository import (
+    DELETE_FIELD,
+    ArrayRemove,
+    ArrayUnion,
+    InMemoryTaskRepository,
+    NotFound,
+    TransactionConflict,
+    apply_changes,
+)
+
+
+def test_apply_changes_follows_update_semantics():
+    doc = {"title": "t", "collaborators": ["a"], "profiles": {"a": {"email": "a@x"}}}
+    apply_changes(doc, {
+        "collaborators": ArrayUnion(["a", "b", "b"]),
+        ("profiles", "b@x.com"): {"email": "b@x.com"},
+        "profiles.a": DELETE_FIELD,
+        "meta.counts.views": 1,
+        "title": DELETE_FIELD,
+    })
+    assert doc == {
+        "collaborators": ["a", "b"],
+        "profiles": {"b@x.com": {"email": "b@x.com"}},
+        "meta": {"counts": {"views": 1}},
+    }
+    apply_changes(doc, {"collaborators": ArrayRemove(["a", "zzz"]), "missing": ArrayRemove(["a"])})
+    assert doc["collaborators"] == ["b"]
+    assert doc["missing"] == []
+
+
+def test_documents_are_copies():
+    repo = InMemoryTaskRepository()
+    data = {"owner_id": "o", "collaborators": []}
+    task_id = repo.create(data)
+    data["collaborators"].append("leak")
+    doc = repo.get(task_id)
+    doc["collaborators"].append("leak")
+    assert repo.get(task_id) == {"id": task_id, "owner_id": "o", "collaborators": []}
+
+
+def test_queries():
+    repo = InMemoryTaskRepository()
+    mine = repo.create({"owner_id": "o", "collaborators": ["c"]})
+    repo.create({"owner_id": "other", "collaborators": []})
+    assert [d["id"] for d in repo.find_by_owner("o")] == [mine]
+    assert [d["id"] for d in repo.find_by_collaborator("c")] == [mine]
+    assert repo.find_by_collaborator("nobody") == []
+
+
+def test_update_of_a_missing_document_raises_not_found():
+    repo = InMemoryTaskRepository()
+    with pytest.raises(NotFound):
+        repo.update("missing", {"title": "x"})
+
+
+def test_batch_update_is_all_or_nothing():
+    repo = InMemoryTaskRepository()
+    task_id = repo.create({"title": "before"})
+    with pytest.raises(NotFound):
+        repo.batch_update({task_id: {"title": "after"}, "missing": {"title": "after"}})
+    assert repo.get(task_id)["title"] == "before"
+
+
+def test_transaction_retries_after_a_concurrent_write():
+    repo = InMemoryTaskRepository()
+    task_id = repo.create({"collaborators": ["a"]})
+    seen = []
+
+    def add_b(doc):
+        seen.append(list(doc["collaborators"]))
+        if len(seen) == 1:
+            # Otra request escribe entre la lectura y el commit
+            repo.update(task_id, {"collaborators": ArrayUnion(["c"])})
+        return "added", {"collaborators": doc["collaborators"] + ["b"]}
+
+    assert repo.transaction(task_id, add_b) == "added"
+    assert seen == [["a"], ["a", "c"]]
+    assert repo.get(task_id)["collaborators"] == ["a", "c", "b"]
+
+
+def test_transaction_gives_up_after_max_attempts():
+    repo = InMemoryTaskRepository(max_attempts=3)
+    task_id = repo.create({"n": 0})
+    attempts = []
+
+    def always_conflicts(doc):
+        attempts.append(doc["n"])
+        repo.update(task_id, {"n": doc["n"] + 1})
+        return None, {"n": -1}
+
+    with pytest.raises(TransactionConflict):
+        repo.transaction(task_id, always_conflicts)
+    assert attempts == [0, 1, 2]
+
+
+def test_read_only_transaction_and_missing_document():
+    repo = InMemoryTaskRepository()
+    assert repo.transaction("missing", lambda doc: (doc, None)) is None
+    with pytest.raises(NotFound):
+        repo.transaction("missing", lambda doc: (None, {"title": "x"}))
+
+
+def test_watchers_see_every_commit_until_unsubscribed():
+    repo = InMemoryTaskRepository()
+    task_id = repo.create({"title": "a"})
+    seen = []
+    subscription = repo.watch(task_id, lambda doc: seen.append(doc and doc["title"]))
+    repo.update(task_id, {"title": "b"})
+    repo.transaction(task_id, lambda doc: (None, {"title": "c"}))
+    repo.delete(task_id)
+    subscription.unsubscribe()
+    repo.create({"title": "d"})
+    assert seen == ["a", "b", "c", None]
+    assert repo.stats()["watched"] == 0